@@ -0,0 +1,101 @@
+import os
+import smartpy as sp
+
+NFT = sp.io.import_script_from_url("file:./nft/nft.py")
+Sale = sp.io.import_script_from_url("file:./sale/sale.py")
+DAO = sp.io.import_script_from_url("file:./dao/dao.py")
+Majority = sp.io.import_script_from_url("file:./dao/majority_voting.py")
+OptOut = sp.io.import_script_from_url("file:./dao/opt_out_voting.py")
+Config = sp.io.import_script_from_url("file:./config/nft_config.py")
+
+########################################################################################################################
+########################################################################################################################
+# Benchmark compilation targets
+# Compiled by benchmark/run_benchmark.py. The addresses are the ones of the mockup bootstrap accounts unless overridden
+# by the environment. The governance parameters are shortened so a poll can be ended a few blocks after it started.
+########################################################################################################################
+########################################################################################################################
+ADMINISTRATOR_ADDRESS = os.environ.get("BENCHMARK_ADMINISTRATOR", "tz1KqTpEZ7Yob7QbPE4Hy4Wo8fHG8LhKxZSx")
+MULTISIG_FUND_ADDRESS = os.environ.get("BENCHMARK_MULTISIG_FUND", "tz1ddb9NMYHZi5UzPdzTZMYQQZoMub195zgv")
+NFT_MAX_SUPPLY = int(os.environ.get("BENCHMARK_NFT_MAX_SUPPLY", "10000"))
+# Same token metadata mode as the deployed contract unless overridden with BENCHMARK_COMPACT_TOKEN_METADATA=0 or 1
+COMPACT_TOKEN_METADATA = os.environ.get("BENCHMARK_COMPACT_TOKEN_METADATA",
+                                        "1" if Config.COMPACT_TOKEN_METADATA else "0") == "1"
+
+# Replaced by the runner with the address of the voting contracts once they are originated
+MAJORITY_PLACEHOLDER_ADDRESS = "KT1XKLLrQW4vsRvzHMnSYiK51uPVfGXLHg9V"
+OPT_OUT_PLACEHOLDER_ADDRESS = "KT1NifZHyuq6FhnrBjKzdCEcJb1bxG8JbCLs"
+
+VOTE_DELAY_BLOCKS = 0
+VOTE_LENGTH_BLOCKS = 2
+
+METADATA = sp.utils.metadata_of_url("ipfs://benchmark")
+
+sp.add_compilation_target("benchmark_nft",
+                          NFT.AngryTeenagers(
+                              administrator=sp.address(ADMINISTRATOR_ADDRESS),
+                              royalties_bytes=sp.utils.bytes_of_string(Config.ROYALTIES_BYTES),
+                              metadata=METADATA,
+                              generic_image_ipfs=sp.utils.bytes_of_string(Config.GENERIC_ARTWORK_IPFS_LINK),
+                              generic_image_ipfs_display=sp.utils.bytes_of_string(Config.GENERIC_DISPLAY_ARTWORK_IPFS_LINK),
+                              generic_image_ipfs_thumbnail=sp.utils.bytes_of_string(Config.GENERIC_THUMBNAIL_ARTWORK_IPFS_LINK),
+                              what3words_file_ipfs=sp.utils.bytes_of_string(Config.WHAT3WORDS_FILE_IPFS_LINK),
+                              max_supply=NFT_MAX_SUPPLY,
+                              artifact_file_type=Config.ARTIFACT_FILE_TYPE,
+                              artifact_file_size_generic=Config.ARTIFACT_FILE_SIZE,
+                              artifact_file_name=Config.ARTIFACT_FILE_NAME,
+                              artifact_dimensions=Config.ARTIFACT_DIMENSIONS,
+                              artifact_file_unit=Config.ARTIFACT_FILE_UNIT,
+                              display_file_type=Config.DISPLAY_FILE_TYPE,
+                              display_file_size_generic=Config.DISPLAY_FILE_SIZE,
+                              display_file_name=Config.DISPLAY_FILE_NAME,
+                              display_dimensions=Config.DISPLAY_DIMENSIONS,
+                              display_file_unit=Config.DISPLAY_FILE_UNIT,
+                              thumbnail_file_type=Config.THUMBNAIL_FILE_TYPE,
+                              thumbnail_file_size_generic=Config.THUMBNAIL_FILE_SIZE,
+                              thumbnail_file_name=Config.THUMBNAIL_FILE_NAME,
+                              thumbnail_dimensions=Config.THUMBNAIL_DIMENSIONS,
+                              thumbnail_file_unit=Config.THUMBNAIL_FILE_UNIT,
+                              name_prefix=Config.NAME_PREFIX,
+                              symbol=Config.SYMBOL,
+                              description=Config.DESCRIPTION,
+                              language=Config.LANGUAGE,
+                              attributes_generic=Config.ATTRIBUTES_GENERIC,
+                              rights=Config.RIGHTS,
+                              creators=Config.CREATORS,
+                              project_name=Config.PROJECTNAME,
+                              compact_token_metadata=COMPACT_TOKEN_METADATA))
+
+sp.add_compilation_target("benchmark_sale",
+                          Sale.AngryTeenagersSale(
+                              admin=sp.address(ADMINISTRATOR_ADDRESS),
+                              multisig_fund_address=sp.address(MULTISIG_FUND_ADDRESS),
+                              metadata=METADATA))
+
+sp.add_compilation_target("benchmark_dao",
+                          DAO.AngryTeenagersDao(
+                              admin=sp.address(ADMINISTRATOR_ADDRESS),
+                              metadata=METADATA,
+                              poll_manager=sp.map(l={0: sp.record(name=sp.string("MajorityVote"), address=sp.address(MAJORITY_PLACEHOLDER_ADDRESS)),
+                                                     1: sp.record(name=sp.string("OptOutVote"), address=sp.address(OPT_OUT_PLACEHOLDER_ADDRESS))},
+                                                  tkey=sp.TNat, tvalue=sp.TRecord(name=sp.TString, address=sp.TAddress))))
+
+sp.add_compilation_target("benchmark_majority",
+                          Majority.DaoMajorityVoting(
+                              admin=sp.address(ADMINISTRATOR_ADDRESS),
+                              current_dynamic_quorum_value_pertenmill=sp.nat(3000),
+                              governance_parameters=sp.record(vote_delay_blocks=sp.nat(VOTE_DELAY_BLOCKS),
+                                                              vote_length_blocks=sp.nat(VOTE_LENGTH_BLOCKS),
+                                                              supermajority_pertenmill=sp.nat(5000),
+                                                              fixed_quorum_pertenmill=sp.nat(1000),
+                                                              fixed_quorum=sp.bool(False),
+                                                              quorum_cap_pertenmill=sp.record(lower=sp.nat(1000), upper=sp.nat(9000))),
+                              metadata=METADATA))
+
+sp.add_compilation_target("benchmark_opt_out",
+                          OptOut.DaoOptOutVoting(
+                              admin=sp.address(ADMINISTRATOR_ADDRESS),
+                              governance_parameters=sp.record(vote_delay_blocks=sp.nat(VOTE_DELAY_BLOCKS),
+                                                              vote_length_blocks=sp.nat(VOTE_LENGTH_BLOCKS),
+                                                              objection_threshold_pertenmill=sp.nat(1000)),
+                              metadata=METADATA))
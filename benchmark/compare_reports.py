@@ -0,0 +1,78 @@
+"""Compare two benchmark reports written by run_benchmark.py.
+
+In the root folder of the repository:
+    python3 ./benchmark/compare_reports.py ../benchmark_before.json ../benchmark_after.json --threshold 2
+
+Each call of the new report is compared with the same call (contract, entrypoint, scale and rank of the call) of the
+reference report. The script exits with 1 if the gas or the paid storage of a call grew by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ["gas", "storage_diff"]
+
+
+def index_results(report):
+    indexed = {}
+    for result in report["results"]:
+        key = (result["contract"], result["entrypoint"], result["scale"])
+        rank = 0
+        while key + (rank,) in indexed:
+            rank += 1
+        indexed[key + (rank,)] = result
+    return indexed
+
+
+def relative_change(reference, value):
+    if reference == value:
+        return 0.0
+    if reference <= 0:
+        return float("inf") if value > reference else float("-inf")
+    return 100.0 * (value - reference) / reference
+
+
+def compare(reference_report, new_report, threshold):
+    reference = index_results(reference_report)
+    new = index_results(new_report)
+    regressions = []
+
+    for key in sorted(set(reference) | set(new), key=str):
+        if key not in new:
+            print("%-20s %-32s %6d #%d  removed" % key)
+            continue
+        if key not in reference:
+            print("%-20s %-32s %6d #%d  added" % key)
+            continue
+
+        changes = []
+        for metric in METRICS:
+            change = relative_change(reference[key][metric], new[key][metric])
+            changes.append("%s %s -> %s (%+.1f%%)" % (metric, reference[key][metric], new[key][metric], change))
+            if change > threshold:
+                regressions.append((key, metric))
+        print("%-20s %-32s %6d #%d  " % key + ", ".join(changes))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports and flag the regressions")
+    parser.add_argument("reference", help="Report of the reference version")
+    parser.add_argument("new", help="Report of the new version")
+    parser.add_argument("--threshold", type=float, default=1.0, help="Allowed growth in percent (default: 1)")
+    args = parser.parse_args()
+
+    with open(args.reference) as reference_file, open(args.new) as new_file:
+        regressions = compare(json.load(reference_file), json.load(new_file), args.threshold)
+
+    if regressions:
+        print("\n%d regression(s) above %.1f%%:" % (len(regressions), args.threshold))
+        for (contract, entrypoint, scale, rank), metric in regressions:
+            print("  %s %s scale=%d #%d: %s" % (contract, entrypoint, scale, rank, metric))
+        sys.exit(1)
+    print("\nNo regression above %.1f%%" % args.threshold)
+
+
+if __name__ == "__main__":
+    main()
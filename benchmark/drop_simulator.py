@@ -0,0 +1,334 @@
+import json
+import os
+import random
+import smartpy as sp
+
+Sale = sp.io.import_script_from_url("file:./sale/sale.py")
+NFT = sp.io.import_script_from_url("file:./nft/nft.py")
+Error = sp.io.import_script_from_url("file:./helper/errors.py")
+Config = sp.io.import_script_from_url("file:./config/nft_config.py")
+
+########################################################################################################################
+########################################################################################################################
+# Drop simulator
+# Replays the arrival of many buyers calling user_mint during the first blocks of a sale event in the SmartPy scenario
+# interpreter (no node needed). Each call is first applied to a Python model of the sale and the FA2 contracts. The
+# model gives the expected result (success or error code) of the call and the big map entries it adds, which are all
+# checked by the scenario: each entry is verified absent from the storage of the contract before the call and present
+# after. The internal operations (transfers and events) of a call are counted from the code of user_mint and mint_batch;
+# the effect of the transfers is checked through the minted tokens and the balance of the sale contract.
+# The interpreter does not measure gas: use benchmark/run_benchmark.py to measure the gas of user_mint for a given
+# size of storage.
+########################################################################################################################
+########################################################################################################################
+SEED = int(os.environ.get("DROP_SEED", "1"))
+BUYERS = int(os.environ.get("DROP_BUYERS", "1000"))
+BLOCKS = int(os.environ.get("DROP_BLOCKS", "10"))
+# uniform: arrivals spread evenly over the blocks, exponential: most of the buyers arrive in the first blocks,
+# burst: all the buyers arrive in the first block
+ARRIVAL = os.environ.get("DROP_ARRIVAL", "exponential")
+ARRIVAL_MEAN_BLOCKS = float(os.environ.get("DROP_ARRIVAL_MEAN_BLOCKS", "2"))
+# presale: only the allowlisted buyers can mint, public: public sale with the allowlist discount/minting rights
+EVENT = os.environ.get("DROP_EVENT", "public")
+ALLOWLIST_RATIO = float(os.environ.get("DROP_ALLOWLIST_RATIO", "0.3"))
+EVENT_MAX_SUPPLY = int(os.environ.get("DROP_EVENT_MAX_SUPPLY", "2000"))
+MAX_PER_USER = int(os.environ.get("DROP_MAX_PER_USER", "5"))
+NFT_MAX_SUPPLY = int(os.environ.get("DROP_NFT_MAX_SUPPLY", "5236"))
+PRICE_MUTEZ = int(os.environ.get("DROP_PRICE_MUTEZ", "10000000"))
+DISCOUNT_MUTEZ = int(os.environ.get("DROP_DISCOUNT_MUTEZ", "2000000"))
+MINT_RIGHTS = os.environ.get("DROP_MINT_RIGHTS", "0") == "1"
+FUND_SWEEP_THRESHOLD_MUTEZ = int(os.environ.get("DROP_FUND_SWEEP_THRESHOLD_MUTEZ", "0"))
+# Share of the buyers sending a wrong amount of Tez and share of the buyers minting a second time in a later block
+WRONG_PAYMENT_RATIO = float(os.environ.get("DROP_WRONG_PAYMENT_RATIO", "0.02"))
+RETRY_RATIO = float(os.environ.get("DROP_RETRY_RATIO", "0.1"))
+COMPACT_TOKEN_METADATA = os.environ.get("DROP_COMPACT_TOKEN_METADATA",
+                                        "1" if Config.COMPACT_TOKEN_METADATA else "0") == "1"
+REPORT = os.environ.get("DROP_REPORT", "")
+
+SECONDS_PER_BLOCK = 30
+
+
+########################################################################################################################
+# Arrivals
+########################################################################################################################
+def arrival_block(rng):
+    if ARRIVAL == "burst":
+        return 0
+    if ARRIVAL == "uniform":
+        return rng.randrange(BLOCKS)
+    if ARRIVAL == "exponential":
+        return min(BLOCKS - 1, int(rng.expovariate(1.0 / ARRIVAL_MEAN_BLOCKS)))
+    raise ValueError("Unknown arrival distribution %s" % ARRIVAL)
+
+
+def generate_mints(rng, buyers):
+    """Return the mints of each block. A mint is (buyer index, amount, paid mutez)."""
+    blocks = [[] for _ in range(BLOCKS)]
+    for index, buyer in enumerate(buyers):
+        block = arrival_block(rng)
+        attempts = [block]
+        if block + 1 < BLOCKS and rng.random() < RETRY_RATIO:
+            attempts.append(rng.randrange(block + 1, BLOCKS))
+        for attempt in attempts:
+            # One more than the limit so the limit is also exercised
+            amount = rng.randint(1, MAX_PER_USER + 1)
+            paid = amount * unit_price(buyer)
+            if rng.random() < WRONG_PAYMENT_RATIO:
+                paid = paid + 1
+            blocks[attempt].append((index, amount, paid))
+    for mints in blocks:
+        rng.shuffle(mints)
+    return blocks
+
+
+def unit_price(buyer):
+    if EVENT == "public" and buyer["allowlisted"]:
+        return PRICE_MUTEZ - DISCOUNT_MUTEZ
+    return PRICE_MUTEZ
+
+
+########################################################################################################################
+# Model of user_mint
+# Same checks, in the same order, as AngryTeenagersSale.user_mint and AngryTeenagers.mint_batch. The state is only
+# updated when the call succeeds as a failed operation is reverted.
+########################################################################################################################
+class DropModel:
+    def __init__(self):
+        self.token_minted_in_event = 0
+        self.minted_tokens = 0
+        self.balance = 0
+        self.event_user_balance = {}
+        self.owner_balance = {}
+        # Highest index and level of the voting power history of each address
+        self.voting_power = {}
+        self.unrevealed_chunks = set()
+
+    def check(self, buyer, amount, paid):
+        """Return the error message of the call or None if it succeeds. The contracts fail with Error.error(message),
+        which is the message or its code in the ANGRY_TEENAGERS_NUMERIC_ERRORS mode."""
+        address = buyer["name"]
+        user_balance = self.event_user_balance.get(address, 0)
+        if amount == 0 or amount > MAX_PER_USER:
+            return "ANGRY_TEENAGERS_NO_TOKEN"
+
+        if EVENT == "presale":
+            if not buyer["allowlisted"]:
+                return "ANGRY_TEENAGERS_FORBIDDEN_OPERATION"
+            if self.token_minted_in_event + amount > EVENT_MAX_SUPPLY:
+                return "ANGRY_TEENAGERS_NO_TOKEN"
+            if user_balance + amount > MAX_PER_USER:
+                return "ANGRY_TEENAGERS_NO_TOKEN"
+        else:
+            if not (buyer["allowlisted"] and MINT_RIGHTS) and self.token_minted_in_event + amount > EVENT_MAX_SUPPLY:
+                return "ANGRY_TEENAGERS_NO_TOKEN"
+            if user_balance + amount > MAX_PER_USER:
+                return "ANGRY_TEENAGERS_FORBIDDEN_OPERATION"
+
+        if paid != amount * unit_price(buyer):
+            return "ANGRY_TEENAGERS_INVALID_AMOUNT"
+        if self.minted_tokens + amount > NFT_MAX_SUPPLY:
+            return "ANGRY_TEENAGERS_NO_LAND_AVAILABLE"
+        return None
+
+    def new_entries(self, buyer, amount, level, event_id):
+        """Big map entries added by a successful call, as (big map, key) for the sale and for the FA2 contract."""
+        name = buyer["name"]
+        address = buyer["account"].address
+        sale_entries = []
+        nft_entries = []
+
+        if name not in self.event_user_balance:
+            sale_entries.append(("event_user_balance", sp.pair(event_id, address)))
+
+        owner_balance = self.owner_balance.get(name, 0)
+        chunks = set()
+        for index in range(amount):
+            token_id = self.minted_tokens + index
+            nft_entries.append(("ledger", sp.nat(token_id)))
+            nft_entries.append(("token_data" if COMPACT_TOKEN_METADATA else "token_metadata", sp.nat(token_id)))
+            nft_entries.append(("tokens_of_owner", sp.pair(address, sp.nat(owner_balance + index))))
+            nft_entries.append(("owner_token_index", sp.nat(token_id)))
+            chunk = token_id // NFT.UNREVEALED_CHUNK_SIZE
+            if chunk not in self.unrevealed_chunks and chunk not in chunks:
+                chunks.add(chunk)
+                nft_entries.append(("unrevealed_tokens", sp.nat(chunk)))
+        if name not in self.owner_balance:
+            nft_entries.append(("balance_of_owner", address))
+        if name not in self.voting_power:
+            nft_entries.append(("voting_power_highest_index", address))
+            nft_entries.append(("voting_power", sp.pair(address, sp.nat(0))))
+        elif self.voting_power[name][1] != level:
+            nft_entries.append(("voting_power", sp.pair(address, sp.nat(self.voting_power[name][0] + 1))))
+        return sale_entries, nft_entries
+
+    def apply(self, buyer, amount, paid, level):
+        """Apply a successful call. Return the number of internal operations of the call."""
+        name = buyer["name"]
+        # mint_batch transfer, mint event of the sale, mint event of each token and mint_batch event of the FA2
+        operations = 1 + 1 + amount + 1
+
+        if EVENT == "presale" or not (buyer["allowlisted"] and MINT_RIGHTS):
+            self.token_minted_in_event += amount
+
+        # Tez sent to the multisig
+        self.balance += paid
+        if FUND_SWEEP_THRESHOLD_MUTEZ == 0 or self.balance >= FUND_SWEEP_THRESHOLD_MUTEZ:
+            if self.balance > 0:
+                operations += 1
+            self.balance = 0
+
+        self.event_user_balance[name] = self.event_user_balance.get(name, 0) + amount
+
+        for token_id in range(self.minted_tokens, self.minted_tokens + amount):
+            self.unrevealed_chunks.add(token_id // NFT.UNREVEALED_CHUNK_SIZE)
+        self.minted_tokens += amount
+        self.owner_balance[name] = self.owner_balance.get(name, 0) + amount
+        if name not in self.voting_power:
+            self.voting_power[name] = (0, level)
+        elif self.voting_power[name][1] != level:
+            self.voting_power[name] = (self.voting_power[name][0] + 1, level)
+
+        return operations
+
+
+def verify_entries(scenario, contract, entries, present):
+    for big_map, key in entries:
+        if present:
+            scenario.verify(getattr(contract.data, big_map).contains(key))
+        else:
+            scenario.verify(~getattr(contract.data, big_map).contains(key))
+
+
+########################################################################################################################
+# Scenario
+########################################################################################################################
+@sp.add_test(name="drop_simulator")
+def test():
+    rng = random.Random(SEED)
+    scenario = sp.test_scenario()
+    scenario.h1("Drop simulator")
+    scenario.table_of_contents()
+
+    admin = sp.test_account("admin")
+    multisig = sp.test_account("multisig")
+    buyers = []
+    for index in range(BUYERS):
+        name = "buyer%d" % index
+        buyers.append({"name": name, "account": sp.test_account(name), "allowlisted": rng.random() < ALLOWLIST_RATIO})
+
+    scenario.h2("Contracts")
+    sale = Sale.AngryTeenagersSale(admin.address, multisig.address, sp.utils.metadata_of_url("https://example.com"))
+    scenario += sale
+    fa2 = NFT.AngryTeenagers(administrator=admin.address,
+                             royalties_bytes=sp.utils.bytes_of_string(Config.ROYALTIES_BYTES),
+                             metadata=sp.utils.metadata_of_url("https://example.com"),
+                             generic_image_ipfs=sp.utils.bytes_of_string(Config.GENERIC_ARTWORK_IPFS_LINK),
+                             generic_image_ipfs_display=sp.utils.bytes_of_string(Config.GENERIC_DISPLAY_ARTWORK_IPFS_LINK),
+                             generic_image_ipfs_thumbnail=sp.utils.bytes_of_string(Config.GENERIC_THUMBNAIL_ARTWORK_IPFS_LINK),
+                             what3words_file_ipfs=sp.utils.bytes_of_string(Config.WHAT3WORDS_FILE_IPFS_LINK),
+                             max_supply=NFT_MAX_SUPPLY,
+                             artifact_file_type=Config.ARTIFACT_FILE_TYPE,
+                             artifact_file_size_generic=Config.ARTIFACT_FILE_SIZE,
+                             artifact_file_name=Config.ARTIFACT_FILE_NAME,
+                             artifact_dimensions=Config.ARTIFACT_DIMENSIONS,
+                             artifact_file_unit=Config.ARTIFACT_FILE_UNIT,
+                             display_file_type=Config.DISPLAY_FILE_TYPE,
+                             display_file_size_generic=Config.DISPLAY_FILE_SIZE,
+                             display_file_name=Config.DISPLAY_FILE_NAME,
+                             display_dimensions=Config.DISPLAY_DIMENSIONS,
+                             display_file_unit=Config.DISPLAY_FILE_UNIT,
+                             thumbnail_file_type=Config.THUMBNAIL_FILE_TYPE,
+                             thumbnail_file_size_generic=Config.THUMBNAIL_FILE_SIZE,
+                             thumbnail_file_name=Config.THUMBNAIL_FILE_NAME,
+                             thumbnail_dimensions=Config.THUMBNAIL_DIMENSIONS,
+                             thumbnail_file_unit=Config.THUMBNAIL_FILE_UNIT,
+                             name_prefix=Config.NAME_PREFIX,
+                             symbol=Config.SYMBOL,
+                             description=Config.DESCRIPTION,
+                             language=Config.LANGUAGE,
+                             attributes_generic=Config.ATTRIBUTES_GENERIC,
+                             rights=Config.RIGHTS,
+                             creators=Config.CREATORS,
+                             project_name=Config.PROJECTNAME,
+                             compact_token_metadata=COMPACT_TOKEN_METADATA)
+    scenario += fa2
+    sale.register_fa2(fa2.address).run(valid=True, sender=admin)
+    fa2.set_next_administrator(sale.address).run(valid=True, sender=admin)
+    fa2.validate_new_administrator().run(valid=True, sender=sale.address)
+
+    scenario.h2("Open the %s event" % EVENT)
+    sale.set_fund_sweep_threshold(sp.mutez(FUND_SWEEP_THRESHOLD_MUTEZ)).run(valid=True, sender=admin)
+    allowlist = [buyer["account"].address for buyer in buyers if buyer["allowlisted"]]
+    if allowlist:
+        sale.admin_fill_allowlist(sp.set(l=allowlist, t=sp.TAddress)).run(valid=True, sender=admin)
+    if EVENT == "presale":
+        sale.open_pre_sale(sp.record(max_supply=EVENT_MAX_SUPPLY,
+                                     max_per_user=MAX_PER_USER,
+                                     price=sp.mutez(PRICE_MUTEZ))).run(valid=True, sender=admin)
+    elif EVENT == "public":
+        sale.open_pub_sale_with_allowlist(sp.record(max_supply=EVENT_MAX_SUPPLY,
+                                                    max_per_user=MAX_PER_USER,
+                                                    price=sp.mutez(PRICE_MUTEZ),
+                                                    mint_right=MINT_RIGHTS,
+                                                    mint_discount=sp.mutez(DISCOUNT_MUTEZ))).run(valid=True, sender=admin)
+    else:
+        raise ValueError("Unknown event %s" % EVENT)
+
+    model = DropModel()
+    report = {"config": {"seed": SEED, "buyers": BUYERS, "blocks": BLOCKS, "arrival": ARRIVAL, "event": EVENT,
+                         "allowlisted": len(allowlist), "event_max_supply": EVENT_MAX_SUPPLY,
+                         "max_per_user": MAX_PER_USER, "mint_rights": MINT_RIGHTS,
+                         "fund_sweep_threshold_mutez": FUND_SWEEP_THRESHOLD_MUTEZ},
+              "blocks": []}
+
+    for block, mints in enumerate(generate_mints(rng, buyers)):
+        level = block + 1
+        scenario.h2("Block %d: %d calls" % (level, len(mints)))
+        stats = {"level": level, "calls": len(mints), "minted": 0, "operations": 0, "failed": {},
+                 "sale_new_entries": 0, "nft_new_entries": 0}
+
+        for index, amount, paid in mints:
+            buyer = buyers[index]
+            error = model.check(buyer, amount, paid)
+            if error is None:
+                sale_entries, nft_entries = model.new_entries(buyer, amount, level, sale.data.event_id)
+                verify_entries(scenario, sale, sale_entries, present=False)
+                verify_entries(scenario, fa2, nft_entries, present=False)
+            sale.user_mint(sp.record(amount=amount, address=buyer["account"].address)).run(
+                valid=error is None, exception=None if error is None else Error.error(error),
+                sender=buyer["account"], amount=sp.mutez(paid),
+                level=level, now=sp.timestamp(level * SECONDS_PER_BLOCK))
+            if error is None:
+                # The entries counted in the report are the ones the contracts actually added
+                verify_entries(scenario, sale, sale_entries, present=True)
+                verify_entries(scenario, fa2, nft_entries, present=True)
+                stats["minted"] += amount
+                stats["operations"] += model.apply(buyer, amount, paid, level)
+                stats["sale_new_entries"] += len(sale_entries)
+                stats["nft_new_entries"] += len(nft_entries)
+            else:
+                # Counted by message in both modes so that the report can be dumped in json
+                stats["failed"][error] = stats["failed"].get(error, 0) + 1
+
+        # The model and the contracts must agree at the end of each block
+        scenario.verify(sale.data.token_minted_in_event == model.token_minted_in_event)
+        scenario.verify(fa2.data.minted_tokens == model.minted_tokens)
+        scenario.verify(sale.balance == sp.mutez(model.balance))
+        for buyer in buyers:
+            if buyer["name"] in model.owner_balance:
+                scenario.verify(fa2.data.balance_of_owner[buyer["account"].address] == model.owner_balance[buyer["name"]])
+
+        scenario.p("minted: %d, internal operations: %d, failed: %s, new big map entries: sale %d, FA2 %d" %
+                   (stats["minted"], stats["operations"], stats["failed"] or "none",
+                    stats["sale_new_entries"], stats["nft_new_entries"]))
+        report["blocks"].append(stats)
+
+    report["total"] = {"minted": model.minted_tokens,
+                       "calls": sum(stats["calls"] for stats in report["blocks"]),
+                       "operations": sum(stats["operations"] for stats in report["blocks"]),
+                       "failed": sum(sum(stats["failed"].values()) for stats in report["blocks"]),
+                       "sale_new_entries": sum(stats["sale_new_entries"] for stats in report["blocks"]),
+                       "nft_new_entries": sum(stats["nft_new_entries"] for stats in report["blocks"])}
+    if REPORT:
+        with open(REPORT, "w") as report_file:
+            json.dump(report, report_file, indent=2)
@@ -0,0 +1,607 @@
+"""Gas and storage benchmark of the Angry Teenagers contracts.
+
+The SmartPy interpreter used by the unit tests does not account for gas, so the contracts are compiled with SmartPy and
+deployed in an octez-client mockup (asynchronous mode, one block baked after each operation). Every entrypoint call is
+recorded with the gas it consumed, the storage it paid for and the size of the storage after the call.
+
+In the root folder of the repository:
+    python3 ./benchmark/run_benchmark.py --output ../benchmark_report.json
+
+See the README for the options.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+from merkle_allowlist import build_allowlist
+
+TARGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_targets.py")
+
+# Must match benchmark/benchmark_targets.py
+MAJORITY_PLACEHOLDER_ADDRESS = "KT1XKLLrQW4vsRvzHMnSYiK51uPVfGXLHg9V"
+OPT_OUT_PLACEHOLDER_ADDRESS = "KT1NifZHyuq6FhnrBjKzdCEcJb1bxG8JbCLs"
+VOTE_LENGTH_BLOCKS = 2
+
+DEFAULT_TOKEN_SCALES = "1,100,1000,4900"
+DEFAULT_ALLOWLIST_SCALES = "1,100,1000,4900"
+DEFAULT_POLL_SCALES = "1,10,50"
+
+BURN_CAP = "1000"
+
+NAY = 0
+YAY = 1
+
+# Contract receiving the balance_of callbacks and the Tez sent by the mutez_transfer entrypoints
+RECEIVER_CODE = """parameter (or (list %receive_balances (pair (pair address nat) nat)) (unit %default));
+storage unit;
+code { CDR ; NIL operation ; PAIR }
+"""
+
+# Entrypoints that are not called directly by the benchmark, and why. The gas of an internal call is included in the
+# receipt of the call that triggers it.
+EXCLUDED_ENTRYPOINTS = {
+    "benchmark_sale": {
+        "admin_process_presale": "needs the deployed pilot contract with its all_tokens, get_token_owner and "
+                                 "is_token_burned views",
+    },
+    "benchmark_dao": {
+        "propose_callback": "called back by the voting contract, included in propose",
+        "next_voting_phase_callback": "called back by the opt out contract, included in end",
+        "end_callback": "called back by the voting contract, included in end",
+        "delegate": "only callable by the DAO itself, included in the end of a poll whose lambda calls it",
+        "mutez_transfer": "only callable by the DAO itself, included in the end of a poll whose lambda calls it",
+        "unlock_contract": "only callable when a voting contract never called back, which these contracts always do",
+    },
+    "benchmark_majority": {
+        "start": "called by the DAO, included in propose",
+        "vote": "called by the DAO, included in vote",
+        "end": "called by the DAO, included in end",
+    },
+    "benchmark_opt_out": {
+        "start": "called by the DAO, included in propose",
+        "vote": "called by the DAO, included in vote",
+        "end": "called by the DAO, included in end",
+        "propose_callback": "called back by the phase 2 contract, included in end",
+        "end_callback": "called back by the phase 2 contract, included in end",
+    },
+}
+
+GAS_RE = re.compile(r"Consumed gas: ([0-9.]+)")
+STORAGE_DIFF_RE = re.compile(r"Paid storage size diff: (-?[0-9]+) bytes")
+STORAGE_SIZE_RE = re.compile(r"Storage size: ([0-9]+) bytes")
+ORIGINATED_RE = re.compile(r"New contract (KT1[0-9A-Za-z]+) originated")
+KNOWN_ADDRESS_RE = re.compile(r"^(\w+): (tz[1-4][0-9A-Za-z]+)", re.MULTILINE)
+LEVEL_RE = re.compile(r'"level":\s*([0-9]+)')
+
+
+########################################################################################################################
+# Michelson literals
+########################################################################################################################
+def string(value):
+    return '"%s"' % value
+
+
+def pair(*items):
+    if len(items) == 1:
+        return items[0]
+    return "(Pair %s %s)" % (items[0], pair(*items[1:]))
+
+
+def tree(items):
+    if len(items) == 1:
+        return items[0]
+    middle = len(items) // 2
+    return "(Pair %s %s)" % (tree(items[:middle]), tree(items[middle:]))
+
+
+def record(**fields):
+    """Literal of a record using the SmartPy default layout (binary tree of the fields sorted by name)."""
+    return tree([fields[name] for name in sorted(fields)])
+
+
+def seq(items):
+    return "{ %s }" % " ; ".join(items) if items else "{}"
+
+
+def tez(mutez):
+    return "%d.%06d" % divmod(mutez, 1000000)
+
+
+def hex_bytes(value):
+    return "0x" + value.encode().hex()
+
+
+########################################################################################################################
+# Addresses
+########################################################################################################################
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+TZ1_PREFIX = bytes([6, 161, 159])
+
+
+def b58check_encode(payload):
+    payload = payload + hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    number = int.from_bytes(payload, "big")
+    encoded = ""
+    while number > 0:
+        number, remainder = divmod(number, 58)
+        encoded = B58_ALPHABET[remainder] + encoded
+    padding = len(payload) - len(payload.lstrip(b"\0"))
+    return B58_ALPHABET[0] * padding + encoded
+
+
+def b58check_decode(value):
+    number = 0
+    for char in value:
+        number = number * 58 + B58_ALPHABET.index(char)
+    padding = len(value) - len(value.lstrip(B58_ALPHABET[0]))
+    raw = b"\0" * padding + number.to_bytes((number.bit_length() + 7) // 8, "big")
+    return raw[:-4]
+
+
+def random_tz1_addresses(count, seed):
+    generator = random.Random(seed)
+    return [b58check_encode(TZ1_PREFIX + bytes(generator.getrandbits(8) for _ in range(20))) for _ in range(count)]
+
+
+def address_set(addresses):
+    """Michelson set literal. Elements shall be sorted like Michelson compares them (binary form)."""
+    return seq([string(address) for address in sorted(set(addresses), key=b58check_decode)])
+
+
+########################################################################################################################
+# octez-client mockup
+########################################################################################################################
+class Mockup:
+    def __init__(self, octez_client, base_dir, protocol, verbose):
+        self.octez_client = octez_client
+        self.base_dir = base_dir
+        self.verbose = verbose
+        create = ["create", "mockup", "--asynchronous"]
+        if protocol:
+            create = ["--protocol", protocol] + create
+        self.run(create)
+        self.accounts = dict(KNOWN_ADDRESS_RE.findall(self.run(["list", "known", "addresses"])))
+
+    def run(self, args):
+        command = [self.octez_client, "--mode", "mockup", "--base-dir", self.base_dir] + args
+        if self.verbose:
+            print(" ".join(command), file=sys.stderr)
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        if result.returncode != 0:
+            raise RuntimeError("%s failed:\n%s" % (" ".join(args[:4]), result.stdout))
+        return result.stdout
+
+    def bake(self, blocks=1):
+        for _ in range(blocks):
+            self.run(["bake", "for", "bootstrap1", "--minimal-timestamp"])
+
+    def level(self):
+        return int(LEVEL_RE.search(self.run(["rpc", "get", "/chains/main/blocks/head/header"])).group(1))
+
+    def originate(self, alias, code_file, storage):
+        receipt = self.run(["originate", "contract", alias, "transferring", "0", "from", "bootstrap1",
+                            "running", code_file, "--init", storage, "--burn-cap", BURN_CAP, "--force"])
+        self.bake()
+        return ORIGINATED_RE.search(receipt).group(1), receipt
+
+    def call(self, sender, contract, entrypoint, arg="Unit", amount="0"):
+        receipt = self.run(["transfer", amount, "from", sender, "to", contract, "--entrypoint", entrypoint,
+                            "--arg", arg, "--burn-cap", BURN_CAP])
+        self.bake()
+        return receipt
+
+
+def parse_receipt(receipt):
+    sizes = STORAGE_SIZE_RE.findall(receipt)
+    return {
+        "gas": round(sum(float(gas) for gas in GAS_RE.findall(receipt)), 3),
+        "storage_diff": sum(int(diff) for diff in STORAGE_DIFF_RE.findall(receipt)),
+        "storage_size": int(sizes[0]) if sizes else None,
+    }
+
+
+########################################################################################################################
+# Benchmark context
+########################################################################################################################
+class Benchmark:
+    def __init__(self, mockup, compiled):
+        self.mockup = mockup
+        self.compiled = compiled
+        self.results = []
+        self.admin = "bootstrap1"
+        self.receiver_address = None
+
+    def address(self, account):
+        return self.mockup.accounts[account]
+
+    def originate(self, target, alias, replacements=None):
+        code_file, storage = self.compiled[target]
+        for placeholder, address in (replacements or {}).items():
+            storage = storage.replace(placeholder, address)
+        contract, receipt = self.mockup.originate(alias, code_file, storage)
+        self.record(target, "origination", 0, receipt)
+        return contract
+
+    def receiver(self):
+        """Address of the receiver contract, originated on first use."""
+        if self.receiver_address is None:
+            code_file = os.path.join(os.path.dirname(self.mockup.base_dir), "receiver.tz")
+            with open(code_file, "w") as code:
+                code.write(RECEIVER_CODE)
+            self.receiver_address, _ = self.mockup.originate("receiver", code_file, "Unit")
+        return self.receiver_address
+
+    def call(self, contract, entrypoint, arg="Unit", sender=None, amount="0"):
+        return self.mockup.call(sender or self.admin, contract, entrypoint, arg, amount)
+
+    def measure(self, name, contract, entrypoint, scale, arg="Unit", sender=None, amount="0", label=None):
+        receipt = self.call(contract, entrypoint, arg, sender, amount)
+        self.record(name, label or entrypoint, scale, receipt)
+
+    def measure_admin(self, name, contract, admin_address):
+        """Entrypoints shared by all the contracts. The administrator hands over to itself."""
+        receiver = self.receiver()
+        self.measure(name, contract, "set_metadata", 0, record(key=string("benchmark"), value=hex_bytes("ipfs://benchmark")))
+        self.measure(name, contract, "set_next_administrator", 0, string(admin_address))
+        self.measure(name, contract, "validate_new_administrator", 0)
+        self.measure(name, contract, "mutez_transfer", 0, record(amount="0", destination=string(receiver)))
+
+    def record(self, name, entrypoint, scale, receipt):
+        result = dict(contract=name, entrypoint=entrypoint, scale=scale)
+        result.update(parse_receipt(receipt))
+        self.results.append(result)
+        print("%-20s %-32s %6d gas=%-12s storage_diff=%s" % (name, entrypoint, scale, result["gas"], result["storage_diff"]))
+
+    def mint_tokens(self, nft, owners, amount, chunk):
+        """Mint amount tokens spread over the owners with mint_batch calls of at most chunk tokens."""
+        index = 0
+        while amount > 0:
+            batch = min(chunk, amount)
+            self.call(nft, "mint_batch", pair(string(self.address(owners[index % len(owners)])), str(batch)))
+            amount -= batch
+            index += 1
+
+
+def artwork(token_id):
+    return record(artifact_uri=hex_bytes("ipfs://artifact%d" % token_id),
+                  artifact_size=hex_bytes('"425118"'),
+                  display_uri=hex_bytes("ipfs://display%d" % token_id),
+                  display_size=hex_bytes('"143913"'),
+                  thumbnail_uri=hex_bytes("ipfs://thumbnail%d" % token_id),
+                  thumbnail_size=hex_bytes('"26875"'),
+                  attributes=hex_bytes('[{"name": "benchmark"}]'))
+
+
+########################################################################################################################
+# AngryTeenagers (FA2)
+# Scale: number of tokens in the ledger
+########################################################################################################################
+def benchmark_nft(bench, scales, chunk):
+    name = "benchmark_nft"
+    nft = bench.originate(name, "nft")
+    bootstrap2, bootstrap3 = bench.address("bootstrap2"), bench.address("bootstrap3")
+    # No poll is open in this DAO so the voting power can be pruned up to the current level
+    dao = bench.originate("benchmark_dao", "nft_dao")
+    bench.measure(name, nft, "set_dao_address", 0, string(dao))
+    holders = ["bootstrap2", "bootstrap3", "bootstrap4"]
+    minted = 0
+
+    admin = bench.address("bootstrap1")
+    bench.measure_admin(name, nft, admin)
+    bench.measure(name, nft, "set_sale_contract_administrator", 0, string(admin))
+    bench.measure(name, nft, "set_artwork_administrator", 0, string(admin))
+    bench.measure(name, nft, "set_pause", 0, "True")
+    bench.measure(name, nft, "set_pause", 0, "False")
+    bench.measure(name, nft, "add_new_oracles_deposit", 0, hex_bytes("ipfs://deposit"))
+    # Only before the royalties are versioned by set_global_royalties
+    bench.measure(name, nft, "set_royalties_field", 0, hex_bytes('{"decimals": 2, "shares": {}}'))
+
+    for scale in scales:
+        bench.mint_tokens(nft, holders, scale - minted, chunk)
+        minted = scale
+
+        # Token minted here is owned by bootstrap2 and used by the calls below
+        token_id = minted
+        bench.measure(name, nft, "mint", scale, string(bootstrap2))
+        bench.measure(name, nft, "mint_batch", scale, pair(string(bootstrap2), "10"))
+        bench.measure(name, nft, "mint_batch_list", scale,
+                      seq([pair(string(bootstrap2), "5"), pair(string(bootstrap3), "5")]))
+        minted += 21
+
+        bench.measure(name, nft, "transfer", scale,
+                      seq([pair(string(bootstrap2), seq([pair(string(bootstrap3), str(token_id), "1")]))]), sender="bootstrap2")
+        bench.measure(name, nft, "transfer", scale,
+                      seq([pair(string(bootstrap3), seq([pair(string(bootstrap2), str(token_id), "1")]))]), sender="bootstrap3")
+        bench.measure(name, nft, "update_operators", scale,
+                      seq(["(Left %s)" % pair(string(bootstrap2), string(bootstrap3), str(token_id))]), sender="bootstrap2")
+        bench.measure(name, nft, "update_operators", scale,
+                      seq(["(Right %s)" % pair(string(bootstrap2), string(bootstrap3), str(token_id))]), sender="bootstrap2")
+        bench.measure(name, nft, "update_operators_for_all", scale,
+                      seq(["(Left %s)" % pair(string(bootstrap2), string(bootstrap3))]), sender="bootstrap2")
+        bench.measure(name, nft, "update_operators_for_all", scale,
+                      seq(["(Right %s)" % pair(string(bootstrap2), string(bootstrap3))]), sender="bootstrap2")
+        bench.measure(name, nft, "balance_of", scale,
+                      pair(seq([pair(string(bootstrap2), str(token_id))]), string(bench.receiver() + "%receive_balances")))
+        bench.measure(name, nft, "set_extra_token_metadata", scale,
+                      record(key=string("benchmark"), token_id=str(token_id), value=hex_bytes("benchmark")))
+        bench.measure(name, nft, "update_artwork_data", scale, seq([pair(str(token_id), artwork(token_id))]))
+        bench.measure(name, nft, "reveal_artwork_data", scale, seq([pair(str(token_id + 1), artwork(token_id + 1))]))
+        bench.measure(name, nft, "set_royalties_minted_tokens", scale, seq([str(token_id)]))
+        bench.measure(name, nft, "set_generic_artwork", scale,
+                      pair(hex_bytes("ipfs://artifact"), hex_bytes("ipfs://display"), hex_bytes("ipfs://thumbnail")))
+        bench.measure(name, nft, "prune_voting_power", scale,
+                      pair(seq([string(bootstrap2), string(bootstrap3)]), str(bench.mockup.level() - 1)))
+
+    # Once the royalties are versioned, set_royalties_field and set_royalties_minted_tokens are rejected
+    bench.measure(name, nft, "set_global_royalties", minted, hex_bytes('{"decimals": 2, "shares": {}}'))
+    bench.measure(name, nft, "set_royalties_overrides", minted, seq([pair(str(minted - 1), "(Some 0)")]))
+    # The reveal is committed for all the tokens and closes the minting
+    bench.measure(name, nft, "commit_reveal", minted, pair("0x" + "00" * 32, hex_bytes("ipfs://benchmark/"), str(minted)))
+
+
+########################################################################################################################
+# AngryTeenagersSale
+# Scale: number of addresses in the allowlist
+########################################################################################################################
+def benchmark_sale(bench, scales, chunk, seed):
+    name = "benchmark_sale"
+    nft = bench.originate("benchmark_nft", "sale_nft")
+    sale = bench.originate(name, "sale")
+    bench.call(nft, "set_sale_contract_administrator", string(sale))
+    bench.measure(name, sale, "register_fa2", 0, string(nft))
+
+    bootstrap2, bootstrap3, bootstrap4 = [bench.address(account) for account in ["bootstrap2", "bootstrap3", "bootstrap4"]]
+    addresses = random_tz1_addresses(max(scales), seed)
+    price = 1000000
+    discount = 200000
+    filled = 0
+
+    # Allowlist registration events. They can only be opened before any sale.
+    bench.measure(name, sale, "admin_fill_pre_allowlist", 0, address_set([bootstrap3]))
+    bench.measure(name, sale, "open_event_priv_allowlist_reg", 0, record(price=str(price)))
+    bench.measure(name, sale, "pay_to_enter_allowlist_priv", 0, sender="bootstrap3", amount=tez(price))
+    bench.measure(name, sale, "close_any_open_event", 0)
+    bench.measure(name, sale, "open_event_pub_allowlist_reg", 0, record(max_space="10", price=str(price)))
+    bench.measure(name, sale, "pay_to_enter_allowlist_pub", 0, sender="bootstrap4", amount=tez(price))
+    bench.call(sale, "close_any_open_event")
+
+    bench.measure_admin(name, sale, bench.address("bootstrap1"))
+    bench.measure(name, sale, "set_multisig_fund_address", 0, string(bench.address("bootstrap5")))
+
+    for scale in scales:
+        # bootstrap2 is part of the allowlist from the first chunk
+        while filled < scale:
+            batch = addresses[filled:min(filled + chunk, scale)]
+            if filled == 0:
+                batch = batch[:-1] + [bootstrap2]
+            filled += len(batch)
+            bench.measure(name, sale, "admin_fill_allowlist", filled, address_set(batch))
+
+        sale_parameters = record(max_supply="100", max_per_user="2", price=str(price))
+        bench.measure(name, sale, "open_pre_sale", scale, sale_parameters)
+        bench.measure(name, sale, "user_mint", scale, record(address=string(bootstrap2), amount="2"),
+                      sender="bootstrap2", amount=tez(2 * price))
+        bench.call(sale, "close_any_open_event")
+
+        bench.measure(name, sale, "open_pub_sale", scale, sale_parameters)
+        bench.measure(name, sale, "user_mint", scale, record(address=string(bootstrap4), amount="1"),
+                      sender="bootstrap4", amount=tez(price))
+        bench.call(sale, "close_any_open_event")
+
+        bench.measure(name, sale, "open_pub_sale_with_allowlist", scale,
+                      record(max_supply="100", max_per_user="2", price=str(price), mint_right="False",
+                             mint_discount=str(discount)))
+        bench.measure(name, sale, "user_mint", scale, record(address=string(bootstrap2), amount="1"),
+                      sender="bootstrap2", amount=tez(price - discount), label="user_mint (allowlist discount)")
+        bench.call(sale, "close_any_open_event")
+
+        bench.measure(name, sale, "mint_and_give", scale, record(address=string(bootstrap2), amount="1"))
+        bench.measure(name, sale, "mint_and_give_batch", scale,
+                      seq([pair(string(bootstrap2), "1"), pair(string(bootstrap3), "1")]))
+
+    # Pre-sale with the merkle allowlist, the Tez being kept in the contract until they are swept
+    scale = max(scales)
+    merkle = build_allowlist({bootstrap3: 2, addresses[0]: 1})
+    bench.measure(name, sale, "set_allowlist_merkle_root", scale, "(Some %s)" % merkle["root"])
+    bench.measure(name, sale, "set_fund_sweep_threshold", scale, str(10 * price))
+    bench.call(sale, "open_pre_sale", sale_parameters)
+    bench.measure(name, sale, "user_mint_with_proof", scale,
+                  record(address=string(bootstrap3), amount="2", quota="2", proof=seq(merkle["allowlist"][bootstrap3]["proof"])),
+                  sender="bootstrap3", amount=tez(2 * price))
+    bench.call(sale, "close_any_open_event")
+    bench.measure(name, sale, "sweep_funds", scale)
+    bench.call(sale, "set_fund_sweep_threshold", "0")
+
+    bench.measure(name, sale, "clear_allowlist", scale)
+
+
+########################################################################################################################
+# AngryTeenagersDao, DaoMajorityVoting and DaoOptOutVoting
+# Scale: number of polls already ended
+########################################################################################################################
+def proposal(title, voting_strategy, proposal_lambda="None"):
+    return pair(string(title), string("ipfs://benchmark"), string("benchmark"), proposal_lambda, str(voting_strategy))
+
+
+def dao_lambda(dao, baker, receiver):
+    """Proposal lambda making the DAO call its own delegate and mutez_transfer entrypoints."""
+    return ("(Some { DROP ; NIL operation ; "
+            "PUSH address %s ; CONTRACT %%delegate (option key_hash) ; IF_NONE { PUSH string \"delegate\" ; FAILWITH } {} ; "
+            "PUSH mutez 0 ; PUSH (option key_hash) (Some %s) ; TRANSFER_TOKENS ; CONS ; "
+            "PUSH address %s ; CONTRACT %%mutez_transfer (pair mutez address) ; "
+            "IF_NONE { PUSH string \"mutez_transfer\" ; FAILWITH } {} ; "
+            "PUSH mutez 0 ; PUSH (pair mutez address) (Pair 0 %s) ; TRANSFER_TOKENS ; CONS })"
+            % (string(dao), string(baker), string(dao), string(receiver)))
+
+
+def vote(proposal_id, vote_value):
+    return record(proposal_id=str(proposal_id), vote_value=str(vote_value))
+
+
+def benchmark_dao(bench, scales):
+    nft = bench.originate("benchmark_nft", "dao_nft")
+    majority = bench.originate("benchmark_majority", "majority")
+    phase_2_majority = bench.originate("benchmark_majority", "phase_2_majority")
+    opt_out = bench.originate("benchmark_opt_out", "opt_out")
+    dao = bench.originate("benchmark_dao", "dao", {MAJORITY_PLACEHOLDER_ADDRESS: majority,
+                                                   OPT_OUT_PLACEHOLDER_ADDRESS: opt_out})
+
+    bench.measure("benchmark_majority", majority, "set_poll_leader", 0, string(dao))
+    bench.call(phase_2_majority, "set_poll_leader", string(opt_out))
+    bench.measure("benchmark_opt_out", opt_out, "set_poll_leader", 0, string(dao))
+    bench.measure("benchmark_opt_out", opt_out, "set_phase_2_contract", 0, string(phase_2_majority))
+    bench.measure("benchmark_dao", dao, "register_angry_teenager_fa2", 0, string(nft))
+
+    admin = bench.address("bootstrap1")
+    bench.measure_admin("benchmark_majority", majority, admin)
+    bench.measure_admin("benchmark_opt_out", opt_out, admin)
+    bench.measure("benchmark_dao", dao, "default", 0, amount="1")
+    bench.measure("benchmark_dao", dao, "set_metadata", 0, record(key=string("benchmark"), value=hex_bytes("ipfs://benchmark")))
+    bench.measure("benchmark_dao", dao, "set_next_administrator", 0, string(admin))
+    bench.measure("benchmark_dao", dao, "validate_new_administrator", 0)
+    bench.measure("benchmark_dao", dao, "add_voting_strategy", 0,
+                  record(id="2", name=string("MajorityVoteBis"), address=string(phase_2_majority)))
+
+    # bootstrap2 holds enough voting power to object in the opt out vote and send it to phase 2
+    bench.mint_tokens(nft, ["bootstrap2", "bootstrap3", "bootstrap4"], 30, 10)
+
+    ended = 0
+    proposal_id = 0
+    for scale in scales:
+        while ended < scale:
+            measured = ended + 1 == scale
+            if ended % 2 == 0:
+                majority_poll(bench, dao, proposal_id, scale if measured else None)
+            else:
+                opt_out_poll(bench, dao, proposal_id, scale if measured else None)
+            proposal_id += 1
+            ended += 1
+
+    # Accepted proposal whose lambda calls delegate and mutez_transfer of the DAO
+    scale = max(scales)
+    proposal_lambda = dao_lambda(dao, bench.address("bootstrap1"), bench.receiver())
+    bench.measure("benchmark_dao", dao, "propose", scale, proposal("lambda %d" % proposal_id, 0, proposal_lambda),
+                  label="propose (lambda)")
+    for voter in ["bootstrap2", "bootstrap3", "bootstrap4"]:
+        bench.call(dao, "vote", vote(proposal_id, YAY), voter)
+    bench.mockup.bake(VOTE_LENGTH_BLOCKS)
+    bench.measure("benchmark_dao", dao, "end", scale, str(proposal_id), label="end (lambda)")
+    proposal_id += 1
+
+    # Proposal whose lambda is declared malformed by the admin
+    bench.call(dao, "propose", proposal("malformed %d" % proposal_id, 0, proposal_lambda))
+    bench.mockup.bake(VOTE_LENGTH_BLOCKS + 1)
+    bench.measure("benchmark_dao", dao, "end_with_malformed_lambda", scale,
+                  record(proposal_id=str(proposal_id),
+                         lambda_error=record(description_link=string("ipfs://benchmark"), hash_description=string("benchmark"))))
+
+
+def dao_call(bench, dao, entrypoint, arg, scale, sender=None):
+    if scale is None:
+        bench.call(dao, entrypoint, arg, sender)
+    else:
+        bench.measure("benchmark_dao", dao, entrypoint, scale, arg, sender)
+
+
+def majority_poll(bench, dao, proposal_id, scale):
+    dao_call(bench, dao, "propose", proposal("majority %d" % proposal_id, 0), scale)
+    dao_call(bench, dao, "vote", vote(proposal_id, YAY), scale, "bootstrap2")
+    dao_call(bench, dao, "vote", vote(proposal_id, NAY), scale, "bootstrap3")
+    bench.mockup.bake(VOTE_LENGTH_BLOCKS)
+    dao_call(bench, dao, "end", str(proposal_id), scale)
+
+
+def opt_out_poll(bench, dao, proposal_id, scale):
+    dao_call(bench, dao, "propose", proposal("opt out %d" % proposal_id, 1), scale)
+    dao_call(bench, dao, "vote", vote(proposal_id, NAY), scale, "bootstrap2")
+    bench.mockup.bake(VOTE_LENGTH_BLOCKS)
+    # The objection moves the poll to the phase 2 majority vote
+    dao_call(bench, dao, "end", str(proposal_id), scale)
+    dao_call(bench, dao, "vote", vote(proposal_id, YAY), scale, "bootstrap3")
+    bench.mockup.bake(VOTE_LENGTH_BLOCKS + 1)
+    dao_call(bench, dao, "end", str(proposal_id), scale)
+
+
+########################################################################################################################
+# Compilation
+########################################################################################################################
+def compile_targets(smartpy, output_dir, max_supply):
+    env = dict(os.environ)
+    env.setdefault("BENCHMARK_NFT_MAX_SUPPLY", str(max_supply))
+    subprocess.run([smartpy, "compile", TARGETS_FILE, output_dir], check=True, env=env)
+
+    compiled = {}
+    for target in ["benchmark_nft", "benchmark_sale", "benchmark_dao", "benchmark_majority", "benchmark_opt_out"]:
+        code_file = glob.glob(os.path.join(output_dir, target, "*_contract.tz"))[0]
+        with open(glob.glob(os.path.join(output_dir, target, "*_storage.tz"))[0]) as storage_file:
+            compiled[target] = (code_file, storage_file.read().strip())
+    return compiled
+
+
+def parse_scales(value):
+    return sorted(int(scale) for scale in value.split(","))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas and storage benchmark of the Angry Teenagers contracts")
+    parser.add_argument("--output", default="benchmark_report.json", help="JSON report to write")
+    parser.add_argument("--smartpy", default=os.environ.get("SMARTPY", "smartpy"), help="SmartPy CLI")
+    parser.add_argument("--octez-client", default=os.environ.get("OCTEZ_CLIENT", "octez-client"), help="octez-client binary")
+    parser.add_argument("--protocol", default=None, help="Protocol hash of the mockup (default: octez-client default)")
+    parser.add_argument("--work-dir", default=None, help="Folder for the compilation and the mockup (default: temporary)")
+    parser.add_argument("--token-scales", default=DEFAULT_TOKEN_SCALES, help="Number of tokens minted before measuring")
+    parser.add_argument("--allowlist-scales", default=DEFAULT_ALLOWLIST_SCALES, help="Allowlist sizes")
+    parser.add_argument("--poll-scales", default=DEFAULT_POLL_SCALES, help="Number of polls ended before measuring")
+    parser.add_argument("--chunk", type=int, default=100, help="Tokens or addresses per setup call")
+    parser.add_argument("--contracts", default="nft,sale,dao", help="Benchmarks to run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated allowlist addresses")
+    parser.add_argument("--verbose", action="store_true", help="Print the octez-client commands")
+    args = parser.parse_args()
+
+    token_scales = parse_scales(args.token_scales)
+    allowlist_scales = parse_scales(args.allowlist_scales)
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="angry_teenagers_benchmark_")
+    # Room for the tokens minted by the measured calls
+    max_supply = max(max(token_scales) + 21 * len(token_scales), 7 * len(allowlist_scales) + 2) + 100
+
+    compiled = compile_targets(args.smartpy, os.path.join(work_dir, "compilation"), max_supply)
+    mockup = Mockup(args.octez_client, os.path.join(work_dir, "mockup"), args.protocol, args.verbose)
+    bench = Benchmark(mockup, compiled)
+
+    contracts = args.contracts.split(",")
+    if "nft" in contracts:
+        benchmark_nft(bench, token_scales, args.chunk)
+    if "sale" in contracts:
+        benchmark_sale(bench, allowlist_scales, args.chunk, args.seed)
+    if "dao" in contracts:
+        benchmark_dao(bench, parse_scales(args.poll_scales))
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "octez_client": subprocess.run([args.octez_client, "--version"], stdout=subprocess.PIPE,
+                                           universal_newlines=True).stdout.strip(),
+            "protocol": args.protocol,
+            "token_scales": token_scales,
+            "allowlist_scales": allowlist_scales,
+            "poll_scales": parse_scales(args.poll_scales),
+        },
+        "excluded": EXCLUDED_ENTRYPOINTS,
+        "results": bench.results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print("Report written to %s" % args.output)
+
+
+if __name__ == "__main__":
+    main()
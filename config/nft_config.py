@@ -38,3 +38,7 @@ ATTRIBUTES_GENERIC = '[{\"name\"}, {\"generic\"}]'
 RIGHTS = "© 2022 EcoMint. All rights reserved."
 CREATORS = '["KT1XmjJdFxUzuCJJVMyrXxS23hQrVtqSnhTH"]'
 PROJECTNAME = "Nsomyam Ye Reforestation"
+
+# Store only the per token data and build the token metadata in the token_metadata offchain view. The token_metadata
+# big map then stays empty: only enable it if the wallets and indexers of the collection use the offchain view.
+COMPACT_TOKEN_METADATA = False
@@ -38,3 +38,6 @@ ATTRIBUTES_GENERIC = '[{\"name\"}, {\"generic\"}]'
 RIGHTS = "©2023 EcoMint. All rights reserved."
 CREATORS = '["KT1XmjJdFxUzuCJJVMyrXxS23hQrVtqSnhTH"]'
 PROJECTNAME = "Nsomyam Ye Reforestation - Pilot"
+
+# Store only the per token data and build the token metadata in the token_metadata offchain view
+COMPACT_TOKEN_METADATA = False
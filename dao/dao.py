@@ -112,6 +112,8 @@ class AngryTeenagersDao(sp.Contract):
           , "homepage": "https://www.angryteenagers.xyz"
           , "views": list_of_views
       }
+      if Error.NUMERIC_ERRORS:
+          metadata_base["errors"] = Error.tzip16_errors()
       self.init_metadata("metadata_base", metadata_base)
 
 ################################################################
@@ -446,7 +448,7 @@ class AngryTeenagersDao(sp.Contract):
             sp.TNat,
             self.data.ongoing_poll.open_some().voting_strategy_address,
             "start"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         self.call(voteContractHandle, total_available_voters)
 
@@ -455,7 +457,7 @@ class AngryTeenagersDao(sp.Contract):
             InterfaceType.VOTING_STRATEGY_VOTE_TYPE,
             self.data.ongoing_poll.open_some().voting_strategy_address,
             "vote"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         voteContractArg = sp.record(
                 votes=votes, address=address, vote_value=vote_value, vote_id=self.data.ongoing_poll.open_some().voting_id
@@ -468,11 +470,26 @@ class AngryTeenagersDao(sp.Contract):
             sp.TNat,
             self.data.ongoing_poll.open_some().voting_strategy_address,
             "end"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         voteContractArg = self.data.ongoing_poll.open_some().voting_id
         self.call(voteContractHandle, voteContractArg)
 
+########################################################################################################################
+########################################################################################################################
+# Onchain views
+########################################################################################################################
+########################################################################################################################
+    @sp.onchain_view(pure=True)
+    def get_oldest_snapshot_level(self):
+        """Snapshot level of the oldest poll still open, none if no poll is open.
+        The NFT contract does not prune its voting power above this level.
+        """
+        result = sp.local('result', sp.none, t=sp.TOption(sp.TNat))
+        sp.if self.data.ongoing_poll.is_some():
+            result.value = sp.some(self.data.ongoing_poll.open_some().snapshot_block)
+        sp.result(result.value)
+
 ########################################################################################################################
 ########################################################################################################################
 # Offchain views
@@ -168,6 +168,8 @@ class DaoMajorityVoting(sp.Contract):
           , "homepage": "https://www.angryteenagers.xyz"
           , "views": list_of_views
       }
+      if Error.NUMERIC_ERRORS:
+          metadata_base["errors"] = Error.tzip16_errors()
       self.init_metadata("metadata_base", metadata_base)
 
 ################################################################
@@ -380,7 +382,7 @@ class DaoMajorityVoting(sp.Contract):
         leaderContractHandle = sp.contract(sp.TNat,
             self.data.poll_leader.open_some(),
             "propose_callback"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         leaderContractArg = self.data.poll_descriptor.open_some().vote_id
         self.call(leaderContractHandle, leaderContractArg)
@@ -390,7 +392,7 @@ class DaoMajorityVoting(sp.Contract):
             InterfaceType.END_CALLBACK_TYPE,
             self.data.poll_leader.open_some(),
             "end_callback"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         leaderContractArg = sp.record(
             vote_id=self.data.poll_descriptor.open_some().vote_id,
@@ -165,6 +165,8 @@ class DaoOptOutVoting(sp.Contract):
           , "homepage": "https://www.angryteenagers.xyz"
           , "views": list_of_views
       }
+      if Error.NUMERIC_ERRORS:
+          metadata_base["errors"] = Error.tzip16_errors()
       self.init_metadata("metadata_base", metadata_base)
 
 ################################################################
@@ -386,7 +388,7 @@ class DaoOptOutVoting(sp.Contract):
             sp.TNat,
             self.data.poll_leader.open_some(),
             "propose_callback"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         leaderContractArg = self.data.poll_descriptor.open_some().vote_id
         self.call(leaderContractHandle, leaderContractArg)
@@ -396,7 +398,7 @@ class DaoOptOutVoting(sp.Contract):
             InterfaceType.END_CALLBACK_TYPE,
             self.data.poll_leader.open_some(),
             "end_callback"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         leaderContractArg = sp.record(
             vote_id=self.data.poll_descriptor.open_some().vote_id,
@@ -410,7 +412,7 @@ class DaoOptOutVoting(sp.Contract):
             sp.TNat,
             self.data.poll_leader.open_some(),
             "next_voting_phase_callback"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         leaderContractArg = self.data.poll_descriptor.open_some().vote_id
         self.call(leaderContractHandle, leaderContractArg)
@@ -420,7 +422,7 @@ class DaoOptOutVoting(sp.Contract):
             InterfaceType.VOTING_STRATEGY_VOTE_TYPE,
             self.data.phase_2_majority_vote_contract.open_some(),
             "vote"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         voteContractArg = sp.record(
                 votes=votes, address=address, vote_value=vote_value, vote_id=self.data.poll_descriptor.open_some().phase_2_vote_id
@@ -433,7 +435,7 @@ class DaoOptOutVoting(sp.Contract):
             sp.TNat,
             self.data.phase_2_majority_vote_contract.open_some(),
             "start"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         self.call(voteContractHandle, total_available_voters)
 
@@ -500,7 +502,7 @@ class DaoOptOutVoting(sp.Contract):
             sp.TNat,
             self.data.phase_2_majority_vote_contract.open_some(),
             "end"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         voteContractArg = self.data.poll_descriptor.open_some().phase_2_vote_id
         self.call(voteContractHandle, voteContractArg)
@@ -0,0 +1,96 @@
+"""Numeric codes of the errors of the Angry Teenagers contracts.
+
+The contracts compiled with ANGRY_TEENAGERS_NUMERIC_ERRORS=1 fail with the code of an error instead of its message (see
+./helper/errors.py). The FA2_* errors of TZIP-12 are never replaced by a code.
+
+This module does not depend on SmartPy so that the frontend tools and the indexers can use it to decode an error:
+    python3 ./helper/error_codes.py 4 12
+The lookup table is exported in ./helper/error_codes.json with:
+    python3 ./helper/error_codes.py --json ./helper/error_codes.json
+"""
+import argparse
+import json
+import sys
+
+# The code of an error is its index in this list: new errors shall only be appended, a code is never reused.
+ERROR_MESSAGES = [
+    "ANGRY_TEENAGERS_UNAUTHORISED_USER",           # 0
+    "ANGRY_TEENAGERS_PAUSED",                      # 1
+    "ANGRY_TEENAGERS_NOT_ADMIN",                   # 2
+    "ANGRY_TEENAGERS_NO_NEXT_ADMIN",               # 3
+    "ANGRY_TEENAGERS_NO_LAND_AVAILABLE",           # 4
+    "ANGRY_TEENAGERS_BALANCE_INCONSISTENCY",       # 5
+    "ANGRY_TEENAGERS_SALE_EVENT_ALREADY_OPEN",     # 6
+    "ANGRY_TEENAGERS_SALE_NO_EVENT_OPEN",          # 7
+    "ANGRY_TEENAGERS_SALE_INVALID_DEADLINE",       # 8
+    "ANGRY_TEENAGERS_FORBIDDEN_OPERATION",         # 9
+    "ANGRY_TEENAGERS_INVALID_PARAMETER",           # 10
+    "ANGRY_TEENAGERS_NO_SPACE_REMAINING",          # 11
+    "ANGRY_TEENAGERS_NO_TOKEN",                    # 12
+    "ANGRY_TEENAGERS_INVALID_AMOUNT",              # 13
+    "ANGRY_TEENAGERS_INTERNAL_ERROR",              # 14
+    "ANGRY_TEENAGERS_DAO_VOTE_IN_PROGRESS",        # 15
+    "ANGRY_TEENAGERS_DAO_ONLY_FOR_DAO",            # 16
+    "ANGRY_TEENAGERS_DAO_ALREADY_REGISTERED",      # 17
+    "ANGRY_TEENAGERS_DAO_NOT_REGISTERED",          # 18
+    "ANGRY_TEENAGERS_DAO_INVALID_VOTING_STRAT",    # 19
+    "ANGRY_TEENAGERS_DAO_INVALID_TOKEN_VIEW",      # 20
+    "ANGRY_TEENAGERS_DAO_NO_VOTING_POWER",         # 21
+    "ANGRY_TEENAGERS_DAO_NO_VOTE_OPEN",            # 22
+    "ANGRY_TEENAGERS_DAO_NO_VOTER_INFO",           # 23
+    "ANGRY_TEENAGERS_DAO_NO_POLL_DESCRIPTOR",      # 24
+    "ANGRY_TEENAGERS_DAO_POLL_DESCRIPTOR_DEFINED", # 25
+    "ANGRY_TEENAGERS_DAO_VOTE_NOT_YET_OPEN",       # 26
+    "ANGRY_TEENAGERS_DAO_VOTE_PERIOD_IS_OVER",     # 27
+    "ANGRY_TEENAGERS_DAO_INVALID_PROPOSAL",        # 28
+    "ANGRY_TEENAGERS_DAO_INVALID_OUTCOME_ID",      # 29
+    "ANGRY_TEENAGERS_DAO_VOTE_ALREADY_RECEIVED",   # 30
+    "ANGRY_TEENAGERS_DAO_INVALID_VOTE_ID",         # 31
+    "ANGRY_TEENAGERS_DAO_INVALID_VOTE_VALUE",      # 32
+    "ANGRY_TEENAGERS_DAO_NO_LAMBDA_IN_PROPOSAL",   # 33
+    "ANGRY_TEENAGERS_DAO_TOO_EARLY_FOR_UNLOCK",    # 34
+    "ANGRY_TEENAGERS_INVALID_TOKEN_METADATA",      # 35
+    "ANGRY_TEENAGERS_TOKEN_REVEALED",              # 36
+    "ANGRY_TEENAGERS_VOTING_POWER_PRUNED",         # 37
+    "ANGRY_TEENAGERS_SALE_INVALID_PROOF",          # 38
+    "ANGRY_TEENAGERS_ROYALTIES_VERSIONED",         # 39
+    "ANGRY_TEENAGERS_INTERFACE_MISMATCH",          # 40
+]
+
+ERROR_CODES = {message: code for code, message in enumerate(ERROR_MESSAGES)}
+
+
+def decode(code):
+    """Message of an error code, or the error itself if it is already a message (FA2 errors, string mode)."""
+    if isinstance(code, str) and not code.isdigit():
+        return code
+    code = int(code)
+    if code < 0 or code >= len(ERROR_MESSAGES):
+        raise ValueError("Unknown error code %d" % code)
+    return ERROR_MESSAGES[code]
+
+
+def table():
+    return {str(code): message for code, message in enumerate(ERROR_MESSAGES)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode the numeric error codes of the Angry Teenagers contracts")
+    parser.add_argument("codes", nargs="*", help="Error codes to decode")
+    parser.add_argument("--json", default=None, help="Write the lookup table of all the codes in this JSON file")
+    args = parser.parse_args()
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(table(), output, indent=2)
+            output.write("\n")
+    for code in args.codes:
+        try:
+            print("%s: %s" % (code, decode(code)))
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,25 @@
+import os
 import smartpy as sp
 
+ErrorCodes = sp.io.import_script_from_url("file:./helper/error_codes.py")
+
+# Compile with ANGRY_TEENAGERS_NUMERIC_ERRORS=1 to fail with the nat code of each ANGRY_TEENAGERS_* error (see
+# ./helper/error_codes.py) instead of its message. It makes the contracts smaller and cheaper to originate and call.
+NUMERIC_ERRORS = os.environ.get("ANGRY_TEENAGERS_NUMERIC_ERRORS", "0") == "1"
+
+
+def error(message):
+    if NUMERIC_ERRORS:
+        return sp.nat(ErrorCodes.ERROR_CODES[message])
+    return message
+
+
+def tzip16_errors():
+    """Error translations of the TZIP-16 metadata, for the wallets and indexers to display the messages."""
+    return [{"error": {"int": str(code)}, "expansion": {"string": message}, "languages": ["en"]}
+            for code, message in enumerate(ErrorCodes.ERROR_MESSAGES)]
+
+
 class Fa2ErrorMessage:
     def token_undefined():        return "FA2_TOKEN_UNDEFINED"
     def not_operator():           return "FA2_NOT_OPERATOR"
@@ -8,40 +28,44 @@ class Fa2ErrorMessage:
 
 
 class ErrorMessage:
-    def unauthorized_user():         return "ANGRY_TEENAGERS_UNAUTHORISED_USER"
-    def paused():                    return "ANGRY_TEENAGERS_PAUSED"
-    def not_admin():                 return "ANGRY_TEENAGERS_NOT_ADMIN"
-    def no_next_admin():             return "ANGRY_TEENAGERS_NO_NEXT_ADMIN"
-    def no_land_available():         return "ANGRY_TEENAGERS_NO_LAND_AVAILABLE"
-    def balance_inconsistency():     return "ANGRY_TEENAGERS_BALANCE_INCONSISTENCY"
-    def sale_event_already_open():   return "ANGRY_TEENAGERS_SALE_EVENT_ALREADY_OPEN"
-    def sale_no_event_open():        return "ANGRY_TEENAGERS_SALE_NO_EVENT_OPEN"
-    def sale_invalid_deadline():     return "ANGRY_TEENAGERS_SALE_INVALID_DEADLINE"
-    def forbidden_operation():       return "ANGRY_TEENAGERS_FORBIDDEN_OPERATION"
-    def invalid_parameter():         return "ANGRY_TEENAGERS_INVALID_PARAMETER"
-    def sale_no_space_remaining():   return "ANGRY_TEENAGERS_NO_SPACE_REMAINING"
-    def sale_no_token():             return "ANGRY_TEENAGERS_NO_TOKEN"
-    def invalid_amount():            return "ANGRY_TEENAGERS_INVALID_AMOUNT"
-    def internal_error():            return "ANGRY_TEENAGERS_INTERNAL_ERROR"
-    def dao_vote_in_progress():      return "ANGRY_TEENAGERS_DAO_VOTE_IN_PROGRESS"
-    def dao_only_for_dao():          return "ANGRY_TEENAGERS_DAO_ONLY_FOR_DAO"
-    def dao_already_registered():    return "ANGRY_TEENAGERS_DAO_ALREADY_REGISTERED"
-    def dao_not_registered():        return "ANGRY_TEENAGERS_DAO_NOT_REGISTERED"
-    def dao_invalid_voting_strat():  return "ANGRY_TEENAGERS_DAO_INVALID_VOTING_STRAT"
-    def dao_invalid_token_view():    return "ANGRY_TEENAGERS_DAO_INVALID_TOKEN_VIEW"
-    def dao_no_voting_power():       return "ANGRY_TEENAGERS_DAO_NO_VOTING_POWER"
-    def dao_no_vote_open():          return "ANGRY_TEENAGERS_DAO_NO_VOTE_OPEN"
-    def dao_no_voter_info():         return "ANGRY_TEENAGERS_DAO_NO_VOTER_INFO"
-    def dao_no_poll_descriptor():    return "ANGRY_TEENAGERS_DAO_NO_POLL_DESCRIPTOR"
-    def dao_poll_descriptor_defined(): return "ANGRY_TEENAGERS_DAO_POLL_DESCRIPTOR_DEFINED"
-    def dao_vote_not_yet_open():     return "ANGRY_TEENAGERS_DAO_VOTE_NOT_YET_OPEN"
-    def dao_vote_period_is_over():      return "ANGRY_TEENAGERS_DAO_VOTE_PERIOD_IS_OVER"
-    def dao_no_invalid_proposal():   return "ANGRY_TEENAGERS_DAO_INVALID_PROPOSAL"
-    def dao_invalid_outcome_id():    return "ANGRY_TEENAGERS_DAO_INVALID_OUTCOME_ID"
-    def dao_vote_already_received(): return "ANGRY_TEENAGERS_DAO_VOTE_ALREADY_RECEIVED"
-    def dao_invalid_vote_id():       return "ANGRY_TEENAGERS_DAO_INVALID_VOTE_ID"
-    def dao_invalid_vote_value():    return "ANGRY_TEENAGERS_DAO_INVALID_VOTE_VALUE"
-    def dao_no_lambda_in_proposal(): return "ANGRY_TEENAGERS_DAO_NO_LAMBDA_IN_PROPOSAL"
-    def dao_too_early_for_unlock():  return "ANGRY_TEENAGERS_DAO_TOO_EARLY_FOR_UNLOCK"
-    def invalid_token_metadata():    return "ANGRY_TEENAGERS_INVALID_TOKEN_METADATA"
-    def token_revealed():            return "ANGRY_TEENAGERS_TOKEN_REVEALED"
+    def unauthorized_user():         return error("ANGRY_TEENAGERS_UNAUTHORISED_USER")
+    def paused():                    return error("ANGRY_TEENAGERS_PAUSED")
+    def not_admin():                 return error("ANGRY_TEENAGERS_NOT_ADMIN")
+    def no_next_admin():             return error("ANGRY_TEENAGERS_NO_NEXT_ADMIN")
+    def no_land_available():         return error("ANGRY_TEENAGERS_NO_LAND_AVAILABLE")
+    def balance_inconsistency():     return error("ANGRY_TEENAGERS_BALANCE_INCONSISTENCY")
+    def sale_event_already_open():   return error("ANGRY_TEENAGERS_SALE_EVENT_ALREADY_OPEN")
+    def sale_no_event_open():        return error("ANGRY_TEENAGERS_SALE_NO_EVENT_OPEN")
+    def sale_invalid_deadline():     return error("ANGRY_TEENAGERS_SALE_INVALID_DEADLINE")
+    def forbidden_operation():       return error("ANGRY_TEENAGERS_FORBIDDEN_OPERATION")
+    def invalid_parameter():         return error("ANGRY_TEENAGERS_INVALID_PARAMETER")
+    def sale_no_space_remaining():   return error("ANGRY_TEENAGERS_NO_SPACE_REMAINING")
+    def sale_no_token():             return error("ANGRY_TEENAGERS_NO_TOKEN")
+    def invalid_amount():            return error("ANGRY_TEENAGERS_INVALID_AMOUNT")
+    def internal_error():            return error("ANGRY_TEENAGERS_INTERNAL_ERROR")
+    def dao_vote_in_progress():      return error("ANGRY_TEENAGERS_DAO_VOTE_IN_PROGRESS")
+    def dao_only_for_dao():          return error("ANGRY_TEENAGERS_DAO_ONLY_FOR_DAO")
+    def dao_already_registered():    return error("ANGRY_TEENAGERS_DAO_ALREADY_REGISTERED")
+    def dao_not_registered():        return error("ANGRY_TEENAGERS_DAO_NOT_REGISTERED")
+    def dao_invalid_voting_strat():  return error("ANGRY_TEENAGERS_DAO_INVALID_VOTING_STRAT")
+    def dao_invalid_token_view():    return error("ANGRY_TEENAGERS_DAO_INVALID_TOKEN_VIEW")
+    def dao_no_voting_power():       return error("ANGRY_TEENAGERS_DAO_NO_VOTING_POWER")
+    def dao_no_vote_open():          return error("ANGRY_TEENAGERS_DAO_NO_VOTE_OPEN")
+    def dao_no_voter_info():         return error("ANGRY_TEENAGERS_DAO_NO_VOTER_INFO")
+    def dao_no_poll_descriptor():    return error("ANGRY_TEENAGERS_DAO_NO_POLL_DESCRIPTOR")
+    def dao_poll_descriptor_defined(): return error("ANGRY_TEENAGERS_DAO_POLL_DESCRIPTOR_DEFINED")
+    def dao_vote_not_yet_open():     return error("ANGRY_TEENAGERS_DAO_VOTE_NOT_YET_OPEN")
+    def dao_vote_period_is_over():      return error("ANGRY_TEENAGERS_DAO_VOTE_PERIOD_IS_OVER")
+    def dao_no_invalid_proposal():   return error("ANGRY_TEENAGERS_DAO_INVALID_PROPOSAL")
+    def dao_invalid_outcome_id():    return error("ANGRY_TEENAGERS_DAO_INVALID_OUTCOME_ID")
+    def dao_vote_already_received(): return error("ANGRY_TEENAGERS_DAO_VOTE_ALREADY_RECEIVED")
+    def dao_invalid_vote_id():       return error("ANGRY_TEENAGERS_DAO_INVALID_VOTE_ID")
+    def dao_invalid_vote_value():    return error("ANGRY_TEENAGERS_DAO_INVALID_VOTE_VALUE")
+    def dao_no_lambda_in_proposal(): return error("ANGRY_TEENAGERS_DAO_NO_LAMBDA_IN_PROPOSAL")
+    def dao_too_early_for_unlock():  return error("ANGRY_TEENAGERS_DAO_TOO_EARLY_FOR_UNLOCK")
+    def invalid_token_metadata():    return error("ANGRY_TEENAGERS_INVALID_TOKEN_METADATA")
+    def token_revealed():            return error("ANGRY_TEENAGERS_TOKEN_REVEALED")
+    def voting_power_pruned():       return error("ANGRY_TEENAGERS_VOTING_POWER_PRUNED")
+    def sale_invalid_proof():        return error("ANGRY_TEENAGERS_SALE_INVALID_PROOF")
+    def royalties_versioned():       return error("ANGRY_TEENAGERS_ROYALTIES_VERSIONED")
+    def interface_mismatch():        return error("ANGRY_TEENAGERS_INTERFACE_MISMATCH")
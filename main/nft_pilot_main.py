@@ -40,4 +40,5 @@ sp.add_compilation_target(Config.CONTRACT_NAME,
                               attributes_generic=Config.ATTRIBUTES_GENERIC,
                               rights=Config.RIGHTS,
                               creators=Config.CREATORS,
-                              project_name=Config.PROJECTNAME))
+                              project_name=Config.PROJECTNAME,
+                              compact_token_metadata=Config.COMPACT_TOKEN_METADATA))
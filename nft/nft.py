@@ -16,8 +16,24 @@ TRANSFER_TX_TYPE = sp.TRecord(to_=sp.TAddress, token_id=TOKEN_ID, amount=sp.TNat
 TRANSFER_TYPE = sp.TRecord(from_=sp.TAddress, txs=sp.TList(TRANSFER_TX_TYPE)).layout(("from_", "txs"))
 TRANSFER_FUNCTION_TYPE = sp.TList(TRANSFER_TYPE)
 OPERATOR_TYPE = sp.TRecord(owner=sp.TAddress, operator=sp.TAddress, token_id=TOKEN_ID).layout(("owner", ("operator", "token_id")))
+OPERATOR_FOR_ALL_TYPE = sp.TRecord(owner=sp.TAddress, operator=sp.TAddress).layout(("owner", "operator"))
 ARTWORKS_CONTAINER_FUNCTION_TYPE = sp.TRecord(artifact_uri=sp.TBytes, artifact_size=sp.TBytes, display_uri=sp.TBytes, display_size=sp.TBytes, thumbnail_uri=sp.TBytes, thumbnail_size=sp.TBytes, attributes=sp.TBytes)
 UPDATE_ARTWORK_METADATA_FUNCTION_TYPE = sp.TList(sp.TPair(TOKEN_ID, ARTWORKS_CONTAINER_FUNCTION_TYPE))
+# Merkle root of the final metadata of all the tokens and the IPFS directory of their metadata files
+REVEAL_COMMITMENT_TYPE = sp.TRecord(root=sp.TBytes, base_uri=sp.TBytes, size=sp.TNat).layout(("root", ("base_uri", "size")))
+VERIFY_REVEALED_METADATA_PARAM_TYPE = sp.TRecord(token_id=TOKEN_ID, metadata_hash=sp.TBytes, proof=sp.TList(sp.TBytes)).layout(("token_id", ("metadata_hash", "proof")))
+MINT_BATCH_FUNCTION_TYPE = sp.TRecord(address=sp.TAddress, amount=sp.TNat).layout(("address", "amount"))
+MINT_BATCH_LIST_FUNCTION_TYPE = sp.TList(MINT_BATCH_FUNCTION_TYPE)
+GENERIC_ARTWORK_FUNCTION_TYPE = sp.TRecord(artifact_uri=sp.TBytes, display_uri=sp.TBytes, thumbnail_uri=sp.TBytes).layout(("artifact_uri", ("display_uri", "thumbnail_uri")))
+OWNER_TOKENS_PAGE_PARAM_TYPE = sp.TRecord(owner=sp.TAddress, offset=sp.TNat, limit=sp.TNat).layout(("owner", ("offset", "limit")))
+TOKEN_PAGE_TYPE = sp.TRecord(tokens=sp.TList(TOKEN_ID), next_offset=sp.TOption(sp.TNat)).layout(("tokens", "next_offset"))
+PAGE_PARAM_TYPE = sp.TRecord(offset=sp.TNat, limit=sp.TNat).layout(("offset", "limit"))
+# Number of tokens per chunk of the unrevealed tokens bitmap
+UNREVEALED_CHUNK_SIZE = 256
+ROYALTIES_OVERRIDES_FUNCTION_TYPE = sp.TList(sp.TPair(TOKEN_ID, sp.TOption(sp.TNat)))
+PRUNE_VOTING_POWER_FUNCTION_TYPE = sp.TRecord(addresses=sp.TList(sp.TAddress), level=sp.TNat).layout(("addresses", "level"))
+# Per token data kept in storage when the contract is compiled with compact token metadata
+TOKEN_DATA_TYPE = sp.TRecord(date=sp.TTimestamp, royalties=sp.TBytes)
 
 BALANCE_RECORD_TYPE = sp.TRecord(level=sp.TNat, value=sp.TNat)
 
@@ -69,6 +85,9 @@ FORMAT_UNIT = sp.utils.bytes_of_string('"unit":')
 FORMAT_DIMENSIONS = sp.utils.bytes_of_string('"dimensions":')
 FORMAT_MIMETYPE = sp.utils.bytes_of_string('"mimeType":')
 
+# "00" to "99" in ASCII, to render a token id two digits at a time
+DIGIT_PAIRS = sp.utils.bytes_of_string("".join(["%02d" % i for i in range(100)]))
+
 ########################################################################################################################
 ########################################################################################################################
 # Classes
@@ -97,6 +116,25 @@ class Operator_set:
     def is_member(self, set, owner, operator, token_id):
         return set.contains(self.make_key(owner, operator, token_id))
 
+## Operators of all the tokens of an owner are kept in a second lazy set
+## of `(owner × operator)` values so a single entry covers the whole wallet.
+class Operator_for_all_set:
+    def make(self):
+        return sp.big_map(tkey=OPERATOR_FOR_ALL_TYPE, tvalue=sp.TUnit)
+
+    def make_key(self, owner, operator):
+        metakey = sp.record(owner=owner,
+                            operator=operator)
+        metakey = sp.set_type_expr(metakey, OPERATOR_FOR_ALL_TYPE)
+        return metakey
+
+    def add(self, set, owner, operator):
+        set[self.make_key(owner, operator)] = sp.unit
+    def remove(self, set, owner, operator):
+        del set[self.make_key(owner, operator)]
+    def is_member(self, set, owner, operator):
+        return set.contains(self.make_key(owner, operator))
+
 class AngryTeenagers(sp.Contract):
     def __init__(self, administrator,
                  royalties_bytes,
@@ -128,9 +166,15 @@ class AngryTeenagers(sp.Contract):
                  attributes_generic,
                  rights,
                  creators,
-                 project_name
+                 project_name,
+                 compact_token_metadata=False
                  ):
         self.operator_set = Operator_set()
+        self.operator_for_all_set = Operator_for_all_set()
+
+        # When set, only the per token deltas are stored at mint and reveal time and the TZIP-21 map is
+        # built by the token_metadata offchain view
+        self.compact_token_metadata = compact_token_metadata
 
         self.artifact_file_type = sp.utils.bytes_of_string(artifact_file_type)
         self.artifact_file_size_generic = sp.utils.bytes_of_string(artifact_file_size_generic)
@@ -161,8 +205,16 @@ class AngryTeenagers(sp.Contract):
             sp.TRecord(
                 ledger=sp.TBigMap(TOKEN_ID, sp.TAddress),
                 operators=sp.TBigMap(OPERATOR_TYPE, sp.TUnit),
+                operators_for_all=sp.TBigMap(OPERATOR_FOR_ALL_TYPE, sp.TUnit),
                 voting_power=sp.TBigMap(sp.TPair(sp.TAddress, sp.TNat), BALANCE_RECORD_TYPE),
                 voting_power_highest_index=sp.TBigMap(sp.TAddress, sp.TNat),
+                voting_power_lowest_index=sp.TBigMap(sp.TAddress, sp.TNat),
+                voting_power_min_level=sp.TBigMap(sp.TAddress, sp.TNat),
+                dao_address=sp.TOption(sp.TAddress),
+                tokens_of_owner=sp.TBigMap(sp.TPair(sp.TAddress, sp.TNat), TOKEN_ID),
+                owner_token_index=sp.TBigMap(TOKEN_ID, sp.TNat),
+                balance_of_owner=sp.TBigMap(sp.TAddress, sp.TNat),
+                unrevealed_tokens=sp.TBigMap(sp.TNat, sp.TNat),
                 administrator=sp.TAddress,
                 next_administrator=sp.TOption(sp.TAddress),
                 sale_contract_administrator=sp.TAddress,
@@ -173,12 +225,20 @@ class AngryTeenagers(sp.Contract):
                 max_supply=sp.TNat,
                 token_metadata=sp.TBigMap(TOKEN_ID, sp.TPair(TOKEN_ID, sp.TMap(sp.TString, sp.TBytes))),
                 extra_token_metadata=sp.TBigMap(TOKEN_ID, sp.TRecord(token_id=TOKEN_ID, token_info=sp.TMap(sp.TString, sp.TBytes))),
+                token_data=sp.TBigMap(TOKEN_ID, TOKEN_DATA_TYPE),
+                token_artwork=sp.TBigMap(TOKEN_ID, ARTWORKS_CONTAINER_FUNCTION_TYPE),
+                reveal_commitment=sp.TOption(REVEAL_COMMITMENT_TYPE),
                 generic_image_ipfs=sp.TBytes,
                 generic_image_ipfs_display=sp.TBytes,
                 generic_image_ipfs_thumbnail=sp.TBytes,
+                generic_formats=sp.TBytes,
                 project_oracles_deposits=sp.TBigMap(sp.TNat, sp.TBytes),
                 project_oracles_number_of_deposits=sp.TNat,
                 royalties=sp.TBytes,
+                royalties_versions=sp.TBigMap(sp.TNat, sp.TBytes),
+                royalties_version_count=sp.TNat,
+                current_royalties_version=sp.TOption(sp.TNat),
+                royalties_overrides=sp.TBigMap(TOKEN_ID, sp.TNat),
                 metadata= sp.TBigMap(sp.TString, sp.TBytes)
             )
         )
@@ -186,9 +246,25 @@ class AngryTeenagers(sp.Contract):
         self.init(
             ledger=sp.big_map(tkey=TOKEN_ID, tvalue=sp.TAddress),
             operators=self.operator_set.make(),
+            operators_for_all=self.operator_for_all_set.make(),
 
             voting_power=sp.big_map(tkey=sp.TPair(sp.TAddress, sp.TNat), tvalue=BALANCE_RECORD_TYPE),
             voting_power_highest_index = sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat),
+            # Checkpoints below the lowest index have been pruned. The voting power of a pruned address can only be
+            # queried for levels greater or equal to its voting_power_min_level.
+            voting_power_lowest_index = sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat),
+            voting_power_min_level = sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat),
+            # DAO reading the voting power. Its open polls bound the pruning level.
+            dao_address = sp.none,
+
+            # Tokens of each owner: (owner, index) -> token_id with index < balance_of_owner[owner]
+            tokens_of_owner=sp.big_map(tkey=sp.TPair(sp.TAddress, sp.TNat), tvalue=TOKEN_ID),
+            owner_token_index=sp.big_map(tkey=TOKEN_ID, tvalue=sp.TNat),
+            balance_of_owner=sp.big_map(tkey=sp.TAddress, tvalue=sp.TNat),
+
+            # Unrevealed tokens bitmap: token_id // UNREVEALED_CHUNK_SIZE -> bit (token_id % UNREVEALED_CHUNK_SIZE) set
+            # when the token is not revealed yet
+            unrevealed_tokens=sp.big_map(tkey=sp.TNat, tvalue=sp.TNat),
 
             # Administrator
             administrator=administrator,
@@ -212,15 +288,36 @@ class AngryTeenagers(sp.Contract):
             token_metadata=sp.big_map(l={}, tkey=TOKEN_ID, tvalue=sp.TPair(TOKEN_ID, sp.TMap(sp.TString, sp.TBytes))),
             extra_token_metadata=sp.big_map(l={}, tkey=TOKEN_ID, tvalue=sp.TRecord(token_id =TOKEN_ID, token_info = sp.TMap(sp.TString, sp.TBytes))),
 
+            # Compact token metadata
+            token_data=sp.big_map(l={}, tkey=TOKEN_ID, tvalue=TOKEN_DATA_TYPE),
+            token_artwork=sp.big_map(l={}, tkey=TOKEN_ID, tvalue=ARTWORKS_CONTAINER_FUNCTION_TYPE),
+
+            # Bulk reveal. Once set, the tokens not revealed one by one are resolved from the base URI.
+            reveal_commitment=sp.none,
+
             generic_image_ipfs=generic_image_ipfs,
             generic_image_ipfs_display=generic_image_ipfs_display,
             generic_image_ipfs_thumbnail=generic_image_ipfs_thumbnail,
+            # Formats of the generic artwork. Rebuilt only when the generic links change.
+            generic_formats=self.create_format_metadata(generic_image_ipfs,
+                                                        generic_image_ipfs_display,
+                                                        generic_image_ipfs_thumbnail,
+                                                        self.artifact_file_size_generic,
+                                                        self.display_file_size_generic,
+                                                        self.thumbnail_file_size_generic),
 
             project_oracles_deposits=sp.big_map(l={}, tkey=sp.TNat, tvalue=sp.TBytes),
             project_oracles_number_of_deposits=sp.nat(0),
 
             royalties=royalties_bytes,
 
+            # Shared royalties resolved by the token_metadata view. A token uses its override version if any, else the
+            # current version if any, else the royalties stored when it was minted.
+            royalties_versions=sp.big_map(l={}, tkey=sp.TNat, tvalue=sp.TBytes),
+            royalties_version_count=sp.nat(0),
+            current_royalties_version=sp.none,
+            royalties_overrides=sp.big_map(l={}, tkey=TOKEN_ID, tvalue=sp.TNat),
+
             metadata=metadata
         )
 
@@ -229,19 +326,26 @@ class AngryTeenagers(sp.Contract):
              , self.does_token_exist
              , self.count_tokens
              , self.all_tokens
+             , self.all_tokens_page
              , self.get_user_tokens
+             , self.count_user_tokens
+             , self.get_user_tokens_page
+             , self.get_non_revealed_tokens_page
              , self.is_operator
+             , self.is_operator_for_all
              , self.max_supply
              , self.token_metadata
              , self.get_project_oracles_deposit
              , self.get_project_oracles_number_of_deposits
              , self.get_all_non_revealed_token
+             , self.get_voting_power_list
+             , self.verify_revealed_metadata
         ]
 
         metadata_base = {
              "name": "Angry Teenagers"
             ,
-             "version": "1.3.0"
+             "version": "1.8.0"
              , "description": (
                      "Angry Teenagers: NFTs that fund an exponential cycle of reforestation."
         )
@@ -258,6 +362,8 @@ class AngryTeenagers(sp.Contract):
                  , "sender": "owner-no-hook"
             }
         }
+        if Error.NUMERIC_ERRORS:
+            metadata_base["errors"] = Error.tzip16_errors()
         self.init_metadata("metadata_base", metadata_base)
 
 ########################################################################################################################
@@ -290,10 +396,18 @@ class AngryTeenagers(sp.Contract):
     def transfer(self, params):
         sp.verify(~self.is_paused(), message=Error.ErrorMessage.paused())
         sp.set_type(params, TRANSFER_FUNCTION_TYPE)
+        # Net change of balance of each address. The voting power is updated once per address at the end.
+        deltas = sp.local('deltas', sp.map(l={}, tkey=sp.TAddress, tvalue=sp.TInt))
         sp.for transfer in params:
             current_from = transfer.from_
+            # The owner and the operators of all its tokens are checked once for all the txs
+            allowed_for_all = sp.local('allowed_for_all',
+                                       (current_from == sp.sender) |
+                                       self.operator_for_all_set.is_member(self.data.operators_for_all,
+                                                                           current_from,
+                                                                           sp.sender))
             sp.for tx in transfer.txs:
-                sender_verify = (current_from == sp.sender)
+                sender_verify = allowed_for_all.value
                 message = Error.Fa2ErrorMessage.not_operator()
                 sender_verify |= (self.operator_set.is_member(self.data.operators,
                                                               current_from,
@@ -309,15 +423,21 @@ class AngryTeenagers(sp.Contract):
                     sp.verify(self.data.ledger[tx.token_id] == current_from, Error.Fa2ErrorMessage.insufficient_balance())
                     self.data.ledger[tx.token_id] = tx.to_
 
-                    # Update sender balance
-                    self.update_voting_power(sp.record(address=current_from, is_receive=False))
+                    # Update the tokens of each owner
+                    self.remove_token_from_owner(sp.record(owner=current_from, token_id=tx.token_id))
+                    self.add_tokens_to_owner(sp.record(owner=tx.to_, first_token_id=tx.token_id, amount=1))
 
-                    # Update receiver balance
-                    self.update_voting_power(sp.record(address=tx.to_, is_receive=True))
+                    # Update sender and receiver balances
+                    deltas.value[current_from] = deltas.value.get(current_from, sp.int(0)) - 1
+                    deltas.value[tx.to_] = deltas.value.get(tx.to_, sp.int(0)) + 1
 
                     event = sp.record(from_=current_from, to_=tx.to_, token_id=tx.token_id)
                     sp.emit(event, with_type=True, tag="transfer")
 
+        sp.for delta in deltas.value.items():
+            sp.if delta.value != 0:
+                self.update_voting_power(sp.record(address=delta.key, delta=delta.value))
+
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def update_operators(self, params):
@@ -349,6 +469,36 @@ class AngryTeenagers(sp.Contract):
                                              upd.operator,
                                              upd.token_id)
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def update_operators_for_all(self, params):
+        """Add or remove operators of all the tokens of an owner, including the tokens it will receive later.
+        """
+        sp.set_type(params, sp.TList(
+            sp.TVariant(
+                add_operator=OPERATOR_FOR_ALL_TYPE,
+                remove_operator=OPERATOR_FOR_ALL_TYPE
+            )
+        ))
+
+        sp.for update in params:
+            with update.match_cases() as arg:
+                with arg.match("add_operator") as upd:
+                    sp.verify(
+                        (upd.owner == sp.sender),
+                        message=Error.Fa2ErrorMessage.not_operator()
+                    )
+                    self.operator_for_all_set.add(self.data.operators_for_all,
+                                                  upd.owner,
+                                                  upd.operator)
+                with arg.match("remove_operator") as upd:
+                    sp.verify(
+                        (upd.owner == sp.sender) | self.is_administrator(sp.sender),
+                        message=Error.Fa2ErrorMessage.not_operator()
+                    )
+                    self.operator_for_all_set.remove(self.data.operators_for_all,
+                                                     upd.owner,
+                                                     upd.operator)
+
 ########################################################################################################################
 # Dedicated entry points
 ########################################################################################################################
@@ -371,6 +521,15 @@ class AngryTeenagers(sp.Contract):
             self.data.extra_token_metadata[token_id] = sp.record(token_id=token_id, token_info=sp.map(l={}, tkey=sp.TString, tvalue=sp.TBytes))
         self.data.extra_token_metadata[token_id].token_info[key] = value
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_generic_artwork(self, params):
+        sp.set_type(params, GENERIC_ARTWORK_FUNCTION_TYPE)
+        sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        self.data.generic_image_ipfs = params.artifact_uri
+        self.data.generic_image_ipfs_display = params.display_uri
+        self.data.generic_image_ipfs_thumbnail = params.thumbnail_uri
+        self.data.generic_formats = self.create_generic_format_metadata()
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def set_pause(self, params):
         sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
@@ -398,6 +557,12 @@ class AngryTeenagers(sp.Contract):
         sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
         self.data.artwork_administrator = params
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_dao_address(self, params):
+        sp.set_type(params, sp.TAddress)
+        sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        self.data.dao_address = sp.some(params)
+
     @sp.entry_point(check_no_incoming_transfer=True)
     def add_new_oracles_deposit(self, params):
         sp.set_type(params, sp.TBytes)
@@ -408,31 +573,41 @@ class AngryTeenagers(sp.Contract):
     @sp.entry_point(check_no_incoming_transfer=True)
     def update_artwork_data(self, params):
         sp.verify(self.is_artwork_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        sp.verify(self.data.reveal_commitment.is_none(), message=Error.ErrorMessage.token_revealed())
         sp.set_type(params, UPDATE_ARTWORK_METADATA_FUNCTION_TYPE)
         sp.for artwork_metadata in params:
-            sp.verify(self.data.ledger.contains(sp.fst(artwork_metadata)), message=Error.Fa2ErrorMessage.token_undefined())
-            info = sp.local('info', sp.snd(self.data.token_metadata.get(sp.fst(artwork_metadata), message=Error.Fa2ErrorMessage.token_undefined())))
-            sp.verify(info.value.get(REVEALED_METADATA, message=Error.Fa2ErrorMessage.token_undefined()) == sp.utils.bytes_of_string("false"), message=Error.ErrorMessage.token_revealed())
-
-            my_map = sp.local('my_map', sp.update_map(sp.snd(self.data.token_metadata[sp.fst(artwork_metadata)]), REVEALED_METADATA, sp.some(sp.utils.bytes_of_string("true"))))
-            my_map.value = sp.update_map(my_map.value, ARTIFACTURI_METADATA, sp.some((sp.snd(artwork_metadata)).artifact_uri))
-            my_map.value = sp.update_map(my_map.value, DISPLAYURI_METADATA, sp.some((sp.snd(artwork_metadata)).display_uri))
-            my_map.value = sp.update_map(my_map.value, THUMBNAILURI_METADATA, sp.some((sp.snd(artwork_metadata)).thumbnail_uri))
-            my_map.value = sp.update_map(my_map.value, ATTRIBUTES_METADATA, sp.some((sp.snd(artwork_metadata)).attributes))
-            my_map.value = sp.update_map(my_map.value, ATTRIBUTES_METADATA, sp.some((sp.snd(artwork_metadata)).attributes))
+            self.reveal_token_artwork(sp.fst(artwork_metadata), sp.snd(artwork_metadata))
 
-            formats = sp.local(FORMATS_METADATA, self.create_format_metadata((sp.snd(artwork_metadata)).artifact_uri,
-                                                                             (sp.snd(artwork_metadata)).display_uri,
-                                                                             (sp.snd(artwork_metadata)).thumbnail_uri,
-                                                                             (sp.snd(artwork_metadata)).artifact_size,
-                                                                             (sp.snd(artwork_metadata)).display_size,
-                                                                             (sp.snd(artwork_metadata)).thumbnail_size))
-            my_map.value = sp.update_map(my_map.value, FORMATS_METADATA, sp.some(formats.value))
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def reveal_artwork_data(self, params):
+        """Reveal tokens as update_artwork_data. In compact mode only the artwork record is stored and the
+        token_metadata view merges it in. In the default mode the token_metadata big map read by the indexers is
+        rewritten, so the compact encoding of the reveal needs COMPACT_TOKEN_METADATA.
+        """
+        sp.verify(self.is_artwork_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        sp.verify(self.data.reveal_commitment.is_none(), message=Error.ErrorMessage.token_revealed())
+        sp.set_type(params, UPDATE_ARTWORK_METADATA_FUNCTION_TYPE)
+        sp.for artwork_metadata in params:
+            self.reveal_token_artwork(sp.fst(artwork_metadata), sp.snd(artwork_metadata))
 
-            self.data.token_metadata[sp.fst(artwork_metadata)] = sp.pair(sp.fst(artwork_metadata), my_map.value)
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def commit_reveal(self, params):
+        """Reveal all the tokens not revealed yet in one operation. The metadata of each token is then the file
+        base_uri/<token_id>.json, which can be checked against the merkle root with the verify_revealed_metadata view.
+        The commitment covers the size first tokens, minted or not, with minted_tokens <= size <= max_supply. The
+        tokens minted afterwards are resolved from the base URI too, and no token can be minted beyond size: a size
+        lower than max_supply closes the collection at size tokens. The commitment cannot be changed once set.
+        """
+        sp.verify(self.is_artwork_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        sp.set_type(params, REVEAL_COMMITMENT_TYPE)
+        sp.verify(self.data.reveal_commitment.is_none(), message=Error.ErrorMessage.token_revealed())
+        sp.verify(sp.len(params.root) == 32, message=Error.ErrorMessage.invalid_parameter())
+        sp.verify(sp.len(params.base_uri) > 0, message=Error.ErrorMessage.invalid_parameter())
+        sp.verify(params.size >= self.data.minted_tokens, message=Error.ErrorMessage.invalid_parameter())
+        sp.verify(params.size <= self.data.max_supply, message=Error.ErrorMessage.invalid_parameter())
+        self.data.reveal_commitment = sp.some(params)
 
-            event = sp.fst(artwork_metadata)
-            sp.emit(event, with_type=True, tag="update_artwork_data")
+        sp.emit(params, with_type=True, tag="commit_reveal")
 
 
     @sp.entry_point(check_no_incoming_transfer=True)
@@ -442,6 +617,8 @@ class AngryTeenagers(sp.Contract):
 
         # Asserts
         sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        # Once versioned, the royalties are only changed with set_global_royalties and set_royalties_overrides
+        sp.verify(self.data.current_royalties_version.is_none(), message=Error.ErrorMessage.royalties_versioned())
 
         # Set the royalties field for NFTs not minted yet
         self.data.royalties = params
@@ -453,15 +630,86 @@ class AngryTeenagers(sp.Contract):
 
         # Asserts
         sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        sp.verify(self.data.current_royalties_version.is_none(), message=Error.ErrorMessage.royalties_versioned())
 
         # Change NFTs token metadata
         sp.for token in params:
             sp.verify(self.data.ledger.contains(token), message=Error.Fa2ErrorMessage.token_undefined())
-            info = sp.local('info', sp.snd(self.data.token_metadata.get(token, message=Error.Fa2ErrorMessage.token_undefined())))
-            info.value.get(ROYALTIES_METADATA, message=Error.Fa2ErrorMessage.token_undefined())
+            if self.compact_token_metadata:
+                sp.verify(self.data.token_data.contains(token), message=Error.Fa2ErrorMessage.token_undefined())
+                self.data.token_data[token].royalties = self.data.royalties
+            else:
+                info = sp.local('info', sp.snd(self.data.token_metadata.get(token, message=Error.Fa2ErrorMessage.token_undefined())))
+                info.value.get(ROYALTIES_METADATA, message=Error.Fa2ErrorMessage.token_undefined())
+
+                my_map = sp.local('my_map', sp.update_map(sp.snd(self.data.token_metadata[token]), ROYALTIES_METADATA, sp.some(self.data.royalties)))
+                self.data.token_metadata[token] = sp.pair(token, my_map.value)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_global_royalties(self, params):
+        """Add a new royalties version and make it the royalties of all the tokens without override, minted or not,
+        without rewriting their metadata.
+        """
+        # Verify type
+        sp.set_type(params, sp.TBytes)
+
+        # Asserts
+        sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+
+        self.data.royalties_versions[self.data.royalties_version_count] = params
+        self.data.current_royalties_version = sp.some(self.data.royalties_version_count)
+        self.data.royalties_version_count = self.data.royalties_version_count + 1
 
-            my_map = sp.local('my_map', sp.update_map(sp.snd(self.data.token_metadata[token]), ROYALTIES_METADATA, sp.some(self.data.royalties)))
-            self.data.token_metadata[token] = sp.pair(token, my_map.value)
+        # Also stored in the metadata of the NFTs minted from now on
+        self.data.royalties = params
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_royalties_overrides(self, params):
+        """Pin some tokens to an existing royalties version (some) or make them follow the current version again (none).
+        """
+        # Verify type
+        sp.set_type(params, ROYALTIES_OVERRIDES_FUNCTION_TYPE)
+
+        # Asserts
+        sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+
+        sp.for override in params:
+            sp.verify(self.data.ledger.contains(sp.fst(override)), message=Error.Fa2ErrorMessage.token_undefined())
+            sp.if sp.snd(override).is_some():
+                version = sp.snd(override).open_some()
+                sp.verify(self.data.royalties_versions.contains(version), message=Error.ErrorMessage.invalid_parameter())
+                self.data.royalties_overrides[sp.fst(override)] = version
+            sp.else:
+                del self.data.royalties_overrides[sp.fst(override)]
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def prune_voting_power(self, params):
+        sp.set_type(params, PRUNE_VOTING_POWER_FUNCTION_TYPE)
+        sp.verify(self.is_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        sp.verify(params.level <= sp.level, message=Error.ErrorMessage.invalid_parameter())
+
+        # Level shall not be greater than the snapshot level of the oldest poll still open in the DAO
+        oldest_snapshot_level = sp.local('oldest_snapshot_level', sp.view("get_oldest_snapshot_level",
+                                         self.data.dao_address.open_some(Error.ErrorMessage.dao_not_registered()),
+                                         sp.unit,
+                                         t=sp.TOption(sp.TNat)).open_some(Error.ErrorMessage.invalid_parameter()))
+        sp.if oldest_snapshot_level.value.is_some():
+            sp.verify(params.level <= oldest_snapshot_level.value.open_some(), message=Error.ErrorMessage.dao_vote_in_progress())
+
+        sp.for address in params.addresses:
+            sp.if self.data.voting_power_highest_index.contains(address):
+                highest_index = sp.local('highest_index', self.data.voting_power_highest_index[address])
+                lowest_index = sp.local('lowest_index', self.data.voting_power_lowest_index.get(address, sp.nat(0)))
+                # Keep the last checkpoint at or below level. It holds the voting power at level.
+                sp.while (lowest_index.value < highest_index.value) & \
+                        (self.data.voting_power.get(sp.pair(address, lowest_index.value + 1), message=Error.ErrorMessage.balance_inconsistency()).level <= params.level):
+                    del self.data.voting_power[sp.pair(address, lowest_index.value)]
+                    lowest_index.value = lowest_index.value + 1
+                sp.if lowest_index.value != 0:
+                    self.data.voting_power_lowest_index[address] = lowest_index.value
+
+                sp.if params.level > self.data.voting_power_min_level.get(address, sp.nat(0)):
+                    self.data.voting_power_min_level[address] = params.level
 
     @sp.entry_point(check_no_incoming_transfer=True)
     def mint(self, params):
@@ -469,72 +717,68 @@ class AngryTeenagers(sp.Contract):
         sp.verify(self.is_sale_contract_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
         # We don't check for pauseness because we're the admin.
         sp.verify(self.data.minted_tokens < self.data.max_supply, message=Error.ErrorMessage.no_land_available())
+        # Once the reveal is committed, only the tokens covered by the commitment can be minted
+        sp.if self.data.reveal_commitment.is_some():
+            sp.verify(self.data.minted_tokens < self.data.reveal_commitment.open_some().size, message=Error.ErrorMessage.no_land_available())
+
+        formats = self.prepare_token_metadata()
 
         self.data.ledger[self.data.minted_tokens] = params
-        self.build_token_metadata(self.data.minted_tokens)
+        self.build_token_metadata(self.data.minted_tokens, formats)
+
+        self.add_tokens_to_owner(sp.record(owner=params, first_token_id=self.data.minted_tokens, amount=1))
 
         self.data.minted_tokens = self.data.minted_tokens + 1
 
         # Update voting power
-        self.update_voting_power(sp.record(address=params, is_receive=True))
+        self.update_voting_power(sp.record(address=params, delta=sp.int(1)))
 
         # Send event
         event = sp.record(sender=sp.sender, receiver=params)
         sp.emit(event, with_type=True, tag="mint")
 
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def mint_batch(self, params):
+        sp.set_type(params, MINT_BATCH_FUNCTION_TYPE)
+        sp.verify(self.is_sale_contract_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        # We don't check for pauseness because we're the admin.
+
+        # The generic formats are the same for every token minted here so they are only read once
+        formats = self.prepare_token_metadata()
+
+        self.mint_tokens(params, formats)
+
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def mint_batch_list(self, params):
+        sp.set_type(params, MINT_BATCH_LIST_FUNCTION_TYPE)
+        sp.verify(self.is_sale_contract_administrator(sp.sender), message=Error.ErrorMessage.not_admin())
+        # We don't check for pauseness because we're the admin.
+
+        # The generic formats are read once for all the recipients
+        formats = self.prepare_token_metadata()
+
+        sp.for recipient in params:
+            self.mint_tokens(recipient, formats)
+
 ########################################################################################################################
 # Onchain views
 ########################################################################################################################
     @sp.onchain_view()
     def get_voting_power(self, params):
         sp.set_type(params, sp.TPair(sp.TAddress, sp.TNat))
-        address, level = sp.match_pair(params)
-
-        result = sp.local('result', sp.nat(0))
-
-        sp.if self.data.voting_power_highest_index.contains(address):
-            upper_bound = sp.local('upper_bound', self.data.voting_power_highest_index.get(address, message=Error.ErrorMessage.balance_inconsistency()))
-            lower_bound = sp.local('lower_bound', sp.nat(0))
+        sp.result(self.compute_voting_power(params))
 
-            sp.if upper_bound.value == 0:
-                root_elem = sp.local('root_elem', self.data.voting_power.get(sp.pair(address, upper_bound.value),
-                                                                             message=Error.ErrorMessage.balance_inconsistency()))
-                sp.if root_elem.value.level <= level:
-                    result.value = root_elem.value.value
-
-            sp.else:
-                finished = sp.local('finished', sp.bool(False))
-                # Binary search tree
-                sp.while ~finished.value:
-                    interval = sp.local('interval', sp.is_nat(upper_bound.value - lower_bound.value).open_some(message=Error.ErrorMessage.internal_error()))
-
-                    sp.if interval.value == 1:
-                        finished.value = True
-                        upper_elem = sp.local('upper_elem', self.data.voting_power.get(sp.pair(address, upper_bound.value),
-                                                                                       message=Error.ErrorMessage.balance_inconsistency()))
-                        sp.if upper_elem.value.level <= level:
-                            result.value = upper_elem.value.value
-                        sp.else:
-                            lower_elem = sp.local('lower_elem', self.data.voting_power.get(sp.pair(address, lower_bound.value),
-                                                                         message=Error.ErrorMessage.balance_inconsistency()))
-                            sp.if lower_elem.value.level <= level:
-                                result.value = lower_elem.value.value
-                    sp.else:
-                        middle = sp.local('middle', (interval.value / 2) + lower_bound.value)
-                        elem = sp.local('elem', self.data.voting_power.get(sp.pair(address, middle.value),
-                                                               message=Error.ErrorMessage.balance_inconsistency()))
-
-                        sp.if elem.value.level == level:
-                            finished.value = True
-                            result.value = elem.value.value
-                        sp.else:
-                            sp.if elem.value.level > level:
-                                upper_bound.value = middle.value
-                            sp.else:
-                                lower_bound.value = middle.value
-                    sp.verify(upper_bound.value > lower_bound.value, message=Error.ErrorMessage.internal_error())
+    @sp.onchain_view()
+    def get_voting_power_batch(self, params):
+        sp.set_type(params, sp.TList(sp.TPair(sp.TAddress, sp.TNat)))
+        sp.result(self.compute_voting_power_batch(params))
 
-        sp.result(result.value)
+    @sp.onchain_view()
+    def get_owner_balance(self, params):
+        """Get how many tokens an address owns without reading the voting power history.
+        """
+        sp.set_type(params, sp.TAddress)
+        sp.result(self.data.balance_of_owner.get(params, sp.nat(0)))
 
     @sp.onchain_view()
     def get_total_voting_power(self):
@@ -545,6 +789,13 @@ class AngryTeenagers(sp.Contract):
 ########################################################################################################################
 # Offchain views
 ########################################################################################################################
+    @sp.offchain_view(pure=True)
+    def get_voting_power_list(self, params):
+        """Get the voting power of each (address, level) pair in the same order.
+        """
+        sp.set_type(params, sp.TList(sp.TPair(sp.TAddress, sp.TNat)))
+        sp.result(self.compute_voting_power_batch(params))
+
     @sp.offchain_view(pure=True)
     def count_tokens(self):
         """Get how many tokens are in this FA2 contract.
@@ -564,6 +815,17 @@ class AngryTeenagers(sp.Contract):
         """
         sp.result(sp.range(0, self.data.minted_tokens))
 
+    @sp.offchain_view(pure=True)
+    def all_tokens_page(self, params):
+        """Get at most limit tokens starting at the token id offset, limit shall not be 0.
+        next_offset is none when there is no more token to read.
+        """
+        sp.set_type(params, PAGE_PARAM_TYPE)
+        # An empty page would return the same offset and never end the streaming
+        sp.verify(params.limit > 0, message=Error.ErrorMessage.invalid_parameter())
+        end = sp.local('end', sp.min(params.offset + params.limit, self.data.minted_tokens))
+        sp.result(self.make_token_page(sp.range(params.offset, end.value), end.value, self.data.minted_tokens))
+
     @sp.offchain_view(pure=True)
     def get_user_tokens(self, params):
         """Get user tokens.
@@ -571,24 +833,83 @@ class AngryTeenagers(sp.Contract):
         sp.set_type(params, sp.TAddress)
         token_list = sp.local('token_list', sp.list(l={}, t=TOKEN_ID))
         i = sp.local("i", sp.nat(0))
-        sp.while i.value < self.data.minted_tokens:
-            sp.if self.data.ledger.get(i.value, message=Error.Fa2ErrorMessage.token_undefined()) == params:
-                token_list.value.push(i.value)
+        sp.while i.value < self.data.balance_of_owner.get(params, sp.nat(0)):
+            token_list.value.push(self.data.tokens_of_owner[sp.pair(params, i.value)])
             i.value = i.value + 1
         sp.result(token_list.value)
 
+    @sp.offchain_view(pure=True)
+    def count_user_tokens(self, params):
+        """Get how many tokens an address owns.
+        """
+        sp.set_type(params, sp.TAddress)
+        sp.result(self.data.balance_of_owner.get(params, sp.nat(0)))
+
+    @sp.offchain_view(pure=True)
+    def get_user_tokens_page(self, params):
+        """Get at most limit user tokens starting at offset in the owner index, limit shall not be 0.
+        next_offset is none when there is no more token to read.
+        """
+        sp.set_type(params, OWNER_TOKENS_PAGE_PARAM_TYPE)
+        sp.verify(params.limit > 0, message=Error.ErrorMessage.invalid_parameter())
+        balance = sp.local('balance', self.data.balance_of_owner.get(params.owner, sp.nat(0)))
+        end = sp.local('end', sp.min(params.offset + params.limit, balance.value))
+
+        token_list = sp.local('token_list', sp.list(l={}, t=TOKEN_ID))
+        i = sp.local("i", end.value)
+        sp.while params.offset < i.value:
+            i.value = sp.is_nat(i.value - 1).open_some()
+            token_list.value.push(self.data.tokens_of_owner[sp.pair(params.owner, i.value)])
+        sp.result(self.make_token_page(token_list.value, end.value, balance.value))
+
     @sp.offchain_view(pure=True)
     def get_all_non_revealed_token(self):
         """Get all non-revealed token.
         """
         token_list = sp.local('token_list', sp.list(l={}, t=TOKEN_ID))
-        i = sp.local("i", sp.nat(0))
-        sp.while i.value < self.data.minted_tokens:
-            sp.if (sp.snd(self.data.token_metadata.get(i.value, message=Error.Fa2ErrorMessage.token_undefined())))[REVEALED_METADATA] == sp.utils.bytes_of_string("false"):
-                token_list.value.push(i.value)
-            i.value = i.value + 1
+        chunk = sp.local("chunk", sp.nat(0))
+        # All the tokens are revealed once the reveal is committed
+        sp.while self.data.reveal_commitment.is_none() & (chunk.value * UNREVEALED_CHUNK_SIZE < self.data.minted_tokens):
+            bitmap = sp.local("bitmap", self.data.unrevealed_tokens.get(chunk.value, sp.nat(0)))
+            i = sp.local("i", chunk.value * UNREVEALED_CHUNK_SIZE)
+            sp.while bitmap.value != 0:
+                sp.if bitmap.value & 1 == 1:
+                    token_list.value.push(i.value)
+                bitmap.value = bitmap.value >> 1
+                i.value = i.value + 1
+            chunk.value = chunk.value + 1
         sp.result(token_list.value)
 
+    @sp.offchain_view(pure=True)
+    def get_non_revealed_tokens_page(self, params):
+        """Get at most limit non-revealed tokens with a token id greater or equal to offset, limit shall not be 0.
+        next_offset is the token id to restart from or none when all the tokens have been read.
+        """
+        sp.set_type(params, PAGE_PARAM_TYPE)
+        sp.verify(params.limit > 0, message=Error.ErrorMessage.invalid_parameter())
+        reversed_list = sp.local('reversed_list', sp.list(l={}, t=TOKEN_ID))
+        count = sp.local("count", sp.nat(0))
+        i = sp.local("i", params.offset)
+        # All the tokens are revealed once the reveal is committed
+        sp.if self.data.reveal_commitment.is_some():
+            i.value = self.data.minted_tokens
+        sp.while (i.value < self.data.minted_tokens) & (count.value < params.limit):
+            chunk = sp.local("chunk", i.value // UNREVEALED_CHUNK_SIZE)
+            bitmap = sp.local("bitmap", self.data.unrevealed_tokens.get(chunk.value, sp.nat(0)) >> (i.value % UNREVEALED_CHUNK_SIZE))
+            sp.while (bitmap.value != 0) & (count.value < params.limit):
+                sp.if bitmap.value & 1 == 1:
+                    reversed_list.value.push(i.value)
+                    count.value = count.value + 1
+                bitmap.value = bitmap.value >> 1
+                i.value = i.value + 1
+            sp.if bitmap.value == 0:
+                i.value = (chunk.value + 1) * UNREVEALED_CHUNK_SIZE
+
+        token_list = sp.local('token_list', sp.list(l={}, t=TOKEN_ID))
+        sp.for token_id in reversed_list.value:
+            token_list.value.push(token_id)
+        sp.result(self.make_token_page(token_list.value, i.value, self.data.minted_tokens))
+
     @sp.offchain_view(pure=True)
     def max_supply(self, token_id):
         """Get the max supply for one token_id.
@@ -612,7 +933,21 @@ class AngryTeenagers(sp.Contract):
             self.operator_set.is_member(self.data.operators,
                                         query.owner,
                                         query.operator,
-                                        query.token_id)
+                                        query.token_id) |
+            self.operator_for_all_set.is_member(self.data.operators_for_all,
+                                                query.owner,
+                                                query.operator)
+        )
+
+    @sp.offchain_view(pure=True)
+    def is_operator_for_all(self, query):
+        """Return whether an address is operator of all the tokens of an owner.
+        """
+        sp.set_type(query, OPERATOR_FOR_ALL_TYPE)
+        sp.result(
+            self.operator_for_all_set.is_member(self.data.operators_for_all,
+                                                query.owner,
+                                                query.operator)
         )
 
     @sp.offchain_view(pure=True)
@@ -633,7 +968,7 @@ class AngryTeenagers(sp.Contract):
     def get_project_oracles_deposit(self, params):
         """Get oracle deposit using the deposit index"""
         sp.set_type(params, sp.TNat)
-        sp.verify(params < self.data.project_oracles_number_of_deposits)
+        sp.verify(params < self.data.project_oracles_number_of_deposits, message=Error.ErrorMessage.invalid_parameter())
         sp.result(self.data.project_oracles_deposits[params])
 
     @sp.offchain_view(pure=True)
@@ -646,10 +981,55 @@ class AngryTeenagers(sp.Contract):
         """Get token metadata
         """
         sp.set_type(token_id, sp.TNat)
-        sp.verify(token_id < self.data.max_supply)
+        sp.verify(token_id < self.data.max_supply, message=Error.Fa2ErrorMessage.token_undefined())
         sp.verify(self.data.ledger.contains(token_id), message=Error.Fa2ErrorMessage.token_undefined())
 
-        sp.result(self.data.token_metadata.get(token_id, message=Error.Fa2ErrorMessage.token_undefined()))
+        meta_map = sp.local('meta_map', sp.map(l={}, tkey=sp.TString, tvalue=sp.TBytes))
+        sp.if self.data.reveal_commitment.is_some() & self.is_unrevealed_token(token_id):
+            # Committed bulk reveal: TZIP-21 URI of the metadata file of the token
+            base_uri = self.data.reveal_commitment.open_some().base_uri
+            uri = sp.concat([base_uri, self.token_id_to_bytes(token_id), sp.utils.bytes_of_string(".json")])
+            meta_map.value[""] = uri
+        sp.else:
+            if self.compact_token_metadata:
+                data = sp.local('data', self.data.token_data.get(token_id, message=Error.Fa2ErrorMessage.token_undefined()))
+                token_id_string = self.token_id_to_bytes(token_id)
+                meta_map.value = self.create_token_metadata(token_id_string,
+                                                            sp.pack(data.value.date),
+                                                            data.value.royalties,
+                                                            self.data.generic_formats)
+            else:
+                meta_map.value = sp.snd(self.data.token_metadata.get(token_id, message=Error.Fa2ErrorMessage.token_undefined()))
+
+            # Artwork record stored by a compact reveal
+            sp.if self.data.token_artwork.contains(token_id):
+                meta_map.value = self.reveal_token_metadata(meta_map.value, self.data.token_artwork[token_id])
+
+        # Shared royalties. For a committed reveal, the royalties field takes precedence over the metadata file as
+        # for any key of the token_info map of TZIP-12.
+        royalties_version = sp.local('royalties_version', self.data.current_royalties_version)
+        sp.if self.data.royalties_overrides.contains(token_id):
+            royalties_version.value = sp.some(self.data.royalties_overrides[token_id])
+        sp.if royalties_version.value.is_some():
+            meta_map.value[ROYALTIES_METADATA] = self.data.royalties_versions[royalties_version.value.open_some()]
+        sp.result(sp.pair(token_id, meta_map.value))
+
+    @sp.offchain_view(pure=True)
+    def verify_revealed_metadata(self, params):
+        """Check the hash of the metadata file of a token against the merkle root of the committed reveal.
+        A leaf is blake2b(pack(pair(token_id, metadata_hash))), see tools/reveal_commitment.py.
+        """
+        sp.set_type(params, VERIFY_REVEALED_METADATA_PARAM_TYPE)
+        commitment = sp.local('commitment', self.data.reveal_commitment.open_some(Error.Fa2ErrorMessage.token_undefined()))
+        # Each pair of nodes is hashed in ascending order so the proof does not need to say on which side the
+        # sibling is
+        node = sp.local('node', sp.blake2b(sp.pack(sp.pair(params.token_id, params.metadata_hash))))
+        sp.for sibling in params.proof:
+            sp.if node.value < sibling:
+                node.value = sp.blake2b(sp.concat([node.value, sibling]))
+            sp.else:
+                node.value = sp.blake2b(sp.concat([sibling, node.value]))
+        sp.result(node.value == commitment.value.root)
 
 ########################################################################################################################
 # Internal functions
@@ -666,18 +1046,80 @@ class AngryTeenagers(sp.Contract):
     def is_artwork_administrator(self, sender):
         return (sender == self.data.administrator) | (sender == self.data.artwork_administrator)
 
+    def compute_voting_power(self, params):
+        address, level = sp.match_pair(params)
+
+        sp.verify(level >= self.data.voting_power_min_level.get(address, sp.nat(0)), message=Error.ErrorMessage.voting_power_pruned())
+
+        result = sp.local('result', sp.nat(0))
+
+        sp.if self.data.voting_power_highest_index.contains(address):
+            upper_bound = sp.local('upper_bound', self.data.voting_power_highest_index.get(address, message=Error.ErrorMessage.balance_inconsistency()))
+            lower_bound = sp.local('lower_bound', self.data.voting_power_lowest_index.get(address, sp.nat(0)))
+
+            # The latest checkpoint is checked first as most queries are at or above it
+            highest_elem = sp.local('highest_elem', self.data.voting_power.get(sp.pair(address, upper_bound.value),
+                                                                               message=Error.ErrorMessage.balance_inconsistency()))
+            sp.if highest_elem.value.level <= level:
+                result.value = highest_elem.value.value
+            sp.else:
+                sp.if upper_bound.value != lower_bound.value:
+                    finished = sp.local('finished', sp.bool(False))
+                    # Binary search tree
+                    sp.while ~finished.value:
+                        interval = sp.local('interval', sp.is_nat(upper_bound.value - lower_bound.value).open_some(message=Error.ErrorMessage.internal_error()))
+
+                        sp.if interval.value == 1:
+                            finished.value = True
+                            upper_elem = sp.local('upper_elem', self.data.voting_power.get(sp.pair(address, upper_bound.value),
+                                                                                           message=Error.ErrorMessage.balance_inconsistency()))
+                            sp.if upper_elem.value.level <= level:
+                                result.value = upper_elem.value.value
+                            sp.else:
+                                lower_elem = sp.local('lower_elem', self.data.voting_power.get(sp.pair(address, lower_bound.value),
+                                                                             message=Error.ErrorMessage.balance_inconsistency()))
+                                sp.if lower_elem.value.level <= level:
+                                    result.value = lower_elem.value.value
+                        sp.else:
+                            middle = sp.local('middle', (interval.value / 2) + lower_bound.value)
+                            elem = sp.local('elem', self.data.voting_power.get(sp.pair(address, middle.value),
+                                                                   message=Error.ErrorMessage.balance_inconsistency()))
+
+                            sp.if elem.value.level == level:
+                                finished.value = True
+                                result.value = elem.value.value
+                            sp.else:
+                                sp.if elem.value.level > level:
+                                    upper_bound.value = middle.value
+                                sp.else:
+                                    lower_bound.value = middle.value
+                        sp.verify(upper_bound.value > lower_bound.value, message=Error.ErrorMessage.internal_error())
+
+        return result.value
+
+    def compute_voting_power_batch(self, params):
+        # Results are pushed in reverse order so the input list is reversed first
+        reversed_params = sp.local('reversed_params', sp.list(l={}, t=sp.TPair(sp.TAddress, sp.TNat)))
+        sp.for param in params:
+            reversed_params.value.push(param)
+        voting_powers = sp.local('voting_powers', sp.list(l={}, t=sp.TNat))
+        sp.for param in reversed_params.value:
+            voting_powers.value.push(self.compute_voting_power(param))
+        return voting_powers.value
+
     @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
     def update_voting_power(self, params):
-        sp.set_type(params, sp.TRecord(address=sp.TAddress, is_receive=sp.TBool))
+        # The delta is the net change of balance of the address (negative when it sent more tokens than it received)
+        sp.set_type(params, sp.TRecord(address=sp.TAddress, delta=sp.TInt))
 
-        sp.if ~params.is_receive:
+        sp.if params.delta < 0:
             sp.verify(self.data.voting_power_highest_index.contains(params.address), message=Error.ErrorMessage.balance_inconsistency())
 
         highest_index = sp.local('highest_index', self.data.voting_power_highest_index.get(params.address, sp.nat(0)))
 
-        sp.if params.is_receive & ~self.data.voting_power_highest_index.contains(params.address):
+        sp.if (params.delta > 0) & ~self.data.voting_power_highest_index.contains(params.address):
             self.data.voting_power_highest_index[params.address] = 0
-            self.data.voting_power[sp.pair(params.address, 0)] = sp.record(level=sp.level, value=1)
+            self.data.voting_power[sp.pair(params.address, 0)] = sp.record(level=sp.level, value=sp.as_nat(params.delta))
         sp.else:
             current_value = sp.local('current_value', self.data.voting_power.get(sp.pair(params.address, highest_index.value),
                                                                      message=Error.ErrorMessage.balance_inconsistency()))
@@ -687,56 +1129,164 @@ class AngryTeenagers(sp.Contract):
                 highest_index.value = highest_index.value + 1
                 self.data.voting_power_highest_index[params.address] = highest_index.value
 
-            new_value = sp.local('new_value', current_value.value.value + 1)
-            sp.if ~params.is_receive:
-                new_value.value = sp.is_nat(current_value.value.value - 1).open_some(Error.ErrorMessage.balance_inconsistency())
+            new_value = sp.local('new_value', sp.is_nat(current_value.value.value + params.delta).open_some(Error.ErrorMessage.balance_inconsistency()))
 
             self.data.voting_power[sp.pair(params.address, highest_index.value)] = sp.record(level=sp.level, value=new_value.value)
 
-    def build_token_metadata(self, token_id):
+    @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
+    def add_tokens_to_owner(self, params):
+        sp.set_type(params, sp.TRecord(owner=sp.TAddress, first_token_id=TOKEN_ID, amount=sp.TNat))
+
+        balance = sp.local('balance', self.data.balance_of_owner.get(params.owner, sp.nat(0)))
+        token_id = sp.local('token_id', params.first_token_id)
+        sp.while token_id.value < params.first_token_id + params.amount:
+            self.data.tokens_of_owner[sp.pair(params.owner, balance.value)] = token_id.value
+            self.data.owner_token_index[token_id.value] = balance.value
+            balance.value = balance.value + 1
+            token_id.value = token_id.value + 1
+        self.data.balance_of_owner[params.owner] = balance.value
+
+    @sp.private_lambda(with_storage="read-write", with_operations=False, wrap_call=True)
+    def remove_token_from_owner(self, params):
+        sp.set_type(params, sp.TRecord(owner=sp.TAddress, token_id=TOKEN_ID))
+
+        # The last token of the owner takes the place of the removed one
+        index = sp.local('index', self.data.owner_token_index.get(params.token_id, message=Error.ErrorMessage.balance_inconsistency()))
+        balance = sp.local('balance', self.data.balance_of_owner.get(params.owner, message=Error.ErrorMessage.balance_inconsistency()))
+        last_index = sp.local('last_index', sp.is_nat(balance.value - 1).open_some(Error.ErrorMessage.balance_inconsistency()))
+        sp.if index.value != last_index.value:
+            last_token_id = sp.local('last_token_id', self.data.tokens_of_owner.get(sp.pair(params.owner, last_index.value), message=Error.ErrorMessage.balance_inconsistency()))
+            self.data.tokens_of_owner[sp.pair(params.owner, index.value)] = last_token_id.value
+            self.data.owner_token_index[last_token_id.value] = index.value
+        del self.data.tokens_of_owner[sp.pair(params.owner, last_index.value)]
+        del self.data.owner_token_index[params.token_id]
+
+        sp.if last_index.value == 0:
+            del self.data.balance_of_owner[params.owner]
+        sp.else:
+            self.data.balance_of_owner[params.owner] = last_index.value
+
+    def make_token_page(self, tokens, next_offset, end):
+        # The offset of the next page is returned as long as the end is not reached so that the views can be
+        # streamed through by calling them again with next_offset until it is none
+        page = sp.local('page', sp.set_type_expr(sp.record(tokens=tokens, next_offset=sp.none), TOKEN_PAGE_TYPE))
+        sp.if next_offset < end:
+            page.value.next_offset = sp.some(next_offset)
+        return page.value
+
+    def mint_tokens(self, params, formats):
+        sp.verify(params.amount > 0, message=Error.ErrorMessage.invalid_parameter())
+        sp.verify(self.data.minted_tokens + params.amount <= self.data.max_supply, message=Error.ErrorMessage.no_land_available())
+        sp.if self.data.reveal_commitment.is_some():
+            sp.verify(self.data.minted_tokens + params.amount <= self.data.reveal_commitment.open_some().size, message=Error.ErrorMessage.no_land_available())
+
+        first_token_id = sp.local('first_token_id', self.data.minted_tokens)
+        sp.while self.data.minted_tokens < first_token_id.value + params.amount:
+            self.data.ledger[self.data.minted_tokens] = params.address
+            self.build_token_metadata(self.data.minted_tokens, formats)
+            self.data.minted_tokens = self.data.minted_tokens + 1
+
+            # Same event per token as the mint entrypoint, which the indexers already follow
+            sp.emit(sp.record(sender=sp.sender, receiver=params.address), with_type=True, tag="mint")
+
+        self.add_tokens_to_owner(sp.record(owner=params.address, first_token_id=first_token_id.value, amount=params.amount))
+
+        # Update voting power once for the whole batch
+        self.update_voting_power(sp.record(address=params.address, delta=sp.to_int(params.amount)))
+
+        # Send an event for the whole batch in addition to the event of each token
+        event = sp.record(sender=sp.sender, receiver=params.address, first_token_id=first_token_id.value, amount=params.amount)
+        sp.emit(event, with_type=True, tag="mint_batch")
+
+    def prepare_token_metadata(self):
+        # Read what is shared by all the tokens minted in the same operation
+        if self.compact_token_metadata:
+            return None
+        return self.data.generic_formats
+
+    def build_token_metadata(self, token_id, formats):
         # set type
         sp.set_type(token_id, sp.TNat)
 
-        # asserts
-        sp.verify(~self.data.token_metadata.contains(token_id), Error.ErrorMessage.invalid_token_metadata())
-
-        nat_to_bytes = sp.local('nat_to_bytes', sp.map(l={sp.nat(0): sp.bytes('0x30'),
-                                                          sp.nat(1): sp.bytes('0x31'),
-                                                          sp.nat(2): sp.bytes('0x32'),
-                                                          sp.nat(3): sp.bytes('0x33'),
-                                                          sp.nat(4): sp.bytes('0x34'),
-                                                          sp.nat(5): sp.bytes('0x35'),
-                                                          sp.nat(6): sp.bytes('0x36'),
-                                                          sp.nat(7): sp.bytes('0x37'),
-                                                          sp.nat(8): sp.bytes('0x38'),
-                                                          sp.nat(9): sp.bytes('0x39')}, tkey=sp.TNat,
-                                                       tvalue=sp.TBytes))
+        if self.compact_token_metadata:
+            # asserts
+            sp.verify(~self.data.token_data.contains(token_id), Error.ErrorMessage.invalid_token_metadata())
+
+            self.data.token_data[token_id] = sp.record(date=sp.now, royalties=self.data.royalties)
+        else:
+            # asserts
+            sp.verify(~self.data.token_metadata.contains(token_id), Error.ErrorMessage.invalid_token_metadata())
+
+            sp.set_type(formats, sp.TBytes)
+            token_id_string = self.token_id_to_bytes(token_id)
+            meta_map = self.create_token_metadata(token_id_string, sp.pack(sp.now), self.data.royalties, formats)
+            self.data.token_metadata[token_id] = sp.pair(token_id, meta_map)
+
+        self.set_unrevealed_token(token_id)
+
+    def reveal_token_artwork(self, token_id, artwork):
+        sp.verify(self.data.ledger.contains(token_id), message=Error.Fa2ErrorMessage.token_undefined())
+        if self.compact_token_metadata:
+            # Only the artwork record is stored. The token_metadata view merges it in.
+            sp.verify(self.data.token_data.contains(token_id), message=Error.Fa2ErrorMessage.token_undefined())
+            sp.verify(~self.data.token_artwork.contains(token_id), message=Error.ErrorMessage.token_revealed())
+            self.data.token_artwork[token_id] = artwork
+        else:
+            info = sp.local('info', sp.snd(self.data.token_metadata.get(token_id, message=Error.Fa2ErrorMessage.token_undefined())))
+            sp.verify(info.value.get(REVEALED_METADATA, message=Error.Fa2ErrorMessage.token_undefined()) == sp.utils.bytes_of_string("false"), message=Error.ErrorMessage.token_revealed())
 
+            my_map = sp.local('my_map', self.reveal_token_metadata(info.value, artwork))
+            self.data.token_metadata[token_id] = sp.pair(token_id, my_map.value)
+
+        self.clear_unrevealed_token(token_id)
+
+        sp.emit(token_id, with_type=True, tag="update_artwork_data")
+
+    def set_unrevealed_token(self, token_id):
+        chunk = token_id // UNREVEALED_CHUNK_SIZE
+        self.data.unrevealed_tokens[chunk] = self.data.unrevealed_tokens.get(chunk, sp.nat(0)) | (sp.nat(1) << (token_id % UNREVEALED_CHUNK_SIZE))
+
+    def is_unrevealed_token(self, token_id):
+        bitmap = self.data.unrevealed_tokens.get(token_id // UNREVEALED_CHUNK_SIZE, sp.nat(0))
+        return (bitmap >> (token_id % UNREVEALED_CHUNK_SIZE)) & 1 == 1
+
+    def clear_unrevealed_token(self, token_id):
+        chunk = sp.local('chunk', token_id // UNREVEALED_CHUNK_SIZE)
+        bit = sp.local('bit', sp.nat(1) << (token_id % UNREVEALED_CHUNK_SIZE))
+        bitmap = sp.local('bitmap', self.data.unrevealed_tokens.get(chunk.value, message=Error.ErrorMessage.token_revealed()))
+        sp.verify(bitmap.value & bit.value == bit.value, message=Error.ErrorMessage.token_revealed())
+        bitmap.value = sp.is_nat(bitmap.value - bit.value).open_some(Error.ErrorMessage.token_revealed())
+        sp.if bitmap.value == 0:
+            del self.data.unrevealed_tokens[chunk.value]
+        sp.else:
+            self.data.unrevealed_tokens[chunk.value] = bitmap.value
+
+    @sp.private_lambda(with_operations=False, wrap_call=True)
+    def token_id_to_bytes(self, token_id):
+        sp.set_type(token_id, sp.TNat)
+
+        # The digits are rendered two by two from the DIGIT_PAIRS table
         x = sp.local('x', token_id)
         token_id_string = sp.local('token_id_string', sp.bytes('0x'))
-        sp.if x.value == 0:
-            token_id_string.value = sp.concat([token_id_string.value, nat_to_bytes.value[0]])
+        sp.while 100 <= x.value:
+            token_id_string.value = sp.concat([sp.slice(DIGIT_PAIRS, 2 * (x.value % 100), 2).open_some(), token_id_string.value])
+            x.value //= 100
+        sp.if 10 <= x.value:
+            token_id_string.value = sp.concat([sp.slice(DIGIT_PAIRS, 2 * x.value, 2).open_some(), token_id_string.value])
         sp.else:
-            sp.while 0 < x.value:
-                token_id_string.value = sp.concat([nat_to_bytes.value[x.value % 10], token_id_string.value])
-                x.value //= 10
-
-        name = sp.concat([self.name_prefix, token_id_string.value])
+            token_id_string.value = sp.concat([sp.slice(DIGIT_PAIRS, 2 * x.value + 1, 1).open_some(), token_id_string.value])
+        sp.result(token_id_string.value)
 
-        formats = sp.local('formats', self.create_format_metadata(self.data.generic_image_ipfs,
-                                                                  self.data.generic_image_ipfs_display,
-                                                                  self.data.generic_image_ipfs_thumbnail,
-                                                                  self.artifact_file_size_generic,
-                                                                  self.display_file_size_generic,
-                                                                  self.thumbnail_file_size_generic))
+    def create_token_metadata(self, token_id_string, date, royalties, formats):
+        name = sp.concat([self.name_prefix, token_id_string])
 
-        meta_map = sp.map(l={
+        return sp.map(l={
             NAME_METADATA: name,
             SYMBOL_METADATA: self.symbol,
             DECIMALS_METADATA: sp.utils.bytes_of_string(DECIMALS),
             LANGUAGE_METADATA: self.language,
             DESCRIPTION_METADATA: self.description,
-            DATE_METADATA: sp.pack(sp.now),
+            DATE_METADATA: date,
             ARTIFACTURI_METADATA: self.data.generic_image_ipfs,
             DISPLAYURI_METADATA: self.data.generic_image_ipfs_display,
             THUMBNAILURI_METADATA: self.data.generic_image_ipfs_thumbnail,
@@ -747,14 +1297,36 @@ class AngryTeenagers(sp.Contract):
             SHOULDPREFERSYMBOL_METADATA: sp.utils.bytes_of_string(SHOULDPREFERSYMBOL),
             CREATORS_METADATA: self.creators,
             PROJECTNAME_METADATA: self.project_name,
-            FORMATS_METADATA: formats.value,
+            FORMATS_METADATA: formats,
             WHAT3WORDSFILE_METADATA: self.data.what3words_file_ipfs,
-            WHAT3WORDID_METADATA: token_id_string.value,
+            WHAT3WORDID_METADATA: token_id_string,
             REVEALED_METADATA: sp.utils.bytes_of_string(REVEALED),
-            ROYALTIES_METADATA: self.data.royalties,
+            ROYALTIES_METADATA: royalties,
         })
 
-        self.data.token_metadata[token_id] = sp.pair(token_id, meta_map)
+    def reveal_token_metadata(self, token_info, artwork):
+        my_map = sp.local('my_map', sp.update_map(token_info, REVEALED_METADATA, sp.some(sp.utils.bytes_of_string("true"))))
+        my_map.value = sp.update_map(my_map.value, ARTIFACTURI_METADATA, sp.some(artwork.artifact_uri))
+        my_map.value = sp.update_map(my_map.value, DISPLAYURI_METADATA, sp.some(artwork.display_uri))
+        my_map.value = sp.update_map(my_map.value, THUMBNAILURI_METADATA, sp.some(artwork.thumbnail_uri))
+        my_map.value = sp.update_map(my_map.value, ATTRIBUTES_METADATA, sp.some(artwork.attributes))
+
+        formats = sp.local(FORMATS_METADATA, self.create_format_metadata(artwork.artifact_uri,
+                                                                         artwork.display_uri,
+                                                                         artwork.thumbnail_uri,
+                                                                         artwork.artifact_size,
+                                                                         artwork.display_size,
+                                                                         artwork.thumbnail_size))
+        my_map.value = sp.update_map(my_map.value, FORMATS_METADATA, sp.some(formats.value))
+        return my_map.value
+
+    def create_generic_format_metadata(self):
+        return self.create_format_metadata(self.data.generic_image_ipfs,
+                                           self.data.generic_image_ipfs_display,
+                                           self.data.generic_image_ipfs_thumbnail,
+                                           self.artifact_file_size_generic,
+                                           self.display_file_size_generic,
+                                           self.thumbnail_file_size_generic)
 
     def create_format_metadata_per_uri(self, link, type, size, name, dimensions, unit):
         value = FORMAT_OPEN_CURLYBRACKET + FORMAT_URI + FORMAT_QUOTE + link + FORMAT_QUOTE + \
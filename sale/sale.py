@@ -34,7 +34,8 @@ STATE_EVENT_PUBLIC_SALE_6 = 6
 ########################################################################################################################
 ##################################################################################################################
 FA2_UPDATE_TOKEN_METADATA_PARAM_TYPE = sp.TRecord(token_id=sp.TNat,metadata=sp.TBytes)
-FA2_MINT_PARAM_TYPE = sp.TAddress
+FA2_MINT_BATCH_PARAM_TYPE = sp.TRecord(address=sp.TAddress, amount=sp.TNat).layout(("address", "amount"))
+FA2_MINT_BATCH_LIST_PARAM_TYPE = sp.TList(FA2_MINT_BATCH_PARAM_TYPE)
 
 ADMIN_FILL_ALLOWLIST_PARAM_TYPE=sp.TSet(sp.TAddress)
 ADMIN_FILL_PRE_ALLOWLIST_PARAM_TYPE=sp.TSet(sp.TAddress)
@@ -44,6 +45,24 @@ ADMIN_OPEN_PRE_SALE_PARAM_TYPE=sp.TRecord(max_supply=sp.TNat, max_per_user=sp.TN
 ADMIN_OPEN_PUBLIC_SALE_PARAM_TYPE=sp.TRecord(max_supply=sp.TNat, max_per_user=sp.TNat, price=sp.TMutez)
 ADMIN_OPEN_PUBLIC_SALE_WITH_ALLOWLIST_PARAM_TYPE=sp.TRecord(max_supply=sp.TNat, max_per_user=sp.TNat, price=sp.TMutez, mint_right=sp.TBool, mint_discount=sp.TMutez)
 ADMIN_UPDATE_TOKEN_METADATA_PARAM_TYPE = sp.TList(FA2_UPDATE_TOKEN_METADATA_PARAM_TYPE)
+ADMIN_MINT_AND_GIVE_BATCH_PARAM_TYPE = FA2_MINT_BATCH_LIST_PARAM_TYPE
+
+# The allowlists are keyed by (generation, address). clear_allowlist starts a new generation instead of removing
+# every entry.
+ALLOWLIST_KEY_TYPE = sp.TPair(sp.TNat, sp.TAddress)
+
+# The number of tokens minted by a user during a sale event is keyed by (event_id, address). Opening a sale event
+# starts a new event_id so the balances of the previous events do not need to be removed.
+EVENT_USER_BALANCE_KEY_TYPE = sp.TPair(sp.TNat, sp.TAddress)
+
+# Migration of the pilot (pre-sale) contract tokens. The tokens [start, start + limit) of its all_tokens list are
+# processed per call.
+ADMIN_PROCESS_PRESALE_PARAM_TYPE = sp.TRecord(presale=sp.TAddress, start=sp.TNat, limit=sp.TNat).layout(("presale", ("start", "limit")))
+
+# Pre-sale mint of an address part of the merkle allowlist. A leaf of the tree is blake2b(pack(pair(address, quota)))
+# and the proof lists the sibling hashes from the leaf to the root (see tools/merkle_allowlist.py).
+USER_MINT_WITH_PROOF_PARAM_TYPE = sp.TRecord(address=sp.TAddress, amount=sp.TNat, quota=sp.TNat, proof=sp.TList(sp.TBytes))
+MINT_TOKEN_AVAILABLE_WITH_PROOF_PARAM_TYPE = sp.TRecord(address=sp.TAddress, quota=sp.TNat, proof=sp.TList(sp.TBytes))
 
 ########################################################################################################################
 ########################################################################################################################
@@ -57,18 +76,26 @@ class AngryTeenagersSale(sp.Contract):
                 administrator=sp.TAddress,
                 next_administrator=sp.TOption(sp.TAddress),
                 multisig_fund_address=sp.TAddress,
+                fund_sweep_threshold=sp.TMutez,
                 fa2=sp.TAddress,
                 state=sp.TNat,
-                allowlist=sp.TSet(sp.TAddress),
-                pre_allowlist=sp.TSet(sp.TAddress),
+                allowlist=sp.TBigMap(ALLOWLIST_KEY_TYPE, sp.TUnit),
+                pre_allowlist=sp.TBigMap(ALLOWLIST_KEY_TYPE, sp.TUnit),
+                allowlist_generation=sp.TNat,
+                allowlist_size=sp.TNat,
+                pre_allowlist_size=sp.TNat,
+                allowlist_merkle_root=sp.TOption(sp.TBytes),
                 event_price=sp.TMutez,
                 event_max_supply=sp.TNat,
                 event_max_per_user=sp.TNat,
-                event_user_balance=sp.TBigMap(sp.TAddress, sp.TNat),
+                event_id=sp.TNat,
+                event_user_balance=sp.TBigMap(EVENT_USER_BALANCE_KEY_TYPE, sp.TNat),
                 public_allowlist_max_space=sp.TNat,
                 public_allowlist_space_taken=sp.TNat,
                 public_sale_allowlist_config=sp.TRecord(used=sp.TBool, discount=sp.TMutez, minting_rights=sp.TBool),
                 token_minted_in_event=sp.TNat,
+                presale_cursor=sp.TNat,
+                presale_done=sp.TBool,
                 metadata=sp.TBigMap(sp.TString, sp.TBytes)
             )
         )
@@ -77,35 +104,48 @@ class AngryTeenagersSale(sp.Contract):
             administrator=admin,
             next_administrator=sp.none,
             multisig_fund_address=multisig_fund_address,
+            # 0: the tez received are transferred to the multisig at each call. Otherwise they stay in the contract
+            # until the balance reaches the threshold or sweep_funds is called.
+            fund_sweep_threshold=sp.mutez(0),
             fa2=sp.address('KT1XmD6SKw6CFoxmGseB3ttws5n8sTXYkKkq'),
 
             state=sp.nat(STATE_NO_EVENT_OPEN_0),
 
-            allowlist=sp.set(l={}, t=sp.TAddress),
-            pre_allowlist=sp.set(l={}, t=sp.TAddress),
+            allowlist=sp.big_map(l={}, tkey=ALLOWLIST_KEY_TYPE, tvalue=sp.TUnit),
+            pre_allowlist=sp.big_map(l={}, tkey=ALLOWLIST_KEY_TYPE, tvalue=sp.TUnit),
+            allowlist_generation=sp.nat(0),
+            allowlist_size=sp.nat(0),
+            pre_allowlist_size=sp.nat(0),
+            allowlist_merkle_root=sp.none,
 
             event_price=sp.mutez(0),
             event_max_supply=sp.nat(0),
             event_max_per_user=sp.nat(0),
 
-            event_user_balance=sp.big_map(l={}, tkey=sp.TAddress, tvalue=sp.TNat),
+            event_id=sp.nat(0),
+            event_user_balance=sp.big_map(l={}, tkey=EVENT_USER_BALANCE_KEY_TYPE, tvalue=sp.TNat),
 
             public_allowlist_max_space=sp.nat(0),
             public_allowlist_space_taken=sp.nat(0),
             public_sale_allowlist_config=sp.record(used=sp.bool(False), discount=sp.mutez(0), minting_rights=sp.bool(False)),
 
             token_minted_in_event=sp.nat(0),
+            presale_cursor=sp.nat(0),
+            presale_done=sp.bool(False),
 
             metadata=metadata
         )
         list_of_views = [
-            self.get_mint_token_available
+            self.get_mint_token_available,
+            self.get_mint_token_available_batch,
+            self.get_mint_token_available_with_proof,
+            self.get_event_user_balance
         ]
 
         metadata_base = {
             "name": "Angry Teenagers CrowdSale"
             ,
-            "version": "1.1.1"
+            "version": "1.4.0"
             , "description": (
                 "Angry Teenagers Crowdsale contract"
             )
@@ -116,6 +156,8 @@ class AngryTeenagersSale(sp.Contract):
             , "homepage": "https://www.angryteenagers.xyz"
             , "views": list_of_views
         }
+        if Error.NUMERIC_ERRORS:
+            metadata_base["errors"] = Error.tzip16_errors()
         self.init_metadata("metadata_base", metadata_base)
 
 ########################################################################################################################
@@ -128,48 +170,42 @@ class AngryTeenagersSale(sp.Contract):
         # This may be a problem and makes it harder to be consistent. The total supply is defined by the lands available.
         # We can add some protection with a view.
         sp.set_type(params, sp.TAddress)
+        sp.result(self.mint_token_available(params, self.mint_event_status()))
 
-        user_balance = sp.local("user_balance", self.data.event_user_balance.get(params, 0))
+    @sp.offchain_view(pure=True)
+    def get_mint_token_available_batch(self, params):
+        """
+        Return the number of token each address of a list can mint"""
+        sp.set_type(params, sp.TList(sp.TAddress))
 
-        sp.if self.data.state == STATE_EVENT_PRESALE_5:
-            sp.if ~self.data.allowlist.contains(params):
-                sp.result(0)
-            sp.else:
-                sp.if self.data.token_minted_in_event >= self.data.event_max_supply:
-                    sp.result(0)
-                sp.else:
-                    sp.if user_balance.value >= self.data.event_max_per_user:
-                        sp.result(0)
-                    sp.else:
-                        remaining_user = self.data.event_max_per_user - user_balance.value
-                        remaining_event = self.data.event_max_supply - self.data.token_minted_in_event
-                        sp.if remaining_user < remaining_event:
-                            sp.result(remaining_user)
-                        sp.else:
-                            sp.result(remaining_event)
+        event = self.mint_event_status()
+        result = sp.local("result", sp.map(l={}, tkey=sp.TAddress, tvalue=sp.TInt))
+        sp.for address in params:
+            result.value[address] = self.mint_token_available(address, event)
+        sp.result(result.value)
 
+    @sp.offchain_view(pure=True)
+    def get_mint_token_available_with_proof(self, params):
+        """
+        Return the number of token an address can mint, using its quota and proof in the merkle allowlist"""
+        sp.set_type(params, MINT_TOKEN_AVAILABLE_WITH_PROOF_PARAM_TYPE)
+
+        event = self.mint_event_status()
+        available = sp.local("available_with_proof", sp.int(0))
+        sp.if (event.state == STATE_EVENT_PRESALE_5) & self.is_valid_merkle_proof(params.address, params.quota, params.proof):
+            # The quota replaces the maximum number of tokens per user of the event, as in user_mint_with_proof
+            user_balance = self.data.event_user_balance.get(sp.pair(event.event_id, params.address), 0)
+            available.value = self.remaining_in_event(user_balance, params.quota, event.remaining_event)
         sp.else:
-            sp.if self.data.state == STATE_EVENT_PUBLIC_SALE_6:
-                sp.if ~(self.data.allowlist.contains(params) & self.data.public_sale_allowlist_config.minting_rights):
-                    sp.if self.data.token_minted_in_event >= self.data.event_max_supply:
-                        sp.result(0)
-                    sp.else:
-                        sp.if user_balance.value >= self.data.event_max_per_user:
-                            sp.result(0)
-                        sp.else:
-                            remaining_user = self.data.event_max_per_user - user_balance.value
-                            remaining_event = self.data.event_max_supply - self.data.token_minted_in_event
-                            sp.if remaining_user < remaining_event:
-                                sp.result(remaining_user)
-                            sp.else:
-                                sp.result(remaining_event)
-                sp.else:
-                    sp.if user_balance.value >= self.data.event_max_per_user:
-                        sp.result(0)
-                    sp.else:
-                        sp.result(self.data.event_max_per_user - user_balance.value)
-            sp.else:
-                sp.result(0)
+            available.value = self.mint_token_available(params.address, event)
+        sp.result(available.value)
+
+    @sp.offchain_view(pure=True)
+    def get_event_user_balance(self, params):
+        """
+        Return the number of tokens an address minted during a sale event (current or past)"""
+        sp.set_type(params, EVENT_USER_BALANCE_KEY_TYPE)
+        sp.result(self.data.event_user_balance.get(params, 0))
 
 
 ########################################################################################################################
@@ -189,8 +225,24 @@ class AngryTeenagersSale(sp.Contract):
                   message=Error.ErrorMessage.sale_event_already_open())
 
         sp.for item in params.elements():
-            sp.if ~self.data.allowlist.contains(item):
-                self.data.allowlist.add(item)
+            self.add_to_allowlist(item)
+
+########################################################################################################################
+# set_allowlist_merkle_root
+########################################################################################################################
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_allowlist_merkle_root(self, params):
+        """Admin commits the root of the merkle allowlist (or removes it)"""
+        sp.set_type(params, sp.TOption(sp.TBytes))
+
+        # Only for admin
+        sp.verify(self.is_administrator(), message=Error.ErrorMessage.unauthorized_user())
+
+        sp.verify(~self.is_any_event_open(), message=Error.ErrorMessage.sale_event_already_open())
+
+        self.data.allowlist_merkle_root = params
+
+        sp.emit(params, with_type=True, tag="set_allowlist_merkle_root")
 
 ########################################################################################################################
 # admin_fill_pre_allowlist
@@ -207,8 +259,9 @@ class AngryTeenagersSale(sp.Contract):
         sp.verify(self.data.state == STATE_NO_EVENT_OPEN_0, message=Error.ErrorMessage.sale_event_already_open())
 
         sp.for item in params.elements():
-            sp.if ~self.data.pre_allowlist.contains(item):
-                self.data.pre_allowlist.add(item)
+            sp.if ~self.is_in_pre_allowlist(item):
+                self.data.pre_allowlist[self.allowlist_key(item)] = sp.unit
+                self.data.pre_allowlist_size = self.data.pre_allowlist_size + 1
 
 ########################################################################################################################
 # admin_open_event_private_allowlist
@@ -239,11 +292,12 @@ class AngryTeenagersSale(sp.Contract):
         sp.verify(self.data.state == STATE_EVENT_PRIV_ALLOWLIST_REG_1, message=Error.ErrorMessage.sale_event_already_open())
 
         # Must be on the pre_allowlist
-        sp.verify(self.data.pre_allowlist.contains(sp.sender), message=Error.ErrorMessage.forbidden_operation())
-        sp.verify(sp.amount == self.data.event_price)
+        sp.verify(self.is_in_pre_allowlist(sp.sender), message=Error.ErrorMessage.forbidden_operation())
+        sp.verify(sp.amount == self.data.event_price, message=Error.ErrorMessage.invalid_amount())
         self.redirect_fund(sp.amount)
-        self.data.pre_allowlist.remove(sp.sender)
-        self.data.allowlist.add(sp.sender)
+        del self.data.pre_allowlist[self.allowlist_key(sp.sender)]
+        self.data.pre_allowlist_size = sp.is_nat(self.data.pre_allowlist_size - 1).open_some(Error.ErrorMessage.forbidden_operation())
+        self.add_to_allowlist(sp.sender)
 
         sp.emit(sp.sender, with_type=True, tag="pay_to_enter_allowlist_priv")
 
@@ -280,17 +334,17 @@ class AngryTeenagersSale(sp.Contract):
         sp.verify(self.data.state == STATE_EVENT_PUB_ALLOWLIST_REG_3, message=Error.ErrorMessage.sale_event_already_open())
 
         # Not already in the list
-        sp.verify(~self.data.allowlist.contains(sp.sender), message=Error.ErrorMessage.forbidden_operation())
+        sp.verify(~self.is_in_allowlist(sp.sender), message=Error.ErrorMessage.forbidden_operation())
 
         # Enough space remaining
         sp.verify(self.data.public_allowlist_space_taken < self.data.public_allowlist_max_space,
                   message=Error.ErrorMessage.sale_no_space_remaining())
 
-        sp.verify(sp.amount == self.data.event_price)
+        sp.verify(sp.amount == self.data.event_price, message=Error.ErrorMessage.invalid_amount())
         self.redirect_fund(sp.amount)
 
         self.data.public_allowlist_space_taken = self.data.public_allowlist_space_taken + 1
-        self.data.allowlist.add(sp.sender)
+        self.add_to_allowlist(sp.sender)
 
         sp.if self.data.public_allowlist_space_taken >= self.data.public_allowlist_max_space:
             self.stop_internal_event()
@@ -414,6 +468,25 @@ class AngryTeenagersSale(sp.Contract):
         sp.emit(event, with_type=True, tag="mint")
 
 
+########################################################################################################################
+# user_mint_with_proof
+########################################################################################################################
+    @sp.entry_point
+    def user_mint_with_proof(self, params):
+        sp.set_type(params, USER_MINT_WITH_PROOF_PARAM_TYPE)
+
+        sp.verify(params.amount > 0, message=Error.ErrorMessage.sale_no_token())
+
+        # Only during the pre-sale
+        sp.verify(self.data.state == STATE_EVENT_PRESALE_5, message=Error.ErrorMessage.forbidden_operation())
+
+        # The quota committed in the merkle allowlist replaces the maximum number of tokens per user of the event
+        self.check_merkle_proof(params.address, params.quota, params.proof)
+        self.mint_allowed_user(params, params.quota)
+
+        event = sp.record(sender=sp.sender, receiver=params.address, amount=params.amount)
+        sp.emit(event, with_type=True, tag="mint")
+
 ########################################################################################################################
 # close_any_open_event
 ########################################################################################################################
@@ -443,6 +516,30 @@ class AngryTeenagersSale(sp.Contract):
         event = sp.record(sender=sp.sender, receiver=params.address, amount=params.amount)
         sp.emit(event, with_type=True, tag="mint_and_give")
 
+########################################################################################################################
+# mint_and_give_batch
+########################################################################################################################
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def mint_and_give_batch(self, params):
+        """Give away some reserved NFTs to several users"""
+        sp.set_type(params, ADMIN_MINT_AND_GIVE_BATCH_PARAM_TYPE)
+        sp.verify(self.is_administrator(), message=Error.ErrorMessage.unauthorized_user())
+        # All events must be closed
+        sp.verify(~self.is_any_event_open(), message=Error.ErrorMessage.sale_event_already_open())
+
+        total = sp.local('total', sp.nat(0))
+        sp.for recipient in params:
+            sp.verify(recipient.amount > 0, message=Error.ErrorMessage.invalid_parameter())
+            total.value = total.value + recipient.amount
+        sp.verify(total.value > 0, message=Error.ErrorMessage.invalid_parameter())
+
+        # Mint the token(s) of all the users in a single operation
+        sp.transfer(params, sp.mutez(0), sp.contract(FA2_MINT_BATCH_LIST_PARAM_TYPE,
+                                                     self.data.fa2, entry_point="mint_batch_list").open_some(Error.ErrorMessage.interface_mismatch()))
+
+        event = sp.record(sender=sp.sender, recipients=sp.len(params), amount=total.value)
+        sp.emit(event, with_type=True, tag="mint_and_give_batch")
+
 ########################################################################################################################
 # set_next_administrator
 ########################################################################################################################
@@ -473,6 +570,25 @@ class AngryTeenagersSale(sp.Contract):
         sp.verify(self.is_administrator(), message=Error.ErrorMessage.unauthorized_user())
         self.data.multisig_fund_address = params
 
+########################################################################################################################
+# set_fund_sweep_threshold
+########################################################################################################################
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def set_fund_sweep_threshold(self, params):
+        """Keep the Tez in the contract until the balance reaches the threshold (0 to transfer them at each call). Reserve to Admin"""
+        sp.set_type(params, sp.TMutez)
+        sp.verify(self.is_administrator(), message=Error.ErrorMessage.unauthorized_user())
+        self.data.fund_sweep_threshold = params
+
+########################################################################################################################
+# sweep_funds
+########################################################################################################################
+    @sp.entry_point(check_no_incoming_transfer=True)
+    def sweep_funds(self):
+        """Transfer the Tez kept in the contract to the multisig. Reserve to Admin"""
+        sp.verify(self.is_administrator(), message=Error.ErrorMessage.unauthorized_user())
+        self.sweep()
+
 ########################################################################################################################
 # register_fa2
 ########################################################################################################################
@@ -491,8 +607,11 @@ class AngryTeenagersSale(sp.Contract):
         sp.verify(~self.is_any_event_open(), message=Error.ErrorMessage.sale_event_already_open())
         self.clear_storage()
         self.data.state = STATE_NO_EVENT_OPEN_0
-        self.data.allowlist = sp.set(l={}, t=sp.TAddress)
-        self.data.pre_allowlist = sp.set(l={}, t=sp.TAddress)
+        # The entries of the previous generation are left in the big maps but are not read anymore
+        self.data.allowlist_generation = self.data.allowlist_generation + 1
+        self.data.allowlist_size = sp.nat(0)
+        self.data.pre_allowlist_size = sp.nat(0)
+        self.data.allowlist_merkle_root = sp.none
 
         sp.emit(sp.unit, with_type=True, tag="clear_allowlist")
 
@@ -503,28 +622,56 @@ class AngryTeenagersSale(sp.Contract):
     def admin_process_presale(self, params):
         sp.verify(self.is_administrator(), message=Error.ErrorMessage.unauthorized_user())
         sp.verify(~self.is_any_event_open(), message=Error.ErrorMessage.sale_event_already_open())
-        sp.set_type(params, sp.TAddress)
+        sp.set_type(params, ADMIN_PROCESS_PRESALE_PARAM_TYPE)
 
-        tokens = sp.local('tokens', sp.view("all_tokens", params, sp.unit).open_some(message=Error.ErrorMessage.invalid_parameter()))
+        # The chunks of the pilot token list are processed in order. A chunk already processed cannot be processed again.
+        sp.verify(~self.data.presale_done, message=Error.ErrorMessage.forbidden_operation())
+        sp.verify(params.start == self.data.presale_cursor, message=Error.ErrorMessage.invalid_parameter())
+        sp.verify(params.limit > 0, message=Error.ErrorMessage.invalid_parameter())
 
+        # The pilot contract is already deployed so only its existing views are used
+        tokens = sp.local('tokens', sp.view("all_tokens", params.presale, sp.unit).open_some(message=Error.ErrorMessage.invalid_parameter()))
+
+        # Consecutive tokens of the same owner are minted with a single mint_batch
         burn_list = sp.local("burn_list", sp.list(l={}, t=sp.TNat))
+        run_owner = sp.local("run_owner", sp.none, t=sp.TOption(sp.TAddress))
+        run_amount = sp.local("run_amount", sp.nat(0))
+        index = sp.local("index", sp.nat(0))
         sp.for token in tokens.value:
-            is_burn = sp.local('is_burn', sp.view("is_token_burned", params, token).open_some(message=Error.ErrorMessage.invalid_parameter()))
+            sp.if (params.start <= index.value) & (index.value < params.start + params.limit):
+                is_burn = sp.local('is_burn', sp.view("is_token_burned", params.presale, token).open_some(message=Error.ErrorMessage.invalid_parameter()))
 
-            sp.if ~is_burn.value:
-                owner = sp.local('owner', sp.view("get_token_owner", params, token).open_some(message=Error.ErrorMessage.invalid_parameter()))
-                self.mint_internal(amount=1, address=owner.value)
-                burn_list.value.push(token)
+                sp.if ~is_burn.value:
+                    owner = sp.local('owner', sp.view("get_token_owner", params.presale, token).open_some(message=Error.ErrorMessage.invalid_parameter()))
+                    sp.if run_owner.value == sp.some(owner.value):
+                        run_amount.value = run_amount.value + 1
+                    sp.else:
+                        sp.if run_owner.value.is_some():
+                            self.mint_internal(amount=run_amount.value, address=run_owner.value.open_some())
+                        run_owner.value = sp.some(owner.value)
+                        run_amount.value = 1
+                    burn_list.value.push(token)
+            index.value = index.value + 1
+        sp.if run_owner.value.is_some():
+            self.mint_internal(amount=run_amount.value, address=run_owner.value.open_some())
+
+        # The migration is over once the last token of the pilot contract is processed
+        self.data.presale_cursor = sp.min(params.start + params.limit, index.value)
+        self.data.presale_done = self.data.presale_cursor == index.value
 
         presale_contract_handle = sp.contract(
             sp.TList(sp.TNat),
-            params,
+            params.presale,
             "burn"
-        ).open_some("Interface mismatch")
+        ).open_some(Error.ErrorMessage.interface_mismatch())
 
         presale_contract_arg = burn_list.value
         self.call(presale_contract_handle, presale_contract_arg)
 
+        event = sp.record(presale=params.presale, start=params.start, next_start=self.data.presale_cursor,
+                          done=self.data.presale_done)
+        sp.emit(event, with_type=True, tag="admin_process_presale")
+
 
 ########################################################################################################################
 # mutez_transfer
@@ -545,11 +692,67 @@ class AngryTeenagersSale(sp.Contract):
     def is_administrator(self):
         return sp.sender == self.data.administrator
 
+    def allowlist_key(self, address):
+        return sp.pair(self.data.allowlist_generation, address)
+
+    def is_in_allowlist(self, address):
+        return self.data.allowlist.contains(self.allowlist_key(address))
+
+    def is_in_pre_allowlist(self, address):
+        return self.data.pre_allowlist.contains(self.allowlist_key(address))
+
+    def event_user_key(self, address):
+        return sp.pair(self.data.event_id, address)
+
+    def mint_event_status(self):
+        # Fields of the current event read once by the get_mint_token_available views
+        remaining_event = sp.local("remaining_event", sp.int(0))
+        sp.if self.data.token_minted_in_event < self.data.event_max_supply:
+            remaining_event.value = self.data.event_max_supply - self.data.token_minted_in_event
+        return sp.local("mint_event", sp.record(state=self.data.state,
+                                                 event_id=self.data.event_id,
+                                                 allowlist_generation=self.data.allowlist_generation,
+                                                 max_per_user=self.data.event_max_per_user,
+                                                 remaining_event=remaining_event.value,
+                                                 minting_rights=self.data.public_sale_allowlist_config.minting_rights)).value
+
+    def mint_token_available(self, address, event):
+        available = sp.local("available", sp.int(0))
+        user_balance = sp.local("user_balance", self.data.event_user_balance.get(sp.pair(event.event_id, address), 0))
+        in_allowlist = sp.local("in_allowlist", self.data.allowlist.contains(sp.pair(event.allowlist_generation, address)))
+
+        # Presale users and public sale users without minting rights are limited by the supply of the event
+        limited_by_event = sp.local("limited_by_event",
+                                    ((event.state == STATE_EVENT_PRESALE_5) & in_allowlist.value) |
+                                    ((event.state == STATE_EVENT_PUBLIC_SALE_6) & ~(in_allowlist.value & event.minting_rights)))
+        sp.if limited_by_event.value:
+            available.value = self.remaining_in_event(user_balance.value, event.max_per_user, event.remaining_event)
+        sp.else:
+            # Public sale users with minting rights
+            sp.if (event.state == STATE_EVENT_PUBLIC_SALE_6) & (user_balance.value < event.max_per_user):
+                available.value = event.max_per_user - user_balance.value
+        return available.value
+
+    def remaining_in_event(self, user_balance, max_per_user, remaining_event):
+        # Tokens a user can still mint, limited by its maximum and by the supply left in the event
+        remaining = sp.local("remaining_in_event", sp.int(0))
+        sp.if (remaining_event > 0) & (user_balance < max_per_user):
+            remaining_user = max_per_user - user_balance
+            sp.if remaining_user < remaining_event:
+                remaining.value = remaining_user
+            sp.else:
+                remaining.value = remaining_event
+        return remaining.value
+
+    def add_to_allowlist(self, address):
+        sp.if ~self.is_in_allowlist(address):
+            self.data.allowlist[self.allowlist_key(address)] = sp.unit
+            self.data.allowlist_size = self.data.allowlist_size + 1
+
     def clear_storage(self):
         self.data.event_price = sp.mutez(0)
         self.data.event_max_supply = sp.nat(0)
         self.data.event_max_per_user = sp.nat(0)
-        self.data.event_user_balance = sp.big_map(l={}, tkey=sp.TAddress, tvalue=sp.TNat)
         self.data.public_allowlist_max_space = sp.nat(0)
         self.data.public_allowlist_space_taken = sp.nat(0)
         self.data.public_sale_allowlist_config.used = False
@@ -568,15 +771,14 @@ class AngryTeenagersSale(sp.Contract):
                 self.data.state = STATE_NO_EVENT_OPEN_0
 
     def mint_internal(self, amount, address):
-        # Mint token(s) and transfer them to user
-        minted = sp.local("minted", sp.nat(0))
-        sp.while minted.value < amount: 
-            sp.transfer(address, sp.mutez(0), sp.contract(FA2_MINT_PARAM_TYPE,
-                                          self.data.fa2, entry_point="mint").open_some())
-            minted.value = minted.value + 1
+        # Mint token(s) and transfer them to user in a single operation
+        amount = sp.set_type_expr(amount, sp.TNat)
+        sp.if amount > 0:
+            sp.transfer(sp.record(address=address, amount=amount), sp.mutez(0), sp.contract(FA2_MINT_BATCH_PARAM_TYPE,
+                                          self.data.fa2, entry_point="mint_batch").open_some(Error.ErrorMessage.interface_mismatch()))
 
     def start_sale_init(self, max_supply, max_per_user, price):
-        self.data.event_user_balance = sp.big_map(l={}, tkey=sp.TAddress, tvalue=sp.TNat)
+        self.data.event_id = self.data.event_id + 1
         self.data.token_minted_in_event = 0
         self.data.event_max_supply = max_supply
         self.data.event_max_per_user = max_per_user
@@ -596,39 +798,55 @@ class AngryTeenagersSale(sp.Contract):
 
     def mint_pre_sale(self, params):
         # Pre-sale. Must be on the allow list
-        sp.verify(self.data.allowlist.contains(params.address), message=Error.ErrorMessage.forbidden_operation())
+        sp.verify(self.is_in_allowlist(params.address), message=Error.ErrorMessage.forbidden_operation())
+        self.mint_allowed_user(params, self.data.event_max_per_user)
 
+    def mint_allowed_user(self, params, max_per_user):
         # Enough supply
         sp.verify(self.data.token_minted_in_event + params.amount <= self.data.event_max_supply,
                   message=Error.ErrorMessage.sale_no_token())
 
         # User minted his token already ?
-        user_balance = sp.local("user_balance", self.data.event_user_balance.get(params.address, 0))
+        user_balance = sp.local("user_balance", self.data.event_user_balance.get(self.event_user_key(params.address), 0))
 
-        sp.verify(user_balance.value + params.amount <= self.data.event_max_per_user,
+        sp.verify(user_balance.value + params.amount <= max_per_user,
                   message=Error.ErrorMessage.sale_no_token())
 
         # User gave the right amount of Tez. If yes transfer these Tez to the transfer address
         self.check_amount_and_transfer_tez(params.amount, self.data.event_price)
         self.mint_internal(params.amount, params.address)
 
-        self.data.event_user_balance[params.address] = user_balance.value + params.amount
+        self.data.event_user_balance[self.event_user_key(params.address)] = user_balance.value + params.amount
         self.data.token_minted_in_event = self.data.token_minted_in_event + params.amount
 
+    def check_merkle_proof(self, address, quota, proof):
+        sp.verify(self.is_valid_merkle_proof(address, quota, proof), message=Error.ErrorMessage.sale_invalid_proof())
+
+    def is_valid_merkle_proof(self, address, quota, proof):
+        # Hash the leaf up to the root. Each pair of nodes is hashed in ascending order so the proof does not need to
+        # say on which side the sibling is.
+        node = sp.local('node', sp.blake2b(sp.pack(sp.pair(address, quota))))
+        sp.for sibling in proof:
+            sp.if node.value < sibling:
+                node.value = sp.blake2b(sp.concat([node.value, sibling]))
+            sp.else:
+                node.value = sp.blake2b(sp.concat([sibling, node.value]))
+        return self.data.allowlist_merkle_root == sp.some(node.value)
+
     def mint_public_sale(self, params):
-        sp.if ~(self.data.allowlist.contains(params.address) & self.data.public_sale_allowlist_config.minting_rights):
+        sp.if ~(self.is_in_allowlist(params.address) & self.data.public_sale_allowlist_config.minting_rights):
             sp.verify(self.data.token_minted_in_event + params.amount <= self.data.event_max_supply,
                       message=Error.ErrorMessage.sale_no_token())
             self.data.token_minted_in_event = self.data.token_minted_in_event + params.amount
 
         # User minted his token already ?
-        user_event_balance = sp.local("user_event_balance", self.data.event_user_balance.get(params.address, 0))
+        user_event_balance = sp.local("user_event_balance", self.data.event_user_balance.get(self.event_user_key(params.address), 0))
 
         sp.verify(user_event_balance.value + params.amount <= self.data.event_max_per_user,
                   message=Error.ErrorMessage.forbidden_operation())
 
         # User gave the right amount of Tez. If yes transfer these Tez to the transfer address
-        sp.if self.data.allowlist.contains(params.address):
+        sp.if self.is_in_allowlist(params.address):
             self.check_amount_and_transfer_tez(params.amount,
                                                self.data.event_price - self.data.public_sale_allowlist_config.discount)
         sp.else:
@@ -636,8 +854,17 @@ class AngryTeenagersSale(sp.Contract):
 
         self.mint_internal(params.amount, params.address)
 
-        self.data.event_user_balance[params.address] = user_event_balance.value + params.amount
+        self.data.event_user_balance[self.event_user_key(params.address)] = user_event_balance.value + params.amount
 
     def redirect_fund(self, amount):
-        sp.if amount > sp.mutez(0):
-            sp.send(self.data.multisig_fund_address, amount)
+        sp.if self.data.fund_sweep_threshold == sp.mutez(0):
+            sp.if amount > sp.mutez(0):
+                sp.send(self.data.multisig_fund_address, amount)
+        sp.else:
+            # Deferred mode. The balance already contains the amount received.
+            sp.if sp.balance >= self.data.fund_sweep_threshold:
+                self.sweep()
+
+    def sweep(self):
+        sp.if sp.balance > sp.mutez(0):
+            sp.send(self.data.multisig_fund_address, sp.balance)
@@ -443,7 +443,9 @@ def unit_test_propose_callback(is_default = True):
                                proposal_lambda=sp.none,
                                voting_strategy=0
                                )
+        scenario.verify(c1.get_oldest_snapshot_level() == sp.none)
         c1.propose(proposal_1).run(valid=True, sender=admin.address, level=snapshot_block)
+        scenario.verify(c1.get_oldest_snapshot_level() == sp.some(sp.nat(snapshot_block)))
 
         scenario.p("4. Only the chosen voting strategy can call the propose_callback")
         c1.propose_callback(propose_callback_params_valid).run(valid=False, sender=simulated_voting_strategy_two.address)
@@ -711,6 +713,7 @@ def unit_test_end_callback(is_default = True):
         scenario.verify(c1.data.state == DAO.NONE)
         scenario.verify(c1.data.next_proposal_id == 1)
         scenario.verify(~c1.data.ongoing_poll.is_some())
+        scenario.verify(c1.get_oldest_snapshot_level() == sp.none)
         scenario.verify(c1.data.outcomes.contains(0))
         scenario.verify(c1.data.outcomes[0].outcome == DAO.PollOutcome.POLL_OUTCOME_PASSED)
         scenario.verify(c1.data.outcomes[0].poll_data.proposal.title == sp.string("Test1"))
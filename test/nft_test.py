@@ -41,13 +41,32 @@ REMAINING_ELEMS_IN_VOTING_POWER_AFTER_CLEANUP=100
 # Helper class for unit testing
 ########################################################################################################################
 class TestHelper():
+    class SimulatedDaoContract(sp.Contract):
+        def __init__(self):
+            self.init(snapshot_block=sp.none)
+            self.init_type(sp.TRecord(snapshot_block=sp.TOption(sp.TNat)))
+
+        @sp.entry_point
+        def set_snapshot_block(self, params):
+            self.data.snapshot_block = params
+
+        @sp.onchain_view(pure=True)
+        def get_oldest_snapshot_level(self):
+            sp.result(self.data.snapshot_block)
+
+    def create_dao(scenario, c1, admin):
+        dao = TestHelper.SimulatedDaoContract()
+        scenario += dao
+        c1.set_dao_address(dao.address).run(valid=True, sender=admin)
+        return dao
+
     def create_scenario(name):
         scenario = sp.test_scenario()
         scenario.h1(name)
         scenario.table_of_contents()
         return scenario
 
-    def create_contracts(scenario, admin, john):
+    def create_contracts(scenario, admin, john, compact_token_metadata=False):
         c1  = NFT.AngryTeenagers(administrator=admin.address,
                         royalties_bytes=sp.utils.bytes_of_string('{"decimals": 3, "shares": { "tz1b7np4aXmF8mVXvoa9Pz68ZRRUzK9qHUf5": 10}}'),
                         metadata=sp.utils.metadata_of_url("https://example.com"),
@@ -79,7 +98,8 @@ class TestHelper():
                         attributes_generic=ATTRIBUTES_GENERIC,
                         rights=RIGHTS,
                         creators=CREATORS,
-                        project_name=PROJECTNAME)
+                        project_name=PROJECTNAME,
+                        compact_token_metadata=compact_token_metadata)
         c1.set_initial_balance(sp.mutez(300000000))
         scenario += c1
         scenario.h2("Contracts")
@@ -143,6 +163,11 @@ class TestHelper():
     def compare_list(scenario, a, b):
         scenario.verify_equal(a, b)
 
+    def verify_view_error(scenario, result, error):
+        # The view fails with error instead of returning a result
+        t = sp.TString if isinstance(error, str) else sp.TNat
+        scenario.verify_equal(sp.catch_exception(result, t=t), sp.some(error))
+
     def compare_bytes(scenario,a, b):
         scenario.verify_equal(sp.len(a), sp.len(b))
         for i in (0, sp.len(a)):
@@ -181,11 +206,21 @@ def unit_fa2_test_initial_storage(is_default = True):
         scenario.verify(c1.data.generic_image_ipfs == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD1"))
         scenario.verify(c1.data.generic_image_ipfs_display == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD2"))
         scenario.verify(c1.data.generic_image_ipfs_thumbnail == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD3"))
+        scenario.verify_equal(c1.data.generic_formats, TestHelper.format_helper("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD1",
+                                                                                "ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD2",
+                                                                                "ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD3",
+                                                                                ARTIFACT_FILE_SIZE,
+                                                                                DISPLAY_FILE_SIZE,
+                                                                                THUMBNAIL_FILE_SIZE))
         scenario.verify(c1.data.metadata[""] == sp.utils.bytes_of_string("https://example.com"))
 
         scenario.verify(c1.data.royalties == sp.utils.bytes_of_string('{"decimals": 3, "shares": { "' + "tz1b7np4aXmF8mVXvoa9Pz68ZRRUzK9qHUf5" + '": 10}}'))
 
         scenario.verify(~c1.data.token_metadata.contains(0))
+        scenario.verify(c1.data.reveal_commitment == sp.none)
+        scenario.verify(c1.data.royalties_version_count == sp.nat(0))
+        scenario.verify(c1.data.current_royalties_version == sp.none)
+        scenario.verify(c1.data.dao_address == sp.none)
 
         scenario.verify(c1.data.project_oracles_number_of_deposits == sp.nat(0))
 
@@ -313,6 +348,119 @@ def unit_fa2_test_mint_max(is_default=True):
         c1.mint(bob.address).run(valid=False, sender=admin)
         scenario.verify(c1.data.minted_tokens == sp.nat(128))
 
+########################################################################################################################
+# unit_fa2_test_mint_batch
+########################################################################################################################
+def unit_fa2_test_mint_batch(is_default=True):
+    @sp.add_test(name="unit_fa2_test_mint_batch", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_mint_batch")
+        admin, alice, bob, john, nat, ben, gabe, gaston, chris = TestHelper.create_more_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the entrypoint mint_batch. (Who: Only for main admin or sale contract admin)")
+
+        scenario.p("1. Set the sale contract admin to be bob and the artwork admin to be john")
+        c1.set_sale_contract_administrator(bob.address).run(valid=True, sender=admin)
+        c1.set_artwork_administrator(john.address).run(valid=True, sender=admin)
+
+        scenario.p("2. Check only main admin or sale contract can mint")
+        c1.mint_batch(sp.record(address=nat.address, amount=3)).run(valid=False, sender=nat)
+        c1.mint_batch(sp.record(address=nat.address, amount=3)).run(valid=False, sender=john)
+        c1.mint_batch(sp.record(address=nat.address, amount=3)).run(valid=False, sender=chris)
+
+        scenario.p("3. Check a batch of 0 NFT is rejected")
+        c1.mint_batch(sp.record(address=nat.address, amount=0)).run(valid=False, sender=bob)
+
+        scenario.p("4. Successfully mint batches with the sale admin and the main admin")
+        c1.mint_batch(sp.record(address=nat.address, amount=3)).run(valid=True, sender=bob)
+        c1.mint(chris.address).run(valid=True, sender=bob)
+        c1.mint_batch(sp.record(address=gabe.address, amount=2)).run(valid=True, sender=admin)
+
+        scenario.p("5. Check that offchain views and the ledger return the expected values")
+        scenario.verify(c1.count_tokens() == 6)
+        scenario.verify(c1.does_token_exist(5) == True)
+        scenario.verify(c1.does_token_exist(6) == False)
+        TestHelper.compare_list(scenario, c1.all_tokens(), sp.list(l={0, 1, 2, 3, 4, 5}, t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(nat.address), sp.list(l=[2, 1, 0], t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(chris.address), sp.list(l={3}, t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(gabe.address), sp.list(l=[5, 4], t=sp.TNat))
+        scenario.verify(c1.data.ledger[0] == nat.address)
+        scenario.verify(c1.data.ledger[2] == nat.address)
+        scenario.verify(c1.data.ledger[3] == chris.address)
+        scenario.verify(c1.data.ledger[5] == gabe.address)
+
+        scenario.p("6. Check token metadata of a batch is the same as the one of a single mint")
+        scenario.verify_equal((sp.snd(c1.data.token_metadata[1]))[NFT.NAME_METADATA], sp.utils.bytes_of_string("Angry Teenager #1"))
+        scenario.verify_equal((sp.snd(c1.data.token_metadata[4]))[NFT.WHAT3WORDID_METADATA], sp.utils.bytes_of_string("4"))
+        scenario.verify_equal((sp.snd(c1.data.token_metadata[4]))[NFT.FORMATS_METADATA], (sp.snd(c1.data.token_metadata[3]))[NFT.FORMATS_METADATA])
+        scenario.verify((sp.snd(c1.data.token_metadata[5]))[NFT.REVEALED_METADATA] == sp.utils.bytes_of_string("false"))
+
+        scenario.p("7. Check the voting power is updated with the whole batch")
+        scenario.verify(c1.get_voting_power(sp.pair(nat.address, sp.level)) == 3)
+        scenario.verify(c1.get_voting_power(sp.pair(gabe.address, sp.level)) == 2)
+        scenario.verify(c1.data.voting_power_highest_index[nat.address] == 0)
+        scenario.verify(c1.get_total_voting_power() == 6)
+
+        scenario.p("8. Check a batch cannot go over the max supply")
+        c1.mint_batch(sp.record(address=ben.address, amount=123)).run(valid=False, sender=admin)
+        c1.mint_batch(sp.record(address=ben.address, amount=122)).run(valid=True, sender=admin)
+        c1.mint(ben.address).run(valid=False, sender=admin)
+        scenario.verify(c1.data.minted_tokens == sp.nat(128))
+
+########################################################################################################################
+# unit_fa2_test_mint_batch_list
+########################################################################################################################
+def unit_fa2_test_mint_batch_list(is_default=True):
+    @sp.add_test(name="unit_fa2_test_mint_batch_list", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_mint_batch_list")
+        admin, alice, bob, john, nat, ben, gabe, gaston, chris = TestHelper.create_more_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the entrypoint mint_batch_list. (Who: Only for main admin or sale contract admin)")
+
+        scenario.p("1. Set the sale contract admin to be bob and the artwork admin to be john")
+        c1.set_sale_contract_administrator(bob.address).run(valid=True, sender=admin)
+        c1.set_artwork_administrator(john.address).run(valid=True, sender=admin)
+
+        scenario.p("2. Check only main admin or sale contract can mint")
+        c1.mint_batch_list(sp.list(l=[sp.record(address=nat.address, amount=2)])).run(valid=False, sender=nat)
+        c1.mint_batch_list(sp.list(l=[sp.record(address=nat.address, amount=2)])).run(valid=False, sender=john)
+
+        scenario.p("3. Check a recipient with 0 NFT is rejected")
+        c1.mint_batch_list(sp.list(l=[sp.record(address=nat.address, amount=2),
+                                      sp.record(address=gabe.address, amount=0)])).run(valid=False, sender=bob)
+
+        scenario.p("4. Successfully mint to several recipients with the sale admin and the main admin")
+        c1.mint_batch_list(sp.list(l=[sp.record(address=nat.address, amount=2),
+                                      sp.record(address=gabe.address, amount=1),
+                                      sp.record(address=nat.address, amount=1)])).run(valid=True, sender=bob)
+        c1.mint_batch_list(sp.list(l=[sp.record(address=chris.address, amount=2)])).run(valid=True, sender=admin)
+
+        scenario.p("5. Check that offchain views and the ledger return the expected values")
+        scenario.verify(c1.count_tokens() == 6)
+        TestHelper.compare_list(scenario, c1.get_user_tokens(nat.address), sp.list(l=[3, 1, 0], t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(gabe.address), sp.list(l=[2], t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(chris.address), sp.list(l=[5, 4], t=sp.TNat))
+        scenario.verify(c1.data.ledger[0] == nat.address)
+        scenario.verify(c1.data.ledger[2] == gabe.address)
+        scenario.verify(c1.data.ledger[3] == nat.address)
+        scenario.verify(c1.data.ledger[5] == chris.address)
+        scenario.verify_equal((sp.snd(c1.data.token_metadata[2]))[NFT.FORMATS_METADATA], (sp.snd(c1.data.token_metadata[0]))[NFT.FORMATS_METADATA])
+
+        scenario.p("6. Check the voting power is updated for each recipient")
+        scenario.verify(c1.get_voting_power(sp.pair(nat.address, sp.level)) == 3)
+        scenario.verify(c1.get_voting_power(sp.pair(gabe.address, sp.level)) == 1)
+        scenario.verify(c1.get_total_voting_power() == 6)
+
+        scenario.p("7. Check the whole list cannot go over the max supply")
+        c1.mint_batch_list(sp.list(l=[sp.record(address=ben.address, amount=120),
+                                      sp.record(address=gabe.address, amount=3)])).run(valid=False, sender=admin)
+        c1.mint_batch_list(sp.list(l=[sp.record(address=ben.address, amount=120),
+                                      sp.record(address=gabe.address, amount=2)])).run(valid=True, sender=admin)
+        scenario.verify(c1.data.minted_tokens == sp.nat(128))
+
 ########################################################################################################################
 # unit_fa2_test_set_royalties_field
 ########################################################################################################################
@@ -447,6 +595,81 @@ def unit_fa2_test_set_royalties_minted_tokens(is_default=True):
         scenario.verify(info_7[NFT.ROYALTIES_METADATA] == second_new_royalties)
         scenario.verify(info_8[NFT.ROYALTIES_METADATA] == second_new_royalties)
 
+########################################################################################################################
+# unit_fa2_test_set_global_royalties
+########################################################################################################################
+def unit_fa2_test_set_global_royalties(is_default=True):
+    @sp.add_test(name="unit_fa2_test_set_global_royalties", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_set_global_royalties")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+        c2 = TestHelper.create_contracts(scenario, admin, john, compact_token_metadata=True)
+
+        scenario.h2("Test the entrypoints set_global_royalties and set_royalties_overrides. (Who: Only for main admin)")
+
+        initial_royalties = sp.utils.bytes_of_string('{"decimals": 3, "shares": { "' + "tz1b7np4aXmF8mVXvoa9Pz68ZRRUzK9qHUf5" + '": 10}}')
+        first_royalties = sp.utils.bytes_of_string('{"decimals": 3, "shares": { "' + "tz1b7np4aXmF8mVXvoa9Pz68ZRRUzK9qHUf6" + '": 20}}')
+        second_royalties = sp.utils.bytes_of_string('{"decimals": 3, "shares": { "' + "tz1b7np4aXmF8mVXvoa9Pz68ZRRUzK9qHUf7" + '": 30}}')
+
+        scenario.p("1. Mint NFTs in both contracts")
+        for contract in [c1, c2]:
+            contract.mint(alice.address).run(valid=True, sender=admin)
+            contract.mint(bob.address).run(valid=True, sender=admin)
+            contract.mint(john.address).run(valid=True, sender=admin)
+
+        scenario.p("2. Without global royalties, the royalties stored at mint are used")
+        for token_id in range(0, 3):
+            scenario.verify(sp.snd(c1.token_metadata(token_id))[NFT.ROYALTIES_METADATA] == initial_royalties)
+            scenario.verify_equal(c2.token_metadata(token_id), c1.token_metadata(token_id))
+
+        scenario.p("3. Verify only the admin can call set_global_royalties")
+        c1.set_global_royalties(first_royalties).run(valid=False, sender=bob)
+        c1.set_global_royalties(first_royalties).run(valid=False, sender=john)
+        c1.set_global_royalties(first_royalties).run(valid=False, sender=alice)
+
+        scenario.p("4. Set the global royalties: all the minted NFTs use them without being rewritten")
+        for contract in [c1, c2]:
+            contract.set_global_royalties(first_royalties).run(valid=True, sender=admin)
+        scenario.verify(c1.data.royalties_version_count == 1)
+        scenario.verify(c1.data.current_royalties_version == sp.some(sp.nat(0)))
+        scenario.verify(c1.data.royalties == first_royalties)
+        scenario.verify(sp.snd(c1.data.token_metadata[0])[NFT.ROYALTIES_METADATA] == initial_royalties)
+        for token_id in range(0, 3):
+            scenario.verify(sp.snd(c1.token_metadata(token_id))[NFT.ROYALTIES_METADATA] == first_royalties)
+            scenario.verify_equal(c2.token_metadata(token_id), c1.token_metadata(token_id))
+
+        scenario.p("5. Set new global royalties and pin the NFT 1 to the first version")
+        for contract in [c1, c2]:
+            contract.set_global_royalties(second_royalties).run(valid=True, sender=admin)
+            contract.set_royalties_overrides(sp.list(l={sp.pair(1, sp.some(sp.nat(0)))})).run(valid=True, sender=admin)
+        scenario.verify(sp.snd(c1.token_metadata(0))[NFT.ROYALTIES_METADATA] == second_royalties)
+        scenario.verify(sp.snd(c1.token_metadata(1))[NFT.ROYALTIES_METADATA] == first_royalties)
+        scenario.verify(sp.snd(c1.token_metadata(2))[NFT.ROYALTIES_METADATA] == second_royalties)
+        for token_id in range(0, 3):
+            scenario.verify_equal(c2.token_metadata(token_id), c1.token_metadata(token_id))
+
+        scenario.p("6. NFTs minted after use the current global royalties")
+        c1.mint(alice.address).run(valid=True, sender=admin)
+        scenario.verify(sp.snd(c1.data.token_metadata[3])[NFT.ROYALTIES_METADATA] == second_royalties)
+        scenario.verify(sp.snd(c1.token_metadata(3))[NFT.ROYALTIES_METADATA] == second_royalties)
+
+        scenario.p("7. Verify the overrides are checked")
+        c1.set_royalties_overrides(sp.list(l={sp.pair(1, sp.some(sp.nat(0)))})).run(valid=False, sender=bob)
+        c1.set_royalties_overrides(sp.list(l={sp.pair(1, sp.some(sp.nat(2)))})).run(valid=False, sender=admin)
+        c1.set_royalties_overrides(sp.list(l={sp.pair(10, sp.some(sp.nat(0)))})).run(valid=False, sender=admin)
+
+        scenario.p("8. Remove the override of the NFT 1")
+        c1.set_royalties_overrides(sp.list(l={sp.pair(1, sp.none)})).run(valid=True, sender=admin)
+        scenario.verify(~c1.data.royalties_overrides.contains(1))
+        scenario.verify(sp.snd(c1.token_metadata(1))[NFT.ROYALTIES_METADATA] == second_royalties)
+
+        scenario.p("9. Verify the royalties cannot be changed without a version once versioned")
+        c1.set_royalties_field(first_royalties).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.royalties_versioned())
+        c1.set_royalties_minted_tokens(sp.list(l={0, 1})).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.royalties_versioned())
+        scenario.verify(c1.data.royalties == second_royalties)
+        scenario.verify(sp.snd(c1.token_metadata(0))[NFT.ROYALTIES_METADATA] == second_royalties)
+
 ########################################################################################################################
 # unit_fa2_test_set_next_administrator
 ########################################################################################################################
@@ -650,6 +873,58 @@ def unit_fa2_test_set_pause(is_default=True):
         scenario.verify(c1.count_tokens() == 0)
         scenario.verify(c1.does_token_exist(0) == False)
 
+########################################################################################################################
+# unit_fa2_test_set_generic_artwork
+########################################################################################################################
+def unit_fa2_test_set_generic_artwork(is_default=True):
+    @sp.add_test(name="unit_fa2_test_set_generic_artwork", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_set_generic_artwork")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the entrypoint set_generic_artwork. (Who: Only main admin)")
+        scenario.p("Used to change the generic artwork of the NFTs not minted yet. The generic formats stored in the contract are rebuilt.")
+
+        generic_artwork = sp.record(artifact_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE1"),
+                                    display_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE2"),
+                                    thumbnail_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE3"))
+
+        scenario.p("1. Mint one NFT with the initial generic artwork")
+        c1.mint(alice.address).run(valid=True, sender=admin)
+
+        scenario.p("2. Check that only the main admin can call the set_generic_artwork entrypoint")
+        c1.set_generic_artwork(generic_artwork).run(valid=False, sender=alice)
+        c1.set_generic_artwork(generic_artwork).run(valid=False, sender=bob)
+        c1.set_generic_artwork(generic_artwork).run(valid=False, sender=john)
+
+        scenario.p("3. Successfully set a new generic artwork")
+        c1.set_generic_artwork(generic_artwork).run(valid=True, sender=admin)
+
+        scenario.p("4. Check the generic links and formats are updated in the contract storage")
+        scenario.verify(c1.data.generic_image_ipfs == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE1"))
+        scenario.verify(c1.data.generic_image_ipfs_display == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE2"))
+        scenario.verify(c1.data.generic_image_ipfs_thumbnail == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE3"))
+        new_formats = TestHelper.format_helper("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE1",
+                                               "ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE2",
+                                               "ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE3",
+                                               ARTIFACT_FILE_SIZE,
+                                               DISPLAY_FILE_SIZE,
+                                               THUMBNAIL_FILE_SIZE)
+        scenario.verify_equal(c1.data.generic_formats, new_formats)
+
+        scenario.p("5. Check the NFT already minted is unchanged and a new NFT uses the new generic artwork")
+        c1.mint(alice.address).run(valid=True, sender=admin)
+        scenario.verify_equal(sp.snd(c1.data.token_metadata[0])[NFT.FORMATS_METADATA],
+                              TestHelper.format_helper("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD1",
+                                                       "ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD2",
+                                                       "ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD3",
+                                                       ARTIFACT_FILE_SIZE,
+                                                       DISPLAY_FILE_SIZE,
+                                                       THUMBNAIL_FILE_SIZE))
+        scenario.verify_equal(sp.snd(c1.data.token_metadata[1])[NFT.FORMATS_METADATA], new_formats)
+        scenario.verify_equal(sp.snd(c1.data.token_metadata[1])[NFT.ARTIFACTURI_METADATA], sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBE1"))
+
 ########################################################################################################################
 # unit_fa2_test_update_artwork_data
 ########################################################################################################################
@@ -812,6 +1087,59 @@ def unit_fa2_test_update_artwork_data(is_default=True):
         scenario.verify(c1.does_token_exist(3) == True)
         scenario.verify(c1.does_token_exist(4) == False)
 
+########################################################################################################################
+# unit_fa2_test_non_revealed_tokens
+########################################################################################################################
+def unit_fa2_test_non_revealed_tokens(is_default=True):
+    @sp.add_test(name="unit_fa2_test_non_revealed_tokens", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_non_revealed_tokens")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the unrevealed tokens bitmap and the get_all_non_revealed_token and get_non_revealed_tokens_page offchain views.")
+
+        scenario.p("1. Mint all the NFTs and check they are all marked as not revealed")
+        c1.mint_batch(sp.record(address=alice.address, amount=128)).run(valid=True, sender=admin)
+        scenario.verify(c1.data.unrevealed_tokens[0] == 2 ** 128 - 1)
+        TestHelper.compare_list(scenario, c1.get_all_non_revealed_token(), sp.list(l=list(reversed(range(128))), t=sp.TNat))
+
+        scenario.p("2. Reveal some NFTs and check the bitmap is updated")
+        artwork = sp.record(artifact_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB11"),
+                            display_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB21"),
+                            thumbnail_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB31"),
+                            attributes=c1.attributes_generic,
+                            artifact_size=sp.utils.bytes_of_string("400001"),
+                            display_size=sp.utils.bytes_of_string("100001"),
+                            thumbnail_size=sp.utils.bytes_of_string("20001"))
+        revealed = [0, 5, 64, 127]
+        c1.update_artwork_data(sp.list([sp.pair(x, artwork) for x in revealed])).run(valid=True, sender=admin)
+        c1.update_artwork_data(sp.list([sp.pair(5, artwork)])).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.token_revealed())
+        scenario.verify(c1.data.unrevealed_tokens[0] == 2 ** 128 - 1 - sum([2 ** x for x in revealed]))
+        TestHelper.compare_list(scenario, c1.get_all_non_revealed_token(),
+                                sp.list(l=[x for x in reversed(range(128)) if x not in revealed], t=sp.TNat))
+
+        scenario.p("3. Check the get_non_revealed_tokens_page offchain view")
+        page = c1.get_non_revealed_tokens_page(sp.record(offset=0, limit=3))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[1, 2, 3], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.some(4))
+        page = c1.get_non_revealed_tokens_page(sp.record(offset=4, limit=3))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[4, 6, 7], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.some(8))
+        page = c1.get_non_revealed_tokens_page(sp.record(offset=120, limit=10))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[120, 121, 122, 123, 124, 125, 126], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+        TestHelper.verify_view_error(scenario, c1.get_non_revealed_tokens_page(sp.record(offset=4, limit=0)),
+                                     NFT.Error.ErrorMessage.invalid_parameter())
+
+        scenario.p("4. Reveal all the NFTs and check the bitmap is empty")
+        c1.update_artwork_data(sp.list([sp.pair(x, artwork) for x in range(128) if x not in revealed])).run(valid=True, sender=admin)
+        scenario.verify(~c1.data.unrevealed_tokens.contains(0))
+        TestHelper.compare_list(scenario, c1.get_all_non_revealed_token(), sp.list(l=[], t=sp.TNat))
+        page = c1.get_non_revealed_tokens_page(sp.record(offset=0, limit=10))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+
 ########################################################################################################################
 # unit_fa2_test_mutez_transfer
 ########################################################################################################################
@@ -968,6 +1296,154 @@ def unit_fa2_test_transfer(is_default=True):
         scenario.verify(c1.data.ledger[10] == chris.address)
         scenario.verify(c1.data.ledger[11] == john.address)
 
+########################################################################################################################
+# unit_fa2_test_transfer_voting_power
+########################################################################################################################
+def unit_fa2_test_transfer_voting_power(is_default=True):
+    @sp.add_test(name="unit_fa2_test_transfer_voting_power", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_transfer_voting_power")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the voting power is updated once per address with the net change of a transfer.")
+
+        scenario.p("1. Mint 4 NFTs to alice and 1 NFT to bob")
+        c1.mint_batch(sp.record(address=alice.address, amount=4)).run(valid=True, sender=admin, level=10)
+        c1.mint_batch(sp.record(address=bob.address, amount=1)).run(valid=True, sender=admin, level=10)
+        c1.update_operators(sp.list([sp.variant('add_operator', sp.record(owner=bob.address, operator=alice.address, token_id=4))])).run(valid=True, sender=bob, level=10)
+
+        scenario.p("2. Transfer several NFTs from alice and from bob in a single transfer")
+        txs_alice = sp.record(from_=alice.address, txs=sp.list([sp.record(to_=bob.address, token_id=0, amount=1),
+                                                               sp.record(to_=bob.address, token_id=1, amount=1),
+                                                               sp.record(to_=john.address, token_id=2, amount=1)]))
+        txs_bob = sp.record(from_=bob.address, txs=sp.list([sp.record(to_=alice.address, token_id=4, amount=1)]))
+        c1.transfer(sp.list([txs_alice, txs_bob])).run(valid=True, sender=alice, level=20)
+
+        scenario.p("3. Check a single checkpoint is written per address with the net balance")
+        scenario.verify(c1.data.voting_power_highest_index[alice.address] == 1)
+        scenario.verify(c1.data.voting_power_highest_index[bob.address] == 1)
+        scenario.verify(c1.data.voting_power_highest_index[john.address] == 0)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 20)) == 2)
+        scenario.verify(c1.get_voting_power(sp.pair(bob.address, 20)) == 2)
+        scenario.verify(c1.get_voting_power(sp.pair(john.address, 20)) == 1)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 15)) == 4)
+        scenario.verify(c1.get_voting_power(sp.pair(bob.address, 15)) == 1)
+        scenario.verify(c1.get_total_voting_power() == 5)
+
+        scenario.p("4. Check a transfer without net change does not write any checkpoint")
+        txs_back = sp.record(from_=alice.address, txs=sp.list([sp.record(to_=alice.address, token_id=3, amount=1)]))
+        c1.transfer(sp.list([txs_back])).run(valid=True, sender=alice, level=30)
+        scenario.verify(c1.data.voting_power_highest_index[alice.address] == 1)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 30)) == 2)
+
+        scenario.p("5. Check an address cannot send more NFTs than it owns in a batch")
+        txs_john = sp.record(from_=john.address, txs=sp.list([sp.record(to_=bob.address, token_id=2, amount=1),
+                                                             sp.record(to_=bob.address, token_id=2, amount=1)]))
+        c1.transfer(sp.list([txs_john])).run(valid=False, sender=john, level=40)
+
+########################################################################################################################
+# unit_fa2_test_tokens_of_owner
+########################################################################################################################
+def unit_fa2_test_tokens_of_owner(is_default=True):
+    @sp.add_test(name="unit_fa2_test_tokens_of_owner", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_tokens_of_owner")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the index of the tokens of each owner and the get_user_tokens and get_user_tokens_page offchain views.")
+
+        scenario.p("1. Mint NFTs and check the index of the tokens of each owner")
+        c1.mint_batch(sp.record(address=alice.address, amount=5)).run(valid=True, sender=admin)
+        scenario.verify(c1.data.balance_of_owner[alice.address] == 5)
+        scenario.verify(c1.data.tokens_of_owner[sp.pair(alice.address, 4)] == 4)
+        scenario.verify(c1.data.owner_token_index[4] == 4)
+        scenario.verify(~c1.data.balance_of_owner.contains(bob.address))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(alice.address), sp.list(l=[4, 3, 2, 1, 0], t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(bob.address), sp.list(l=[], t=sp.TNat))
+
+        scenario.p("2. Transfer a NFT and check the last token of the sender takes its place in the index")
+        transfer1 = sp.record(to_=bob.address, token_id=1, amount=1)
+        c1.transfer(sp.list([sp.record(from_=alice.address, txs=sp.list([transfer1]))])).run(valid=True, sender=alice)
+        scenario.verify(c1.data.balance_of_owner[alice.address] == 4)
+        scenario.verify(c1.data.balance_of_owner[bob.address] == 1)
+        scenario.verify(c1.data.tokens_of_owner[sp.pair(alice.address, 1)] == 4)
+        scenario.verify(c1.data.owner_token_index[4] == 1)
+        scenario.verify(~c1.data.tokens_of_owner.contains(sp.pair(alice.address, 4)))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(alice.address), sp.list(l=[3, 2, 4, 0], t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(bob.address), sp.list(l=[1], t=sp.TNat))
+        scenario.verify(c1.count_user_tokens(alice.address) == 4)
+        scenario.verify(c1.get_owner_balance(alice.address) == 4)
+        scenario.verify(c1.get_owner_balance(bob.address) == 1)
+        scenario.verify(c1.get_owner_balance(john.address) == 0)
+
+        scenario.p("3. Check the get_user_tokens_page offchain view")
+        page = c1.get_user_tokens_page(sp.record(owner=alice.address, offset=0, limit=3))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[0, 4, 2], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.some(3))
+        page = c1.get_user_tokens_page(sp.record(owner=alice.address, offset=3, limit=3))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[3], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+        page = c1.get_user_tokens_page(sp.record(owner=alice.address, offset=10, limit=3))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+        TestHelper.verify_view_error(scenario, c1.get_user_tokens_page(sp.record(owner=alice.address, offset=0, limit=0)),
+                                     NFT.Error.ErrorMessage.invalid_parameter())
+
+        scenario.p("4. Transfer back the NFT and check the index of both owners")
+        transfer2 = sp.record(to_=alice.address, token_id=1, amount=1)
+        c1.transfer(sp.list([sp.record(from_=bob.address, txs=sp.list([transfer2]))])).run(valid=True, sender=bob)
+        scenario.verify(~c1.data.balance_of_owner.contains(bob.address))
+        scenario.verify(~c1.data.tokens_of_owner.contains(sp.pair(bob.address, 0)))
+        scenario.verify(c1.data.tokens_of_owner[sp.pair(alice.address, 4)] == 1)
+        TestHelper.compare_list(scenario, c1.get_user_tokens(alice.address), sp.list(l=[1, 3, 2, 4, 0], t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_user_tokens(bob.address), sp.list(l=[], t=sp.TNat))
+        scenario.verify(c1.count_user_tokens(bob.address) == 0)
+        scenario.verify(c1.get_owner_balance(alice.address) == 5)
+
+########################################################################################################################
+# unit_fa2_test_all_tokens_page
+########################################################################################################################
+def unit_fa2_test_all_tokens_page(is_default=True):
+    @sp.add_test(name="unit_fa2_test_all_tokens_page", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_all_tokens_page")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the all_tokens_page offchain view.")
+        scenario.p("The view is streamed through by calling it again with next_offset until next_offset is none.")
+
+        scenario.p("1. Check the view returns an empty page when no NFT is minted")
+        page = c1.all_tokens_page(sp.record(offset=0, limit=4))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+
+        scenario.p("2. Mint NFTs and stream through all of them")
+        c1.mint_batch(sp.record(address=alice.address, amount=10)).run(valid=True, sender=admin)
+        page = c1.all_tokens_page(sp.record(offset=0, limit=4))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[0, 1, 2, 3], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.some(4))
+        page = c1.all_tokens_page(sp.record(offset=4, limit=4))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[4, 5, 6, 7], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.some(8))
+        page = c1.all_tokens_page(sp.record(offset=8, limit=4))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[8, 9], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+
+        scenario.p("3. Check a page ending exactly on the last NFT and a page after the last NFT")
+        page = c1.all_tokens_page(sp.record(offset=5, limit=5))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[5, 6, 7, 8, 9], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+        page = c1.all_tokens_page(sp.record(offset=12, limit=5))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+
+        scenario.p("4. Check an empty page is rejected since its next_offset would never end the streaming")
+        TestHelper.verify_view_error(scenario, c1.all_tokens_page(sp.record(offset=0, limit=0)),
+                                     NFT.Error.ErrorMessage.invalid_parameter())
+
 ########################################################################################################################
 # unit_fa2_test_update_operators
 ########################################################################################################################
@@ -1043,6 +1519,53 @@ def unit_fa2_test_update_operators(is_default=True):
         # Alice can still transfer her token
         c1.transfer(sp.list({source1})).run(valid=True, sender=alice)
 
+########################################################################################################################
+# unit_fa2_test_update_operators_for_all
+########################################################################################################################
+def unit_fa2_test_update_operators_for_all(is_default=True):
+    @sp.add_test(name="unit_fa2_test_update_operators_for_all", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_update_operators_for_all")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the entrypoint update_operators_for_all. (Who: For all users)")
+
+        scenario.p("1. Mint 3 NFTs to alice")
+        c1.mint_batch(sp.record(address=alice.address, amount=3)).run(valid=True, sender=admin)
+
+        add_all = sp.variant('add_operator', sp.record(owner=alice.address, operator=john.address))
+        remove_all = sp.variant('remove_operator', sp.record(owner=alice.address, operator=john.address))
+
+        scenario.p("2. Check only the owner can add an operator of all its tokens")
+        c1.update_operators_for_all(sp.list([add_all])).run(valid=False, sender=john)
+        c1.update_operators_for_all(sp.list([add_all])).run(valid=False, sender=admin)
+        c1.update_operators_for_all(sp.list([add_all])).run(valid=True, sender=alice)
+        scenario.verify(c1.is_operator_for_all(sp.record(owner=alice.address, operator=john.address)) == True)
+        scenario.verify(c1.is_operator(sp.record(owner=alice.address, operator=john.address, token_id=2)) == True)
+        scenario.verify(c1.is_operator_for_all(sp.record(owner=alice.address, operator=bob.address)) == False)
+
+        scenario.p("3. Check the operator can transfer several tokens of the owner in a single transfer")
+        source = sp.record(from_=alice.address, txs=sp.list([sp.record(to_=bob.address, token_id=0, amount=1),
+                                                             sp.record(to_=bob.address, token_id=1, amount=1)]))
+        c1.transfer(sp.list([source])).run(valid=False, sender=bob)
+        c1.transfer(sp.list([source])).run(valid=True, sender=john)
+        scenario.verify(c1.data.ledger[0] == bob.address)
+        scenario.verify(c1.data.ledger[1] == bob.address)
+
+        scenario.p("4. Check the approval does not cover the tokens of other owners")
+        source_bob = sp.record(from_=bob.address, txs=sp.list([sp.record(to_=john.address, token_id=0, amount=1)]))
+        c1.transfer(sp.list([source_bob])).run(valid=False, sender=john)
+
+        scenario.p("5. Check the owner or the admin can remove the operator")
+        c1.update_operators_for_all(sp.list([remove_all])).run(valid=False, sender=john)
+        c1.update_operators_for_all(sp.list([remove_all])).run(valid=True, sender=admin)
+        scenario.verify(c1.is_operator_for_all(sp.record(owner=alice.address, operator=john.address)) == False)
+        source = sp.record(from_=alice.address, txs=sp.list([sp.record(to_=bob.address, token_id=2, amount=1)]))
+        c1.transfer(sp.list([source])).run(valid=False, sender=john)
+        c1.update_operators_for_all(sp.list([add_all, remove_all])).run(valid=True, sender=alice)
+        scenario.verify(c1.is_operator_for_all(sp.record(owner=alice.address, operator=john.address)) == False)
+
 ########################################################################################################################
 # unit_fa2_test_token_metadata_storage
 ########################################################################################################################
@@ -1173,6 +1696,29 @@ def unit_fa2_test_token_metadata_storage(is_default=True):
         scenario.verify_equal(info[NFT.PROJECTNAME_METADATA], c1.project_name)
 
 
+########################################################################################################################
+# unit_fa2_test_token_metadata_name
+########################################################################################################################
+def unit_fa2_test_token_metadata_name(is_default=True):
+    @sp.add_test(name="unit_fa2_test_token_metadata_name", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_token_metadata_name")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+        c2 = TestHelper.create_contracts(scenario, admin, john, compact_token_metadata=True)
+
+        scenario.h2("Test the token id rendered in the name of the NFTs.")
+
+        scenario.p("1. Mint the whole supply")
+        c1.mint_batch(sp.record(address=alice.address, amount=128)).run(valid=True, sender=admin)
+        c2.mint_batch(sp.record(address=alice.address, amount=128)).run(valid=True, sender=admin)
+
+        scenario.p("2. Check the name of NFTs with one, two and three digits")
+        for token_id in [0, 1, 9, 10, 42, 99, 100, 101, 110, 127]:
+            name = sp.utils.bytes_of_string("Angry Teenager #" + str(token_id))
+            scenario.verify_equal((sp.snd(c1.data.token_metadata[token_id]))[NFT.NAME_METADATA], name)
+            scenario.verify_equal((sp.snd(c2.token_metadata(token_id)))[NFT.NAME_METADATA], name)
+
 ########################################################################################################################
 # unit_fa2_test_token_metadata_offchain
 ########################################################################################################################
@@ -1299,6 +1845,243 @@ def unit_fa2_test_token_metadata_offchain(is_default=True):
         scenario.verify_equal(metadata[NFT.CREATORS_METADATA], c1.creators)
         scenario.verify_equal(metadata[NFT.PROJECTNAME_METADATA], c1.project_name)
 
+########################################################################################################################
+# unit_fa2_test_token_metadata_compact
+########################################################################################################################
+def unit_fa2_test_token_metadata_compact(is_default=True):
+    @sp.add_test(name="unit_fa2_test_token_metadata_compact", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_token_metadata_compact")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+        c2 = TestHelper.create_contracts(scenario, admin, john, compact_token_metadata=True)
+
+        scenario.h2("Test the compact token metadata mode.")
+        scenario.p("In compact mode only the per token data is stored and the token_metadata view builds the map from the current generic artwork.")
+
+        scenario.p("1. Set sale contract admin to be bob and artwork admin to be john")
+        for c in [c1, c2]:
+            c.set_sale_contract_administrator(bob.address).run(valid=True, sender=admin)
+            c.set_artwork_administrator(john.address).run(valid=True, sender=admin)
+
+        scenario.p("2. Successfully mint NFTs in both contracts")
+        for c in [c1, c2]:
+            c.mint(alice.address).run(valid=True, sender=bob)
+            c.mint_batch(sp.record(address=alice.address, amount=11)).run(valid=True, sender=bob)
+
+        scenario.p("3. Check only the per token data is stored in compact mode")
+        scenario.verify(sp.len(c1.data.token_data) == 0)
+        scenario.verify(c1.data.token_metadata.contains(11))
+        scenario.verify(~c2.data.token_metadata.contains(0))
+        scenario.verify(~c2.data.token_metadata.contains(11))
+        scenario.verify(c2.data.token_data.contains(0))
+        scenario.verify(c2.data.token_data.contains(11))
+        scenario.verify(~c2.data.token_artwork.contains(11))
+
+        scenario.p("4. Check token_metadata returns the same values in both modes")
+        for token_id in [0, 1, 9, 10, 11]:
+            scenario.verify_equal(c2.token_metadata(token_id), c1.token_metadata(token_id))
+        TestHelper.compare_list(scenario, c2.get_all_non_revealed_token(), c1.get_all_non_revealed_token())
+
+        scenario.p("5. Reveal a token and check token_metadata still returns the same values in both modes")
+        record1 = sp.record(artifact_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB11"),
+                            display_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB21"),
+                            thumbnail_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB31"),
+                            attributes=sp.utils.bytes_of_string('[{\"name\"}, {\"revealed\"}]'),
+                            artifact_size=sp.utils.bytes_of_string("400001"),
+                            display_size=sp.utils.bytes_of_string("100001"),
+                            thumbnail_size=sp.utils.bytes_of_string("20001"))
+        for c in [c1, c2]:
+            c.update_artwork_data(sp.list([sp.pair(10, record1)])).run(valid=True, sender=john)
+            c.update_artwork_data(sp.list([sp.pair(10, record1)])).run(valid=False, sender=john, exception=NFT.Error.ErrorMessage.token_revealed())
+        scenario.verify(c2.data.token_artwork.contains(10))
+        scenario.verify_equal(c2.token_metadata(10), c1.token_metadata(10))
+        scenario.verify_equal(c2.token_metadata(11), c1.token_metadata(11))
+        TestHelper.compare_list(scenario, c2.get_all_non_revealed_token(), c1.get_all_non_revealed_token())
+
+        scenario.p("6. Change the royalties of a token and check token_metadata still returns the same values in both modes")
+        for c in [c1, c2]:
+            c.set_royalties_field(sp.utils.bytes_of_string('{"decimals": 3, "shares": { "tz1b7np4aXmF8mVXvoa9Pz68ZRRUzK9qHUf5": 15}}')).run(valid=True, sender=admin)
+            c.set_royalties_minted_tokens(sp.list([10, 1])).run(valid=True, sender=admin)
+        for token_id in [0, 1, 10, 11]:
+            scenario.verify_equal(c2.token_metadata(token_id), c1.token_metadata(token_id))
+
+        scenario.p("7. Change the generic artwork: only the compact mode applies it to the NFTs already minted and not revealed")
+        generic = sp.record(artifact_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBG1"),
+                            display_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBG2"),
+                            thumbnail_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBG3"))
+        for c in [c1, c2]:
+            c.set_generic_artwork(generic).run(valid=True, sender=admin)
+            c.mint(alice.address).run(valid=True, sender=bob)
+        scenario.verify_equal((sp.snd(c1.token_metadata(0)))[NFT.ARTIFACTURI_METADATA], sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBD1"))
+        scenario.verify_equal((sp.snd(c2.token_metadata(0)))[NFT.ARTIFACTURI_METADATA], generic.artifact_uri)
+        scenario.verify_equal((sp.snd(c2.token_metadata(0)))[NFT.DISPLAYURI_METADATA], generic.display_uri)
+        scenario.verify_equal((sp.snd(c2.token_metadata(0)))[NFT.THUMBNAILURI_METADATA], generic.thumbnail_uri)
+        scenario.verify((sp.snd(c2.token_metadata(0)))[NFT.FORMATS_METADATA] != (sp.snd(c1.token_metadata(0)))[NFT.FORMATS_METADATA])
+
+        scenario.p("8. The revealed NFTs and the NFTs minted after the change are the same in both modes")
+        scenario.verify_equal(c2.token_metadata(10), c1.token_metadata(10))
+        scenario.verify_equal(c2.token_metadata(12), c1.token_metadata(12))
+
+########################################################################################################################
+# unit_fa2_test_reveal_artwork_data
+########################################################################################################################
+def unit_fa2_test_reveal_artwork_data(is_default=True):
+    @sp.add_test(name="unit_fa2_test_reveal_artwork_data", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_reveal_artwork_data")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+        c2 = TestHelper.create_contracts(scenario, admin, john, compact_token_metadata=True)
+
+        scenario.h2("Test the entrypoint reveal_artwork_data. (Who: Only main admin and artwork admin)")
+        scenario.p("Used to reveal NFTs. In compact mode only their artwork record is stored and the token_metadata view merges it in. In the default mode the token_metadata big map is rewritten.")
+
+        record1 = sp.record(artifact_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB11"),
+                            display_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB21"),
+                            thumbnail_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB31"),
+                            attributes=sp.utils.bytes_of_string('[{\"name\", \"generic1\"}]'),
+                            artifact_size=sp.utils.bytes_of_string("400001"),
+                            display_size=sp.utils.bytes_of_string("100001"),
+                            thumbnail_size=sp.utils.bytes_of_string("20001"))
+        record2 = sp.record(artifact_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB12"),
+                            display_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB22"),
+                            thumbnail_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB32"),
+                            attributes=sp.utils.bytes_of_string('[{\"name\", \"generic2\"}]'),
+                            artifact_size=sp.utils.bytes_of_string("400002"),
+                            display_size=sp.utils.bytes_of_string("100002"),
+                            thumbnail_size=sp.utils.bytes_of_string("20002"))
+
+        scenario.p("1. Check that NFT cannot be revealed if they are not minted")
+        c1.reveal_artwork_data(sp.list([sp.pair(1, record1)])).run(valid=False, sender=admin)
+
+        scenario.p("2. Successfully mint 3 NFTs in both contracts")
+        for c in [c1, c2]:
+            c.mint_batch(sp.record(address=alice.address, amount=3)).run(valid=True, sender=admin)
+
+        scenario.p("3. Check that only the main or artwork admin can reveal NFTs")
+        c1.reveal_artwork_data(sp.list([sp.pair(1, record1)])).run(valid=False, sender=alice)
+        c1.reveal_artwork_data(sp.list([sp.pair(1, record1)])).run(valid=False, sender=bob)
+
+        scenario.p("4. Reveal NFT 0 with update_artwork_data and NFT 1 with reveal_artwork_data in both contracts")
+        for c in [c1, c2]:
+            c.update_artwork_data(sp.list([sp.pair(0, record2)])).run(valid=True, sender=john)
+            c.reveal_artwork_data(sp.list([sp.pair(1, record1)])).run(valid=True, sender=admin)
+
+        scenario.p("5. Check the default mode rewrites the token_metadata big map read by the indexers and the compact mode only stores the artwork record")
+        scenario.verify(~c1.data.token_artwork.contains(1))
+        scenario.verify((sp.snd(c1.data.token_metadata[1]))[NFT.REVEALED_METADATA] == sp.utils.bytes_of_string("true"))
+        scenario.verify((sp.snd(c1.data.token_metadata[1]))[NFT.ARTIFACTURI_METADATA] == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB11"))
+        scenario.verify((sp.snd(c1.data.token_metadata[0]))[NFT.REVEALED_METADATA] == sp.utils.bytes_of_string("true"))
+        scenario.verify((sp.snd(c1.data.token_metadata[2]))[NFT.REVEALED_METADATA] == sp.utils.bytes_of_string("false"))
+        scenario.verify_equal(c1.data.token_metadata[1], c1.token_metadata(1))
+        scenario.verify(c2.data.token_artwork.contains(1))
+        scenario.verify(c2.data.token_artwork.contains(0))
+        scenario.verify(~c2.data.token_metadata.contains(1))
+
+        scenario.p("6. Check token_metadata merges the artwork record and returns the same values in both modes")
+        scenario.verify((sp.snd(c1.token_metadata(1)))[NFT.REVEALED_METADATA] == sp.utils.bytes_of_string("true"))
+        scenario.verify((sp.snd(c1.token_metadata(1)))[NFT.ARTIFACTURI_METADATA] == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB11"))
+        scenario.verify((sp.snd(c1.token_metadata(1)))[NFT.ATTRIBUTES_METADATA] == sp.utils.bytes_of_string('[{\"name\", \"generic1\"}]'))
+        for token_id in [0, 1, 2]:
+            scenario.verify_equal(c2.token_metadata(token_id), c1.token_metadata(token_id))
+        TestHelper.compare_list(scenario, c1.get_all_non_revealed_token(), sp.list(l=[2], t=sp.TNat))
+        TestHelper.compare_list(scenario, c2.get_all_non_revealed_token(), c1.get_all_non_revealed_token())
+
+        scenario.p("7. Check a NFT cannot be revealed twice, whatever the entrypoint")
+        for c in [c1, c2]:
+            c.reveal_artwork_data(sp.list([sp.pair(1, record2)])).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.token_revealed())
+            c.reveal_artwork_data(sp.list([sp.pair(0, record1)])).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.token_revealed())
+            c.update_artwork_data(sp.list([sp.pair(1, record2)])).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.token_revealed())
+        scenario.verify_equal(c2.token_metadata(1), c1.token_metadata(1))
+
+########################################################################################################################
+# unit_fa2_test_commit_reveal
+########################################################################################################################
+def unit_fa2_test_commit_reveal(is_default=True):
+    @sp.add_test(name="unit_fa2_test_commit_reveal", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_commit_reveal")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the entrypoint commit_reveal. (Who: Only main admin and artwork admin)")
+        scenario.p("Used to reveal all the NFTs not revealed yet by committing the merkle root of their metadata files and the IPFS directory of these files.")
+
+        record1 = sp.record(artifact_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB11"),
+                            display_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB21"),
+                            thumbnail_uri=sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB31"),
+                            attributes=sp.utils.bytes_of_string('[{\"name\", \"generic1\"}]'),
+                            artifact_size=sp.utils.bytes_of_string("400001"),
+                            display_size=sp.utils.bytes_of_string("100001"),
+                            thumbnail_size=sp.utils.bytes_of_string("20001"))
+        base_uri = sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBDR/")
+
+        scenario.p("1. Build the merkle root of the metadata files of NFTs 1 and 2")
+        hash1 = scenario.compute(sp.blake2b(sp.utils.bytes_of_string('{"name": "Angry Teenager #1"}')))
+        hash2 = scenario.compute(sp.blake2b(sp.utils.bytes_of_string('{"name": "Angry Teenager #2"}')))
+        leaf1 = scenario.compute(sp.blake2b(sp.pack(sp.pair(sp.nat(1), hash1))))
+        leaf2 = scenario.compute(sp.blake2b(sp.pack(sp.pair(sp.nat(2), hash2))))
+        root = scenario.compute(sp.eif(leaf1 < leaf2,
+                                       sp.blake2b(sp.concat([leaf1, leaf2])),
+                                       sp.blake2b(sp.concat([leaf2, leaf1]))))
+
+        scenario.p("2. Mint 3 NFTs and reveal NFT 0 one by one")
+        c1.mint_batch(sp.record(address=alice.address, amount=3)).run(valid=True, sender=admin)
+        c1.reveal_artwork_data(sp.list([sp.pair(0, record1)])).run(valid=True, sender=admin)
+
+        scenario.p("3. Check only the main or artwork admin can commit the reveal, with consistent parameters")
+        c1.commit_reveal(sp.record(root=root, base_uri=base_uri, size=3)).run(valid=False, sender=alice)
+        c1.commit_reveal(sp.record(root=root, base_uri=base_uri, size=3)).run(valid=False, sender=bob)
+        c1.commit_reveal(sp.record(root=sp.bytes("0x01"), base_uri=base_uri, size=3)).run(valid=False, sender=admin)
+        c1.commit_reveal(sp.record(root=root, base_uri=sp.bytes("0x"), size=3)).run(valid=False, sender=admin)
+        c1.commit_reveal(sp.record(root=root, base_uri=base_uri, size=2)).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.invalid_parameter())
+        c1.commit_reveal(sp.record(root=root, base_uri=base_uri, size=129)).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.invalid_parameter())
+
+        scenario.p("4. Successfully commit the reveal of the first 4 NFTs, one of them not minted yet, and check it cannot be changed")
+        c1.commit_reveal(sp.record(root=root, base_uri=base_uri, size=4)).run(valid=True, sender=john)
+        scenario.verify(c1.data.reveal_commitment == sp.some(sp.record(root=root, base_uri=base_uri, size=4)))
+        c1.commit_reveal(sp.record(root=root, base_uri=base_uri, size=4)).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.token_revealed())
+
+        scenario.p("5. Check the NFTs not revealed yet are resolved from the base URI")
+        scenario.verify_equal(c1.token_metadata(1), sp.pair(sp.nat(1), sp.map(l={"": sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBDR/1.json")})))
+        scenario.verify_equal(c1.token_metadata(2), sp.pair(sp.nat(2), sp.map(l={"": sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBDR/2.json")})))
+        scenario.verify((sp.snd(c1.token_metadata(0)))[NFT.ARTIFACTURI_METADATA] == sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYB11"))
+        TestHelper.compare_list(scenario, c1.get_all_non_revealed_token(), sp.list(l=[], t=sp.TNat))
+        page = c1.get_non_revealed_tokens_page(sp.record(offset=0, limit=3))
+        TestHelper.compare_list(scenario, page.tokens, sp.list(l=[], t=sp.TNat))
+        scenario.verify(page.next_offset == sp.none)
+
+        scenario.p("6. Check NFTs cannot be revealed one by one anymore")
+        c1.reveal_artwork_data(sp.list([sp.pair(1, record1)])).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.token_revealed())
+        c1.update_artwork_data(sp.list([sp.pair(1, record1)])).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.token_revealed())
+
+        scenario.p("7. Check the metadata files can be verified against the root")
+        scenario.verify(c1.verify_revealed_metadata(sp.record(token_id=1, metadata_hash=hash1, proof=sp.list([leaf2]))) == True)
+        scenario.verify(c1.verify_revealed_metadata(sp.record(token_id=2, metadata_hash=hash2, proof=sp.list([leaf1]))) == True)
+        scenario.verify(c1.verify_revealed_metadata(sp.record(token_id=2, metadata_hash=hash1, proof=sp.list([leaf1]))) == False)
+        scenario.verify(c1.verify_revealed_metadata(sp.record(token_id=1, metadata_hash=hash1, proof=sp.list([]))) == False)
+
+        scenario.p("8. Check only the NFTs covered by the commitment can be minted and are resolved from the base URI")
+        c1.mint_batch(sp.record(address=bob.address, amount=2)).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.no_land_available())
+        c1.mint(bob.address).run(valid=True, sender=admin)
+        scenario.verify_equal(c1.token_metadata(3), sp.pair(sp.nat(3), sp.map(l={"": sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBDR/3.json")})))
+        c1.mint(bob.address).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.no_land_available())
+        c1.mint_batch(sp.record(address=bob.address, amount=1)).run(valid=False, sender=admin, exception=NFT.Error.ErrorMessage.no_land_available())
+        scenario.verify(c1.data.minted_tokens == 4)
+
+        scenario.p("9. Check the shared royalties and their overrides also apply to the NFTs resolved from the base URI")
+        royalties_1 = sp.utils.bytes_of_string('{"decimals": 2, "shares": {"tz1": 10}}')
+        royalties_2 = sp.utils.bytes_of_string('{"decimals": 2, "shares": {"tz1": 5}}')
+        c1.set_global_royalties(royalties_1).run(valid=True, sender=admin)
+        c1.set_global_royalties(royalties_2).run(valid=True, sender=admin)
+        c1.set_royalties_overrides(sp.list([sp.pair(2, sp.some(0))])).run(valid=True, sender=admin)
+        scenario.verify_equal(c1.token_metadata(1), sp.pair(sp.nat(1), sp.map(l={"": sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBDR/1.json"),
+                                                                                NFT.ROYALTIES_METADATA: royalties_2})))
+        scenario.verify_equal(c1.token_metadata(2), sp.pair(sp.nat(2), sp.map(l={"": sp.utils.bytes_of_string("ipfs://QmWkrkZj562duMGVwwaUtPo7iH1zPtLYKB2u9M7EfUYBDR/2.json"),
+                                                                                NFT.ROYALTIES_METADATA: royalties_1})))
+        scenario.verify((sp.snd(c1.token_metadata(0)))[NFT.ROYALTIES_METADATA] == royalties_2)
+
 ########################################################################################################################
 # unit_fa2_test_get_project_oracles_stream
 ########################################################################################################################
@@ -1624,21 +2407,163 @@ def unit_fa2_test_get_voting_power(is_default=True):
         scenario.verify(c1.data.ledger[22] == gabe.address)
         scenario.verify(c1.data.ledger[23] == chris.address)
 
+
+########################################################################################################################
+# unit_fa2_test_prune_voting_power
+########################################################################################################################
+def unit_fa2_test_prune_voting_power(is_default=True):
+    @sp.add_test(name="unit_fa2_test_prune_voting_power", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_prune_voting_power")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the entrypoint prune_voting_power. (Who: Only main admin)")
+        scenario.p("Used to remove the voting power checkpoints that no poll can reference anymore.")
+
+        scenario.p("1. Mint NFTs at different levels to create several checkpoints")
+        c1.mint(alice.address).run(valid=True, sender=admin, level=10)
+        c1.mint(alice.address).run(valid=True, sender=admin, level=20)
+        c1.mint(alice.address).run(valid=True, sender=admin, level=30)
+        c1.mint(alice.address).run(valid=True, sender=admin, level=40)
+        c1.mint(bob.address).run(valid=True, sender=admin, level=40)
+        scenario.verify(c1.data.voting_power_highest_index[alice.address] == 3)
+
+        scenario.p("2. Check the DAO shall be registered first and only by the main admin")
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address, bob.address]), level=25)).run(valid=False, sender=admin, level=50,
+                                                                                                        exception=NFT.Error.ErrorMessage.dao_not_registered())
+        dao = TestHelper.SimulatedDaoContract()
+        scenario += dao
+        c1.set_dao_address(dao.address).run(valid=False, sender=alice)
+        c1.set_dao_address(dao.address).run(valid=True, sender=admin)
+        scenario.verify(c1.data.dao_address == sp.some(dao.address))
+
+        scenario.p("3. Check only the main admin can prune and only up to the current level")
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address, bob.address]), level=25)).run(valid=False, sender=alice, level=50)
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address, bob.address]), level=25)).run(valid=False, sender=john, level=50)
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address, bob.address]), level=51)).run(valid=False, sender=admin, level=50)
+
+        scenario.p("4. Check the pruning level cannot be above the snapshot level of the poll open in the DAO")
+        dao.set_snapshot_block(sp.some(sp.nat(20))).run(valid=True)
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address, bob.address]), level=25)).run(valid=False, sender=admin, level=50,
+                                                                                                        exception=NFT.Error.ErrorMessage.dao_vote_in_progress())
+        dao.set_snapshot_block(sp.some(sp.nat(25))).run(valid=True)
+
+        scenario.p("5. Successfully prune the checkpoints below level 25")
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address, bob.address, john.address]), level=25)).run(valid=True, sender=admin, level=50)
+        scenario.verify(~c1.data.voting_power.contains(sp.pair(alice.address, 0)))
+        scenario.verify(c1.data.voting_power.contains(sp.pair(alice.address, 1)))
+        scenario.verify(c1.data.voting_power_lowest_index[alice.address] == 1)
+        scenario.verify(~c1.data.voting_power_lowest_index.contains(bob.address))
+        scenario.verify(c1.data.voting_power.contains(sp.pair(bob.address, 0)))
+        scenario.verify(c1.data.voting_power_min_level[alice.address] == 25)
+        scenario.verify(c1.data.voting_power_min_level[bob.address] == 25)
+        scenario.verify(c1.data.voting_power_min_level[john.address] == 25)
+
+        scenario.p("6. Check the voting power is still correct from the pruning level")
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 25)) == 2)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 30)) == 3)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 35)) == 3)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 40)) == 4)
+        scenario.verify(c1.get_voting_power(sp.pair(bob.address, 25)) == 0)
+        scenario.verify(c1.get_voting_power(sp.pair(bob.address, 45)) == 1)
+        scenario.verify(c1.get_voting_power(sp.pair(john.address, 45)) == 0)
+
+        scenario.p("7. Check the voting power cannot be queried anymore below the pruning level of the pruned addresses only")
+        scenario.verify(sp.is_failing(c1.get_voting_power(sp.pair(alice.address, 24))))
+        scenario.verify(c1.get_voting_power(sp.pair(admin.address, 5)) == 0)
+
+        scenario.p("8. Close the poll, prune up to the latest checkpoint and check the voting power is still correct")
+        dao.set_snapshot_block(sp.none).run(valid=True)
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address, bob.address]), level=45)).run(valid=True, sender=admin, level=50)
+        scenario.verify(c1.data.voting_power_lowest_index[alice.address] == 3)
+        scenario.verify(c1.data.voting_power.contains(sp.pair(alice.address, 3)))
+        scenario.verify(~c1.data.voting_power.contains(sp.pair(alice.address, 2)))
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 45)) == 4)
+
+        scenario.verify(c1.data.voting_power_min_level[alice.address] == 45)
+        scenario.verify(c1.data.voting_power_min_level[john.address] == 25)
+
+        scenario.p("9. Check a lower pruning level does not lower the minimum level")
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address]), level=30)).run(valid=True, sender=admin, level=50)
+        scenario.verify(c1.data.voting_power_min_level[alice.address] == 45)
+
+        scenario.p("10. Mint and transfer after pruning and check the voting power")
+        c1.mint(alice.address).run(valid=True, sender=admin, level=60)
+        transfer1 = sp.record(to_=bob.address, token_id=0, amount=1)
+        c1.transfer(sp.list([sp.record(from_=alice.address, txs=sp.list([transfer1]))])).run(valid=True, sender=alice, level=70)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 50)) == 4)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 65)) == 5)
+        scenario.verify(c1.get_voting_power(sp.pair(alice.address, 70)) == 4)
+        scenario.verify(c1.get_voting_power(sp.pair(bob.address, 70)) == 2)
+
+
+########################################################################################################################
+# unit_fa2_test_get_voting_power_batch
+########################################################################################################################
+def unit_fa2_test_get_voting_power_batch(is_default=True):
+    @sp.add_test(name="unit_fa2_test_get_voting_power_batch", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_fa2_test_get_voting_power_batch")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the get_voting_power_batch onchain view and the get_voting_power_list offchain view.")
+
+        scenario.p("1. Check an empty batch returns an empty list")
+        TestHelper.compare_list(scenario, c1.get_voting_power_batch(sp.list(l=[], t=sp.TPair(sp.TAddress, sp.TNat))), sp.list(l=[], t=sp.TNat))
+
+        scenario.p("2. Mint NFTs at different levels")
+        c1.mint(alice.address).run(valid=True, sender=admin, level=10)
+        c1.mint_batch(sp.record(address=bob.address, amount=3)).run(valid=True, sender=admin, level=20)
+        c1.mint(alice.address).run(valid=True, sender=admin, level=30)
+
+        scenario.p("3. Check the batch returns the same values as get_voting_power in the same order")
+        queries = [(alice.address, 5), (alice.address, 10), (bob.address, 20), (alice.address, 35), (john.address, 35), (bob.address, 15)]
+        expected = [0, 1, 3, 2, 0, 0]
+        batch = sp.list(l=[sp.pair(address, level) for (address, level) in queries], t=sp.TPair(sp.TAddress, sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_voting_power_batch(batch), sp.list(l=expected, t=sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_voting_power_list(batch), sp.list(l=expected, t=sp.TNat))
+        for (address, level), value in zip(queries, expected):
+            scenario.verify(c1.get_voting_power(sp.pair(address, level)) == value)
+
+        scenario.p("4. Check the batch fails if one of the levels has been pruned")
+        TestHelper.create_dao(scenario, c1, admin)
+        c1.prune_voting_power(sp.record(addresses=sp.list([alice.address]), level=25)).run(valid=True, sender=admin, level=40)
+        scenario.verify(sp.is_failing(c1.get_voting_power_batch(batch)))
+        batch = sp.list(l=[sp.pair(bob.address, 40), sp.pair(alice.address, 25)], t=sp.TPair(sp.TAddress, sp.TNat))
+        TestHelper.compare_list(scenario, c1.get_voting_power_batch(batch), sp.list(l=[3, 1], t=sp.TNat))
+
 unit_fa2_test_initial_storage()
 unit_fa2_test_mint()
 unit_fa2_test_mint_max()
+unit_fa2_test_mint_batch()
+unit_fa2_test_mint_batch_list()
 unit_fa2_test_set_next_administrator()
 unit_fa2_test_validate_new_administrator()
 unit_fa2_test_set_sale_contract_administrator()
 unit_fa2_test_set_artwork_administrator()
 unit_fa2_test_set_pause()
+unit_fa2_test_set_generic_artwork()
 unit_fa2_test_update_artwork_data()
+unit_fa2_test_non_revealed_tokens()
 unit_fa2_test_mutez_transfer()
 unit_fa2_test_set_royalties_field()
 unit_fa2_test_set_royalties_minted_tokens()
+unit_fa2_test_set_global_royalties()
 unit_fa2_test_transfer()
+unit_fa2_test_transfer_voting_power()
+unit_fa2_test_tokens_of_owner()
+unit_fa2_test_all_tokens_page()
 unit_fa2_test_update_operators()
+unit_fa2_test_update_operators_for_all()
 unit_fa2_test_token_metadata_storage()
+unit_fa2_test_token_metadata_name()
 unit_fa2_test_token_metadata_offchain()
+unit_fa2_test_token_metadata_compact()
+unit_fa2_test_reveal_artwork_data()
+unit_fa2_test_commit_reveal()
 unit_fa2_test_get_project_oracles_stream()
 unit_fa2_test_get_voting_power()
+unit_fa2_test_prune_voting_power()
+unit_fa2_test_get_voting_power_batch()
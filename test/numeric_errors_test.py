@@ -0,0 +1,154 @@
+import json
+import os
+import smartpy as sp
+
+# The contracts of this test are built as when compiled with ANGRY_TEENAGERS_NUMERIC_ERRORS=1 (see ./helper/errors.py)
+os.environ["ANGRY_TEENAGERS_NUMERIC_ERRORS"] = "1"
+
+Error = sp.io.import_script_from_url("file:./helper/errors.py")
+NFT = sp.io.import_script_from_url("file:./nft/nft.py")
+Sale = sp.io.import_script_from_url("file:./sale/sale.py")
+Config = sp.io.import_script_from_url("file:./config/nft_config.py")
+
+########################################################################################################################
+########################################################################################################################
+# Testing
+########################################################################################################################
+##################################################################################################################
+# Unit Test ------------------------------------------------------------------------------------------------------------
+
+class TestHelper():
+    def create_scenario(name):
+        scenario = sp.test_scenario()
+        scenario.h1(name)
+        scenario.table_of_contents()
+        return scenario
+
+    def create_account(scenario):
+        admin = sp.test_account("admin")
+        alice = sp.test_account("alice")
+        bob = sp.test_account("bob")
+        john = sp.test_account("john")
+        scenario.h2("Accounts")
+        scenario.show([admin, alice, bob, john])
+        return admin, alice, bob, john
+
+    def create_nft(scenario, admin):
+        c1 = NFT.AngryTeenagers(administrator=admin.address,
+                                royalties_bytes=sp.utils.bytes_of_string(Config.ROYALTIES_BYTES),
+                                metadata=sp.utils.metadata_of_url("https://example.com"),
+                                generic_image_ipfs=sp.utils.bytes_of_string(Config.GENERIC_ARTWORK_IPFS_LINK),
+                                generic_image_ipfs_display=sp.utils.bytes_of_string(Config.GENERIC_DISPLAY_ARTWORK_IPFS_LINK),
+                                generic_image_ipfs_thumbnail=sp.utils.bytes_of_string(Config.GENERIC_THUMBNAIL_ARTWORK_IPFS_LINK),
+                                what3words_file_ipfs=sp.utils.bytes_of_string(Config.WHAT3WORDS_FILE_IPFS_LINK),
+                                max_supply=128,
+                                artifact_file_type=Config.ARTIFACT_FILE_TYPE,
+                                artifact_file_size_generic=Config.ARTIFACT_FILE_SIZE,
+                                artifact_file_name=Config.ARTIFACT_FILE_NAME,
+                                artifact_dimensions=Config.ARTIFACT_DIMENSIONS,
+                                artifact_file_unit=Config.ARTIFACT_FILE_UNIT,
+                                display_file_type=Config.DISPLAY_FILE_TYPE,
+                                display_file_size_generic=Config.DISPLAY_FILE_SIZE,
+                                display_file_name=Config.DISPLAY_FILE_NAME,
+                                display_dimensions=Config.DISPLAY_DIMENSIONS,
+                                display_file_unit=Config.DISPLAY_FILE_UNIT,
+                                thumbnail_file_type=Config.THUMBNAIL_FILE_TYPE,
+                                thumbnail_file_size_generic=Config.THUMBNAIL_FILE_SIZE,
+                                thumbnail_file_name=Config.THUMBNAIL_FILE_NAME,
+                                thumbnail_dimensions=Config.THUMBNAIL_DIMENSIONS,
+                                thumbnail_file_unit=Config.THUMBNAIL_FILE_UNIT,
+                                name_prefix=Config.NAME_PREFIX,
+                                symbol=Config.SYMBOL,
+                                description=Config.DESCRIPTION,
+                                language=Config.LANGUAGE,
+                                attributes_generic=Config.ATTRIBUTES_GENERIC,
+                                rights=Config.RIGHTS,
+                                creators=Config.CREATORS,
+                                project_name=Config.PROJECTNAME)
+        scenario += c1
+        scenario.h2("Contracts")
+        scenario.p("c1: This FA2 contract to test, built with the numeric error codes")
+        return c1
+
+    def code(message):
+        # Code of an error in the table exported in ./helper/error_codes.json
+        with open("./helper/error_codes.json") as table_file:
+            table = json.load(table_file)
+        codes = [int(code) for code, table_message in table.items() if table_message == message]
+        assert len(codes) == 1, "%s is not in ./helper/error_codes.json" % message
+        return sp.nat(codes[0])
+
+########################################################################################################################
+# unit_numeric_errors_test_tzip16_errors
+########################################################################################################################
+def unit_numeric_errors_test_tzip16_errors(is_default=True):
+    @sp.add_test(name="unit_numeric_errors_test_tzip16_errors", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_numeric_errors_test_tzip16_errors")
+
+        scenario.h2("Test the errors field of the TZIP-16 metadata.")
+        scenario.p("The indexers decode the codes with ./helper/error_codes.json, so the errors field added to the metadata of the contracts shall be the same table.")
+
+        scenario.p("1. Check the contracts are built with the numeric error codes")
+        assert Error.NUMERIC_ERRORS
+        assert NFT.Error.NUMERIC_ERRORS
+        assert Sale.Error.NUMERIC_ERRORS
+
+        scenario.p("2. Check the errors field of the metadata matches ./helper/error_codes.json")
+        with open("./helper/error_codes.json") as table_file:
+            table = json.load(table_file)
+        errors = Error.tzip16_errors()
+        assert len(errors) == len(table)
+        for entry in errors:
+            assert entry["expansion"]["string"] == table[entry["error"]["int"]]
+            assert entry["languages"] == ["en"]
+
+########################################################################################################################
+# unit_numeric_errors_test_nft
+########################################################################################################################
+def unit_numeric_errors_test_nft(is_default=True):
+    @sp.add_test(name="unit_numeric_errors_test_nft", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_numeric_errors_test_nft")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = TestHelper.create_nft(scenario, admin)
+
+        scenario.h2("Test the NFT contract fails with the numeric error codes.")
+
+        scenario.p("1. Check an entrypoint fails with the code of the error")
+        c1.set_pause(True).run(valid=False, sender=alice, exception=TestHelper.code("ANGRY_TEENAGERS_NOT_ADMIN"))
+        c1.mint(alice.address).run(valid=False, sender=alice, exception=TestHelper.code("ANGRY_TEENAGERS_NOT_ADMIN"))
+        c1.mint_batch(sp.record(address=alice.address, amount=0)).run(valid=False, sender=admin, exception=TestHelper.code("ANGRY_TEENAGERS_INVALID_PARAMETER"))
+
+        scenario.p("2. Check a view fails with the code of the error")
+        scenario.verify_equal(sp.catch_exception(c1.get_project_oracles_deposit(0), t=sp.TNat),
+                              sp.some(TestHelper.code("ANGRY_TEENAGERS_INVALID_PARAMETER")))
+
+        scenario.p("3. Check the FA2 errors of TZIP-12 are kept as strings")
+        scenario.verify_equal(sp.catch_exception(c1.token_metadata(1000), t=sp.TString), sp.some("FA2_TOKEN_UNDEFINED"))
+
+########################################################################################################################
+# unit_numeric_errors_test_sale
+########################################################################################################################
+def unit_numeric_errors_test_sale(is_default=True):
+    @sp.add_test(name="unit_numeric_errors_test_sale", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_numeric_errors_test_sale")
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1 = Sale.AngryTeenagersSale(admin.address, admin.address, sp.utils.metadata_of_url("https://example.com"))
+        scenario += c1
+
+        scenario.h2("Test the sale contract fails with the numeric error codes.")
+
+        scenario.p("1. Check an entrypoint fails with the code of the error")
+        c1.register_fa2(alice.address).run(valid=False, sender=bob, exception=TestHelper.code("ANGRY_TEENAGERS_UNAUTHORISED_USER"))
+
+        scenario.p("2. Check a FA2 contract without the expected entrypoint fails with the interface mismatch code")
+        c1.register_fa2(alice.address).run(valid=True, sender=admin)
+        c1.mint_and_give(sp.record(amount=1, address=bob.address)).run(valid=False, sender=admin, exception=TestHelper.code("ANGRY_TEENAGERS_INTERFACE_MISMATCH"))
+
+########################################################################################################################
+# Execute tests --------------------------------------------------------------------------------------------------------
+unit_numeric_errors_test_tzip16_errors()
+unit_numeric_errors_test_nft()
+unit_numeric_errors_test_sale()
@@ -187,12 +187,16 @@ def unit_test_initial_storage(is_default = True):
         scenario.verify(c1.data.metadata[""] == sp.utils.bytes_of_string("https://example.com"))
 
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_NO_EVENT_OPEN_0))
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
-        scenario.verify(sp.len(c1.data.pre_allowlist) == 0)
+        scenario.verify(c1.data.allowlist_generation == 0)
+        scenario.verify(c1.data.allowlist_size == 0)
+        scenario.verify(c1.data.pre_allowlist_size == 0)
 
         scenario.verify(c1.data.event_price == sp.mutez(0))
         scenario.verify(c1.data.event_max_supply == sp.nat(0))
         scenario.verify(c1.data.event_max_per_user == sp.nat(0))
+        scenario.verify(c1.data.event_id == sp.nat(0))
+        scenario.verify(c1.data.presale_cursor == sp.nat(0))
+        scenario.verify(c1.data.presale_done == sp.bool(False))
 
         scenario.verify(c1.data.public_allowlist_max_space == sp.nat(0))
         scenario.verify(c1.data.public_allowlist_space_taken == sp.nat(0))
@@ -217,8 +221,8 @@ def unit_test_admin_fill_allowlist(is_default = True):
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_NO_EVENT_OPEN_0))
 
         scenario.p("2. Verify the allowlist and the pre-allowlist are both empty")
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
-        scenario.verify(sp.len(c1.data.pre_allowlist) == 0)
+        scenario.verify(c1.data.allowlist_size == 0)
+        scenario.verify(c1.data.pre_allowlist_size == 0)
 
 
         scenario.p("3. Verify that only the admin can fill the allowlist")
@@ -234,18 +238,18 @@ def unit_test_admin_fill_allowlist(is_default = True):
         scenario.p("4.4. Pre-allowlist has not changed (another entrypoint is used for that)")
         c1.admin_fill_allowlist(sp.set(l=[alice.address, bob.address], t=sp.TAddress)).run(valid=True, sender=admin)
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_NO_EVENT_OPEN_0))
-        scenario.verify(sp.len(c1.data.allowlist) == 2)
-        scenario.verify(c1.data.allowlist.contains(alice.address))
-        scenario.verify(c1.data.allowlist.contains(bob.address))
-        scenario.verify(sp.len(c1.data.pre_allowlist) == 0)
+        scenario.verify(c1.data.allowlist_size == 2)
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
+        scenario.verify(c1.data.pre_allowlist_size == 0)
 
         scenario.p("5. Add another entry successfully to the allowlist and make the same verification than in step 5")
         c1.admin_fill_allowlist(sp.set(l=[alice.address, john.address], t=sp.TAddress)).run(valid=True, sender=admin)
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_NO_EVENT_OPEN_0))
-        scenario.verify(sp.len(c1.data.allowlist) == 3)
-        scenario.verify(c1.data.allowlist.contains(alice.address))
-        scenario.verify(c1.data.allowlist.contains(bob.address))
-        scenario.verify(c1.data.allowlist.contains(john.address))
+        scenario.verify(c1.data.allowlist_size == 3)
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, john.address)))
 
         scenario.p("6. Check the offchain view get_mint_token_available returns the expected value")
         scenario.verify(c1.get_mint_token_available(admin.address) == 0)
@@ -266,8 +270,8 @@ def unit_test_admin_fill_pre_allowlist(is_default = True):
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_NO_EVENT_OPEN_0))
 
         scenario.p("2. Verify the allowlist and the pre-allowlist are both empty")
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
-        scenario.verify(sp.len(c1.data.pre_allowlist) == 0)
+        scenario.verify(c1.data.allowlist_size == 0)
+        scenario.verify(c1.data.pre_allowlist_size == 0)
 
         scenario.p("3. Verify that only the admin can fill the pre-allowlist")
         c1.admin_fill_pre_allowlist(sp.set(l=[alice.address, bob.address], t=sp.TAddress)).run(valid=False, sender=bob)
@@ -281,18 +285,18 @@ def unit_test_admin_fill_pre_allowlist(is_default = True):
         scenario.p("4.4. Allowlist has not changed (another entrypoint is used for that)")
         c1.admin_fill_pre_allowlist(sp.set(l=[alice.address, bob.address], t=sp.TAddress)).run(valid=True, sender=admin)
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_NO_EVENT_OPEN_0))
-        scenario.verify(sp.len(c1.data.pre_allowlist) == 2)
-        scenario.verify(c1.data.pre_allowlist.contains(alice.address))
-        scenario.verify(c1.data.pre_allowlist.contains(bob.address))
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
+        scenario.verify(c1.data.pre_allowlist_size == 2)
+        scenario.verify(c1.data.pre_allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.pre_allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
+        scenario.verify(c1.data.allowlist_size == 0)
 
         scenario.p("5. Add another entry successfully to the pre-allowlist and make the same verification than in step 5")
         c1.admin_fill_pre_allowlist(sp.set(l=[alice.address, john.address], t=sp.TAddress)).run(valid=True, sender=admin)
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_NO_EVENT_OPEN_0))
-        scenario.verify(sp.len(c1.data.pre_allowlist) == 3)
-        scenario.verify(c1.data.pre_allowlist.contains(alice.address))
-        scenario.verify(c1.data.pre_allowlist.contains(bob.address))
-        scenario.verify(c1.data.pre_allowlist.contains(john.address))
+        scenario.verify(c1.data.pre_allowlist_size == 3)
+        scenario.verify(c1.data.pre_allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.pre_allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
+        scenario.verify(c1.data.pre_allowlist.contains(sp.pair(c1.data.allowlist_generation, john.address)))
 
 ########################################################################################################################
 # unit_test_open_event_priv_allowlist_reg
@@ -346,7 +350,7 @@ def unit_test_pay_to_enter_allowlist_priv(is_default = True):
         c1.admin_fill_pre_allowlist(sp.set(l=[alice.address, bob.address], t=sp.TAddress)).run(valid=True, sender=admin)
 
         scenario.p("2. Verify the state of the contract")
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
+        scenario.verify(c1.data.allowlist_size == 0)
         c1.open_event_priv_allowlist_reg(sp.record(price=sp.tez(10))).run(valid=True, sender=admin)
 
         scenario.p("3. Open the event to register into the allowlist for users in the pre-allowlist")
@@ -356,22 +360,22 @@ def unit_test_pay_to_enter_allowlist_priv(is_default = True):
         scenario.p("4.3. When users in the pre-allowlist pays the expected price, they are registered in the allowlist")
         c1.pay_to_enter_allowlist_priv().run(valid=False, sender=alice)
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_EVENT_PRIV_ALLOWLIST_REG_1))
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
+        scenario.verify(c1.data.allowlist_size == 0)
         c1.pay_to_enter_allowlist_priv().run(valid=False, amount=sp.tez(5), sender=alice)
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_EVENT_PRIV_ALLOWLIST_REG_1))
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
+        scenario.verify(c1.data.allowlist_size == 0)
         c1.pay_to_enter_allowlist_priv().run(valid=True, amount=sp.tez(10), sender=alice)
         c1.pay_to_enter_allowlist_priv().run(valid=True, amount=sp.tez(10), sender=bob)
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_EVENT_PRIV_ALLOWLIST_REG_1))
-        scenario.verify(sp.len(c1.data.allowlist) == 2)
-        scenario.verify(c1.data.allowlist.contains(alice.address))
-        scenario.verify(c1.data.allowlist.contains(bob.address))
+        scenario.verify(c1.data.allowlist_size == 2)
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
         c1.pay_to_enter_allowlist_priv().run(valid=False, amount=sp.tez(10), sender=john)
         c1.pay_to_enter_allowlist_priv().run(valid=False, amount=sp.tez(10), sender=admin)
         scenario.verify(c1.data.state == sp.nat(Sale.STATE_EVENT_PRIV_ALLOWLIST_REG_1))
-        scenario.verify(sp.len(c1.data.allowlist) == 2)
-        scenario.verify(c1.data.allowlist.contains(alice.address))
-        scenario.verify(c1.data.allowlist.contains(bob.address))
+        scenario.verify(c1.data.allowlist_size == 2)
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
 
 ########################################################################################################################
 # unit_test_open_event_pub_allowlist_reg
@@ -452,7 +456,7 @@ def unit_test_pay_to_enter_allowlist_pub(is_default = True):
         scenario.p("5. Check users can ony register if they pay the XTZ fee")
         c1.pay_to_enter_allowlist_pub().run(valid=False, sender=alice)
         c1.pay_to_enter_allowlist_pub().run(valid=False, amount=sp.tez(5), sender=alice)
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
+        scenario.verify(c1.data.allowlist_size == 0)
         c1.pay_to_enter_allowlist_pub().run(valid=True, amount=sp.tez(10), sender=alice)
 
         scenario.p("6. Check users cannot call this entrypoint is they already register to the allowlist")
@@ -462,15 +466,15 @@ def unit_test_pay_to_enter_allowlist_pub(is_default = True):
         scenario.p("7.2. Check the allowlist length")
         scenario.p("7.3. Check the allowlist contains the registered users")
         c1.pay_to_enter_allowlist_pub().run(valid=False, amount=sp.tez(10), sender=alice)
-        scenario.verify(sp.len(c1.data.allowlist) == 1)
-        scenario.verify(c1.data.allowlist.contains(alice.address))
+        scenario.verify(c1.data.allowlist_size == 1)
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
         scenario.verify(c1.data.public_allowlist_space_taken == 1)
         scenario.verify(c1.data.public_allowlist_max_space == 2)
 
         c1.pay_to_enter_allowlist_pub().run(valid=True, amount=sp.tez(10), sender=bob)
-        scenario.verify(sp.len(c1.data.allowlist) == 2)
-        scenario.verify(c1.data.allowlist.contains(alice.address))
-        scenario.verify(c1.data.allowlist.contains(bob.address))
+        scenario.verify(c1.data.allowlist_size == 2)
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
 
         scenario.p("8. Check event closes automatically when all spaces are taken")
         scenario.p("9. Check users cannot register anymore when event is closed")
@@ -482,15 +486,15 @@ def unit_test_pay_to_enter_allowlist_pub(is_default = True):
 
         # Only 2 spots
         c1.pay_to_enter_allowlist_pub().run(valid=False, amount=sp.tez(10), sender=john)
-        scenario.verify(sp.len(c1.data.allowlist) == 2)
-        scenario.verify(c1.data.allowlist.contains(alice.address))
-        scenario.verify(c1.data.allowlist.contains(bob.address))
+        scenario.verify(c1.data.allowlist_size == 2)
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
         scenario.verify(c1.data.public_allowlist_space_taken == 0)
         scenario.verify(c1.data.public_allowlist_max_space == 0)
         # Allowlist is not erased
-        scenario.verify(sp.len(c1.data.allowlist) == 2)
-        scenario.verify(c1.data.allowlist.contains(alice.address))
-        scenario.verify(c1.data.allowlist.contains(bob.address))
+        scenario.verify(c1.data.allowlist_size == 2)
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, alice.address)))
+        scenario.verify(c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, bob.address)))
 
 ########################################################################################################################
 # unit_test_open_pre_sale
@@ -709,6 +713,58 @@ def unit_test_mint_and_give(is_default=True):
         TestHelper.check_fa2_ledger(scenario=scenario, contract=c2,
                                     owner=bob.address, token_id_min=84, token_id_max=90)
 
+########################################################################################################################
+# unit_test_mint_and_give_batch
+########################################################################################################################
+def unit_test_mint_and_give_batch(is_default=True):
+    @sp.add_test(name="unit_test_mint_and_give_batch", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_test_mint_and_give_batch")
+
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1, c2, simulated_presale_contract = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the mint_and_give_batch entrypoint. (Who: Only for the admin)")
+        scenario.p("This function is used by the admin to mint and give tokens to several users when no sales event are opened.")
+
+        scenario.p("1. Check only admin can call this entrypoint")
+        c1.mint_and_give_batch(sp.list(l=[sp.record(amount=1, address=bob.address)])).run(valid=False, sender=alice)
+        c1.mint_and_give_batch(sp.list(l=[sp.record(amount=2, address=bob.address)])).run(valid=True, sender=admin)
+
+        scenario.p("2. Check an empty list or a user with 0 token is rejected")
+        c1.mint_and_give_batch(sp.list(l=[], t=Sale.FA2_MINT_BATCH_PARAM_TYPE)).run(valid=False, sender=admin)
+        c1.mint_and_give_batch(sp.list(l=[sp.record(amount=1, address=bob.address),
+                                          sp.record(amount=0, address=john.address)])).run(valid=False, sender=admin)
+
+        scenario.p("3. Open a public sale")
+        c1.open_pub_sale(sp.record(max_supply=100,
+                                   max_per_user=80,
+                                   price=sp.tez(10))).run(valid=True, sender=admin)
+
+        scenario.p("4. Check this entrypoint cannot be called when a sale is opened")
+        c1.mint_and_give_batch(sp.list(l=[sp.record(amount=2, address=bob.address)])).run(valid=False, sender=admin)
+        c1.user_mint(sp.record(amount=80, address=alice.address)).run(valid=True, amount=sp.mutez(800000000), sender=alice)
+
+        scenario.p("5. Close the open public sale")
+        c1.close_any_open_event().run(valid=True, sender=admin)
+
+        scenario.p("6. Mint and give successfully to several users")
+        c1.mint_and_give_batch(sp.list(l=[sp.record(amount=2, address=john.address),
+                                          sp.record(amount=6, address=bob.address),
+                                          sp.record(amount=1, address=alice.address)])).run(valid=True, sender=admin)
+
+        scenario.p("7. Check the ledger of the FA2 contract")
+        TestHelper.check_fa2_ledger(scenario=scenario, contract=c2,
+                                    owner=bob.address, token_id_min=0, token_id_max=2)
+        TestHelper.check_fa2_ledger(scenario=scenario, contract=c2,
+                                    owner=alice.address, token_id_min=2, token_id_max=82)
+        TestHelper.check_fa2_ledger(scenario=scenario, contract=c2,
+                                    owner=john.address, token_id_min=82, token_id_max=84)
+        TestHelper.check_fa2_ledger(scenario=scenario, contract=c2,
+                                    owner=bob.address, token_id_min=84, token_id_max=90)
+        TestHelper.check_fa2_ledger(scenario=scenario, contract=c2,
+                                    owner=alice.address, token_id_min=90, token_id_max=91)
+
 ########################################################################################################################
 # unit_test_set_next_administrator
 ########################################################################################################################
@@ -985,6 +1041,159 @@ def unit_test_user_mint_during_pre_sale(is_default=True):
         TestHelper.check_fa2_ledger(scenario=scenario, contract=c2,
                                     owner=alice.address, token_id_min=49,token_id_max=50)
 
+########################################################################################################################
+# unit_test_user_mint_with_proof
+########################################################################################################################
+def unit_test_user_mint_with_proof(is_default=True):
+    @sp.add_test(name="unit_test_user_mint_with_proof", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_test_user_mint_with_proof")
+
+        admin, alice, bob, john, nat, ben, gabe, gaston, chris = TestHelper.create_more_account(scenario)
+        c1, c2, simulated_presale_contract = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the user_mint_with_proof entrypoint.  (Who: for all users in the merkle allowlist)")
+        scenario.p("This entrypoint is called by users to mint NFTs when a pre-sale is opened. The user gives its quota and the merkle proof that the address and the quota are part of the allowlist committed by the admin.")
+
+        scenario.p("1. Build a merkle allowlist with alice (quota 3) and bob (quota 1)")
+        alice_leaf = scenario.compute(sp.blake2b(sp.pack(sp.pair(alice.address, sp.nat(3)))))
+        bob_leaf = scenario.compute(sp.blake2b(sp.pack(sp.pair(bob.address, sp.nat(1)))))
+        root = scenario.compute(sp.eif(alice_leaf < bob_leaf,
+                                       sp.blake2b(sp.concat([alice_leaf, bob_leaf])),
+                                       sp.blake2b(sp.concat([bob_leaf, alice_leaf]))))
+
+        scenario.p("2. Verify only the admin can commit the merkle root")
+        c1.set_allowlist_merkle_root(sp.some(root)).run(valid=False, sender=alice)
+        c1.set_allowlist_merkle_root(sp.some(root)).run(valid=True, sender=admin)
+        scenario.verify(c1.data.allowlist_merkle_root == sp.some(root))
+
+        scenario.p("3. Verify this entrypoint cannot be called when the pre-sale is not opened")
+        c1.user_mint_with_proof(sp.record(address=alice.address, amount=1, quota=3, proof=[bob_leaf])).run(valid=False, amount=sp.tez(10), sender=alice)
+
+        scenario.verify(c1.get_mint_token_available_with_proof(sp.record(address=alice.address, quota=3, proof=[bob_leaf])) == 0)
+
+        scenario.p("4. Start the pre-sale event")
+        c1.open_pre_sale(sp.record(max_supply=50, max_per_user=2, price=sp.tez(10))).run(valid=True, sender=admin)
+
+        scenario.p("4.1. Check the merkle quota is only seen with the proof: alice is not in the allowlist of admin_fill_allowlist")
+        scenario.verify(c1.get_mint_token_available(alice.address) == 0)
+        scenario.verify(c1.get_mint_token_available_with_proof(sp.record(address=alice.address, quota=3, proof=[bob_leaf])) == 3)
+        scenario.verify(c1.get_mint_token_available_with_proof(sp.record(address=bob.address, quota=1, proof=[alice_leaf])) == 1)
+        scenario.verify(c1.get_mint_token_available_with_proof(sp.record(address=bob.address, quota=2, proof=[alice_leaf])) == 0)
+        scenario.verify(c1.get_mint_token_available_with_proof(sp.record(address=john.address, quota=3, proof=[bob_leaf])) == 0)
+
+        scenario.p("5. Verify the merkle root cannot be changed while an event is opened")
+        c1.set_allowlist_merkle_root(sp.none).run(valid=False, sender=admin)
+
+        scenario.p("6. Verify users cannot mint with a wrong quota, a wrong proof or an address not in the allowlist")
+        c1.user_mint_with_proof(sp.record(address=bob.address, amount=1, quota=2, proof=[alice_leaf])).run(valid=False, amount=sp.tez(10), sender=bob)
+        c1.user_mint_with_proof(sp.record(address=bob.address, amount=1, quota=1, proof=[bob_leaf])).run(valid=False, amount=sp.tez(10), sender=bob)
+        c1.user_mint_with_proof(sp.record(address=john.address, amount=1, quota=3, proof=[bob_leaf])).run(valid=False, amount=sp.tez(10), sender=john)
+
+        scenario.p("7. Verify users cannot mint 0 NFT or without the expected amount of XTZ")
+        c1.user_mint_with_proof(sp.record(address=alice.address, amount=0, quota=3, proof=[bob_leaf])).run(valid=False, amount=sp.tez(0), sender=alice)
+        c1.user_mint_with_proof(sp.record(address=alice.address, amount=3, quota=3, proof=[bob_leaf])).run(valid=False, amount=sp.tez(20), sender=alice)
+
+        scenario.p("8. Mint up to the quota (it replaces the maximum per user of the event)")
+        c1.user_mint_with_proof(sp.record(address=alice.address, amount=3, quota=3, proof=[bob_leaf])).run(valid=True, amount=sp.tez(30), sender=alice)
+        c1.user_mint_with_proof(sp.record(address=alice.address, amount=1, quota=3, proof=[bob_leaf])).run(valid=False, amount=sp.tez(10), sender=alice)
+        scenario.verify(c1.get_mint_token_available_with_proof(sp.record(address=alice.address, quota=3, proof=[bob_leaf])) == 0)
+        c1.user_mint_with_proof(sp.record(address=bob.address, amount=1, quota=1, proof=[alice_leaf])).run(valid=True, amount=sp.tez(10), sender=bob)
+        scenario.verify(c1.balance == sp.mutez(0))
+        scenario.verify(c1.data.token_minted_in_event == 4)
+
+        scenario.p("9. Close the event and clear the allowlist. The merkle root is removed")
+        c1.close_any_open_event().run(valid=True, sender=admin)
+        c1.clear_allowlist().run(valid=True, sender=admin)
+        scenario.verify(c1.data.allowlist_merkle_root == sp.none)
+
+        scenario.p("10. Check the FA2 ledger contains the expected NFTs")
+        TestHelper.check_fa2_ledger(scenario, c2, alice.address, 0, 3)
+        TestHelper.check_fa2_ledger(scenario, c2, bob.address, 3, 4)
+
+########################################################################################################################
+# unit_test_event_user_balance
+########################################################################################################################
+def unit_test_event_user_balance(is_default=True):
+    @sp.add_test(name="unit_test_event_user_balance", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_test_event_user_balance")
+
+        admin, alice, bob, john, nat, ben, gabe, gaston, chris = TestHelper.create_more_account(scenario)
+        c1, c2, simulated_presale_contract = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the number of tokens minted per user and per sale event.")
+        scenario.p("Each sale event has its own id. The tokens minted by a user are counted per event id so a new event starts with a zero balance for every user.")
+
+        scenario.p("1. Open a pre-sale and verify it gets the event id 1")
+        c1.admin_fill_allowlist(sp.set(l=[alice.address], t=sp.TAddress)).run(valid=True, sender=admin)
+        c1.open_pre_sale(sp.record(max_supply=50, max_per_user=5, price=sp.tez(1))).run(valid=True, sender=admin)
+        scenario.verify(c1.data.event_id == 1)
+
+        scenario.p("2. Mint some NFTs and verify the balance of the event")
+        c1.user_mint(sp.record(amount=3, address=alice.address)).run(valid=True, amount=sp.tez(3), sender=alice)
+        scenario.verify(c1.data.event_user_balance[sp.pair(sp.nat(1), alice.address)] == 3)
+        scenario.verify(c1.get_event_user_balance(sp.pair(sp.nat(1), alice.address)) == 3)
+        scenario.verify(c1.get_mint_token_available(alice.address) == 2)
+
+        scenario.p("3. Close the event and open a public sale. Verify it gets the event id 2 and the balances start from zero")
+        c1.close_any_open_event().run(valid=True, sender=admin)
+        c1.open_pub_sale(sp.record(max_supply=50, max_per_user=5, price=sp.tez(1))).run(valid=True, sender=admin)
+        scenario.verify(c1.data.event_id == 2)
+        scenario.verify(c1.get_event_user_balance(sp.pair(sp.nat(2), alice.address)) == 0)
+        scenario.verify(c1.get_mint_token_available(alice.address) == 5)
+        c1.user_mint(sp.record(amount=5, address=alice.address)).run(valid=True, amount=sp.tez(5), sender=alice)
+        c1.user_mint(sp.record(amount=1, address=alice.address)).run(valid=False, amount=sp.tez(1), sender=alice)
+
+        scenario.p("4. Verify the balance of the previous event can still be read")
+        c1.close_any_open_event().run(valid=True, sender=admin)
+        scenario.verify(c1.get_event_user_balance(sp.pair(sp.nat(1), alice.address)) == 3)
+        scenario.verify(c1.get_event_user_balance(sp.pair(sp.nat(2), alice.address)) == 5)
+
+########################################################################################################################
+# unit_test_get_mint_token_available_batch
+########################################################################################################################
+def unit_test_get_mint_token_available_batch(is_default=True):
+    @sp.add_test(name="unit_test_get_mint_token_available_batch", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_test_get_mint_token_available_batch")
+
+        admin, alice, bob, john = TestHelper.create_account(scenario)
+        c1, c2, simulated_presale_contract = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the get_mint_token_available_batch offchain view.")
+        scenario.p("This view returns the number of tokens each address of a list can mint, as get_mint_token_available does for a single address.")
+
+        scenario.p("1. Verify no address can mint when no event is opened")
+        scenario.verify(c1.get_mint_token_available_batch(sp.list(l=[alice.address, bob.address]))[alice.address] == 0)
+        scenario.verify(c1.get_mint_token_available_batch(sp.list(l=[alice.address, bob.address]))[bob.address] == 0)
+
+        scenario.p("2. Open a pre-sale. Verify only the users of the allowlist can mint")
+        c1.admin_fill_allowlist(sp.set(l=[alice.address], t=sp.TAddress)).run(valid=True, sender=admin)
+        c1.open_pre_sale(sp.record(max_supply=10, max_per_user=4, price=sp.tez(1))).run(valid=True, sender=admin)
+        c1.user_mint(sp.record(amount=3, address=alice.address)).run(valid=True, amount=sp.tez(3), sender=alice)
+        scenario.verify(c1.get_mint_token_available_batch(sp.list(l=[alice.address, bob.address]))[alice.address] == 1)
+        scenario.verify(c1.get_mint_token_available_batch(sp.list(l=[alice.address, bob.address]))[bob.address] == 0)
+
+        scenario.p("3. Open a public sale with allowlist minting rights")
+        c1.close_any_open_event().run(valid=True, sender=admin)
+        c1.open_pub_sale_with_allowlist(sp.record(max_supply=6,
+                                                  max_per_user=5,
+                                                  price=sp.tez(1),
+                                                  mint_right=True,
+                                                  mint_discount=sp.tez(0))).run(valid=True, sender=admin)
+        c1.user_mint(sp.record(amount=4, address=bob.address)).run(valid=True, amount=sp.tez(4), sender=bob)
+
+        scenario.p("4. Verify the users without minting rights are limited by the supply of the event and the others are not")
+        scenario.verify(c1.get_mint_token_available_batch(sp.list(l=[alice.address, bob.address, john.address]))[alice.address] == 5)
+        scenario.verify(c1.get_mint_token_available_batch(sp.list(l=[alice.address, bob.address, john.address]))[bob.address] == 1)
+        scenario.verify(c1.get_mint_token_available_batch(sp.list(l=[alice.address, bob.address, john.address]))[john.address] == 2)
+
+        scenario.p("5. Verify the batch view returns the same values as get_mint_token_available")
+        scenario.verify(c1.get_mint_token_available(alice.address) == 5)
+        scenario.verify(c1.get_mint_token_available(bob.address) == 1)
+        scenario.verify(c1.get_mint_token_available(john.address) == 2)
+
 ########################################################################################################################
 # unit_test_user_mint_during_public_sale_with_allowlist_discount
 ########################################################################################################################
@@ -1136,6 +1345,49 @@ def unit_test_mutez_transfer(is_default=True):
         scenario.p("3. Check no fund are remaining")
         c1.mutez_transfer(sp.record(destination=alice.address, amount=sp.mutez(100000000))).run(valid=False, sender=admin)
 
+########################################################################################################################
+# unit_test_sweep_funds
+########################################################################################################################
+def unit_test_sweep_funds(is_default=True):
+    @sp.add_test(name="unit_test_sweep_funds", is_default=is_default)
+    def test():
+        scenario = TestHelper.create_scenario("unit_test_sweep_funds")
+
+        admin, alice, bob, john, nat, ben, gabe, gaston, chris = TestHelper.create_more_account(scenario)
+        c1, c2, simulated_presale_contract = TestHelper.create_contracts(scenario, admin, john)
+
+        scenario.h2("Test the deferred transfer of the funds (Who: Only for admin)")
+        scenario.p("When a sweep threshold is set, the Tez paid by users stay in the contract until the balance reaches the threshold or the admin calls sweep_funds.")
+
+        scenario.p("1. Verify only the admin can set the threshold")
+        scenario.verify(c1.data.fund_sweep_threshold == sp.mutez(0))
+        c1.set_fund_sweep_threshold(sp.tez(20)).run(valid=False, sender=alice)
+        c1.set_fund_sweep_threshold(sp.tez(20)).run(valid=True, sender=admin)
+        scenario.verify(c1.data.fund_sweep_threshold == sp.tez(20))
+
+        scenario.p("2. Mint below the threshold. The Tez stay in the contract")
+        c1.open_pub_sale(sp.record(max_supply=50, max_per_user=10, price=sp.tez(5))).run(valid=True, sender=admin)
+        c1.user_mint(sp.record(amount=2, address=alice.address)).run(valid=True, amount=sp.tez(10), sender=alice)
+        scenario.verify(c1.balance == sp.tez(10))
+        c1.user_mint(sp.record(amount=1, address=bob.address)).run(valid=True, amount=sp.tez(5), sender=bob)
+        scenario.verify(c1.balance == sp.tez(15))
+
+        scenario.p("3. Reach the threshold. The whole balance is transferred")
+        c1.user_mint(sp.record(amount=1, address=john.address)).run(valid=True, amount=sp.tez(5), sender=john)
+        scenario.verify(c1.balance == sp.tez(0))
+
+        scenario.p("4. Verify only the admin can sweep the funds")
+        c1.user_mint(sp.record(amount=1, address=nat.address)).run(valid=True, amount=sp.tez(5), sender=nat)
+        scenario.verify(c1.balance == sp.tez(5))
+        c1.sweep_funds().run(valid=False, sender=alice)
+        c1.sweep_funds().run(valid=True, sender=admin)
+        scenario.verify(c1.balance == sp.tez(0))
+
+        scenario.p("5. Remove the threshold. The Tez are transferred at each mint")
+        c1.set_fund_sweep_threshold(sp.mutez(0)).run(valid=True, sender=admin)
+        c1.user_mint(sp.record(amount=1, address=ben.address)).run(valid=True, amount=sp.tez(5), sender=ben)
+        scenario.verify(c1.balance == sp.tez(0))
+
 ########################################################################################################################
 # unit_test_admin_process_presale
 ########################################################################################################################
@@ -1150,15 +1402,34 @@ def unit_test_admin_process_presale(is_default=True):
         scenario.h2("Test the unit_test_admin_process_presale entrypoint.  (Who: Only for the admin)")
 
         scenario.p("1. Only admin can call the entrypoint")
-        c1.admin_process_presale(simulated_presale_contract.address).run(valid=False, sender=alice)
-        c1.admin_process_presale(simulated_presale_contract.address).run(valid=False, sender=bob)
-        c1.admin_process_presale(simulated_presale_contract.address).run(valid=False, sender=john)
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=0, limit=4)).run(valid=False, sender=alice)
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=0, limit=4)).run(valid=False, sender=bob)
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=0, limit=4)).run(valid=False, sender=john)
 
         scenario.p("2. Burn some tokens")
         simulated_presale_contract.burn(sp.list(l={1,3,7}, t=sp.TNat)).run(valid=True)
 
-        scenario.p("3. Call the entrypoint successfully")
-        c1.admin_process_presale(simulated_presale_contract.address).run(valid=True, sender=admin)
+        scenario.p("3. Call the entrypoint successfully for the first chunk")
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=0, limit=4)).run(valid=True, sender=admin)
+        scenario.verify(c1.data.presale_cursor == 4)
+        scenario.verify(~c1.data.presale_done)
+        scenario.verify(c2.data.ledger.contains(1))
+        scenario.verify(~c2.data.ledger.contains(2))
+
+        scenario.p("4. Verify a chunk cannot be processed twice or skipped and cannot be empty")
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=0, limit=4)).run(valid=False, sender=admin)
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=8, limit=4)).run(valid=False, sender=admin)
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=4, limit=0)).run(valid=False, sender=admin)
+
+        scenario.p("5. Process the remaining chunks. The last one goes beyond the last token and ends the migration")
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=4, limit=4)).run(valid=True, sender=admin)
+        scenario.verify(~c1.data.presale_done)
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=8, limit=4)).run(valid=True, sender=admin)
+        scenario.verify(c1.data.presale_cursor == 11)
+        scenario.verify(c1.data.presale_done)
+
+        scenario.p("6. Verify the migration cannot be processed again once done")
+        c1.admin_process_presale(sp.record(presale=simulated_presale_contract.address, start=11, limit=4)).run(valid=False, sender=admin)
 
         scenario.p("3. Check the FA2 ledger contains the expected NFTs")
         scenario.verify(c2.data.ledger.contains(0))
@@ -1400,7 +1671,9 @@ def module_test_pre_sale_public_sale_with_allowlist(is_default=True):
         c1.clear_allowlist().run(valid=True, sender=admin)
 
         scenario.p("45. Verify allowlist is cleared in the contract storage")
-        scenario.verify(sp.len(c1.data.allowlist) == 0)
+        scenario.verify(c1.data.allowlist_generation == 1)
+        scenario.verify(c1.data.allowlist_size == 0)
+        scenario.verify(~c1.data.allowlist.contains(sp.pair(c1.data.allowlist_generation, gabe.address)))
         scenario.verify(c1.data.state == Sale.STATE_NO_EVENT_OPEN_0)
 
         scenario.p("46. Check the FA2 ledger contains the expected NFTs")
@@ -1476,15 +1749,20 @@ unit_test_open_pre_sale()
 unit_test_open_pub_sale()
 unit_test_open_pub_sale_with_allowlist()
 unit_test_mint_and_give()
+unit_test_mint_and_give_batch()
 unit_test_set_next_administrator()
 unit_test_validate_new_administrator()
 unit_test_set_multisig_fund_address()
 unit_test_register_fa2()
 unit_test_user_mint_during_public_sale()
 unit_test_user_mint_during_pre_sale()
+unit_test_user_mint_with_proof()
+unit_test_event_user_balance()
+unit_test_get_mint_token_available_batch()
 unit_test_user_mint_during_public_sale_with_allowlist_discount()
 unit_test_user_mint_during_public_sale_with_allowlist_mint_rights()
 unit_test_mutez_transfer()
+unit_test_sweep_funds()
 unit_test_admin_process_presale()
 module_test_pre_sale_public_sale_with_allowlist()
 module_test_public_sale()
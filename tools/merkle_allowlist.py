@@ -0,0 +1,176 @@
+"""Build the merkle allowlist of the sale contract.
+
+The input is a CSV file with one address and its pre-sale quota per line (a header line is allowed):
+    tz1KqTpEZ7Yob7QbPE4Hy4Wo8fHG8LhKxZSx,2
+    tz1gjaF81ZRRvdzjobyfVNsAeSC6PScjfQwN,5
+
+In the root folder of the repository:
+    python3 ./tools/merkle_allowlist.py allowlist.csv --output allowlist_proofs.json
+
+The root shall be sent to the set_allowlist_merkle_root entrypoint. Each user then calls user_mint_with_proof with
+the quota and the proof of its address found in the output file.
+
+A leaf is blake2b(pack(pair(address, quota))) and a node is blake2b of the concatenation of its two children sorted in
+ascending order, as checked by AngryTeenagersSale.check_merkle_proof.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import sys
+
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Base58 prefix and binary tag of each kind of address
+ADDRESS_PREFIXES = {
+    "tz1": (bytes([6, 161, 159]), bytes([0, 0])),
+    "tz2": (bytes([6, 161, 161]), bytes([0, 1])),
+    "tz3": (bytes([6, 161, 164]), bytes([0, 2])),
+    "tz4": (bytes([6, 161, 166]), bytes([0, 3])),
+    "KT1": (bytes([2, 90, 121]), bytes([1])),
+}
+
+
+########################################################################################################################
+# Michelson encoding
+########################################################################################################################
+def b58check_decode(value):
+    number = 0
+    for char in value:
+        number = number * 58 + B58_ALPHABET.index(char)
+    padding = len(value) - len(value.lstrip(B58_ALPHABET[0]))
+    raw = b"\0" * padding + number.to_bytes((number.bit_length() + 7) // 8, "big")
+    payload, checksum = raw[:-4], raw[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        raise ValueError("Invalid checksum for %s" % value)
+    return payload
+
+
+def encode_address(address):
+    """Binary form of an address (as in the optimized Michelson representation)."""
+    if address[:3] not in ADDRESS_PREFIXES:
+        raise ValueError("Unsupported address %s" % address)
+    prefix, tag = ADDRESS_PREFIXES[address[:3]]
+    payload = b58check_decode(address)
+    if not payload.startswith(prefix) or len(payload) != len(prefix) + 20:
+        raise ValueError("Invalid address %s" % address)
+    key_hash = payload[len(prefix):]
+    if address.startswith("KT1"):
+        return tag + key_hash + b"\0"
+    return tag + key_hash
+
+
+def encode_int(value):
+    """Zarith encoding of a Micheline integer."""
+    sign = 0x40 if value < 0 else 0
+    value = abs(value)
+    encoded = bytearray([sign | (value & 0x3F)])
+    value >>= 6
+    while value > 0:
+        encoded[-1] |= 0x80
+        encoded.append(value & 0x7F)
+        value >>= 7
+    return bytes(encoded)
+
+
+def pack_address_quota(address, quota):
+    """Same bytes as sp.pack(sp.pair(address, quota)) in the contract."""
+    address_bytes = encode_address(address)
+    return (b"\x05" +                                     # Packed Micheline
+            b"\x07\x07" +                                 # Pair with two arguments
+            b"\x0a" + len(address_bytes).to_bytes(4, "big") + address_bytes +
+            b"\x00" + encode_int(quota))
+
+
+def blake2b(data):
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+########################################################################################################################
+# Merkle tree
+########################################################################################################################
+def leaf(address, quota):
+    return blake2b(pack_address_quota(address, quota))
+
+
+def hash_nodes(left, right):
+    return blake2b(min(left, right) + max(left, right))
+
+
+def build_tree(leaves):
+    """Return the levels of the tree, from the sorted leaves to the root.
+    A node without sibling is moved up to the next level unchanged."""
+    levels = [sorted(leaves)]
+    while len(levels[-1]) > 1:
+        nodes = levels[-1]
+        levels.append([hash_nodes(nodes[i], nodes[i + 1]) if i + 1 < len(nodes) else nodes[i]
+                       for i in range(0, len(nodes), 2)])
+    return levels
+
+
+def build_proof(levels, node):
+    proof = []
+    index = levels[0].index(node)
+    for nodes in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(nodes):
+            proof.append(nodes[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(root, address, quota, proof):
+    node = leaf(address, quota)
+    for sibling in proof:
+        node = hash_nodes(node, sibling)
+    return node == root
+
+
+def read_allowlist(csv_file):
+    allowlist = {}
+    for row in csv.reader(csv_file):
+        if not row or not row[0].strip() or row[0].strip().startswith("#"):
+            continue
+        address, quota = row[0].strip(), row[1].strip()
+        if not quota.isdigit():
+            # Header line
+            continue
+        if address in allowlist:
+            raise ValueError("Address %s is listed twice" % address)
+        allowlist[address] = int(quota)
+    return allowlist
+
+
+def build_allowlist(allowlist):
+    if not allowlist:
+        raise ValueError("The allowlist is empty")
+    leaves = {address: leaf(address, quota) for address, quota in allowlist.items()}
+    levels = build_tree(list(leaves.values()))
+    root = levels[-1][0]
+    entries = {}
+    for address, quota in allowlist.items():
+        proof = build_proof(levels, leaves[address])
+        assert verify_proof(root, address, quota, proof)
+        entries[address] = {"quota": quota, "proof": ["0x" + node.hex() for node in proof]}
+    return {"root": "0x" + root.hex(), "allowlist": entries}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the merkle allowlist of the sale contract from a CSV file")
+    parser.add_argument("csv", help="CSV file with one address and its quota per line")
+    parser.add_argument("--output", default=None, help="JSON file with the root and the proofs (default: stdout)")
+    args = parser.parse_args()
+
+    with open(args.csv, newline="") as csv_file:
+        result = build_allowlist(read_allowlist(csv_file))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+        print("Root: %s (%d addresses)" % (result["root"], len(result["allowlist"])))
+    else:
+        json.dump(result, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Regenerate the contract metadata of the metadata folder, or check they are up to date.
+
+The offchain views of the TZIP-16 metadata are compiled code which depends on the storage of the contract, so the
+metadata of a contract shall be regenerated each time its storage, its version or one of its offchain views changes.
+
+In the root folder of the repository:
+    python3 ./tools/regenerate_metadata.py --smartpy SMARTPY_INSTALLATION_FOLDER/smartpy
+
+Each contract is compiled from its ./main/*_main.py file and the metadata_base file of the compilation is copied in
+the metadata folder. Then the version and the views of each metadata file are checked against the contract source.
+
+Without SmartPy, only the check is done and the script exits with 1 if a metadata file is out of date:
+    python3 ./tools/regenerate_metadata.py --check
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source of the contract, compilation file, compilation target and metadata file
+CONTRACTS = [
+    ("nft/nft.py", "main/nft_main.py", "AngryTeenagers", "metadata/nft_contract_metadata.json"),
+    ("sale/sale.py", "main/sale_main.py", "AngryTeenagers Crowdsale contract", "metadata/sale_contract_metadata.json"),
+    ("dao/dao.py", "main/dao_main.py", "AngryTeenagers DAO", "metadata/dao_contract_metadata.json"),
+    ("dao/majority_voting.py", "main/majority_voting_main.py", "AngryTeenagersPilot_Dao_Majority",
+     "metadata/majority_voting_contract_metadata.json"),
+    ("dao/opt_out_voting.py", "main/opt_out_voting_main.py", "AngryTeenagersPilot_Dao_OptOut",
+     "metadata/opt_out_voting_contract_metadata.json"),
+]
+
+VERSION_RE = re.compile(r'"version":\s*"([0-9.]+)"')
+VIEWS_RE = re.compile(r"list_of_views\s*=\s*\[(.*?)\]", re.DOTALL)
+VIEW_NAME_RE = re.compile(r"self\.(\w+)")
+
+
+def read_source(source):
+    """Version and offchain views declared in the metadata_base of a contract."""
+    with open(os.path.join(ROOT, source)) as source_file:
+        code = source_file.read()
+    version = VERSION_RE.search(code).group(1)
+    views = VIEW_NAME_RE.findall(VIEWS_RE.search(code).group(1))
+    return version, views
+
+
+def check(source, metadata_file):
+    version, views = read_source(source)
+    with open(os.path.join(ROOT, metadata_file)) as metadata:
+        metadata = json.load(metadata)
+    errors = []
+    if metadata["version"] != version:
+        errors.append("version %s instead of %s" % (metadata["version"], version))
+    metadata_views = [view["name"] for view in metadata["views"]]
+    missing = [view for view in views if view not in metadata_views]
+    removed = [view for view in metadata_views if view not in views]
+    if missing:
+        errors.append("missing views: " + ", ".join(missing))
+    if removed:
+        errors.append("removed views: " + ", ".join(removed))
+    return errors
+
+
+def regenerate(smartpy, main_file, target, metadata_file, output_dir):
+    subprocess.run([smartpy, "compile", os.path.join(ROOT, main_file), output_dir], check=True, cwd=ROOT)
+    compiled = glob.glob(os.path.join(output_dir, target, "*metadata.metadata_base.json"))
+    if len(compiled) != 1:
+        raise RuntimeError("No metadata_base file found for %s in %s" % (target, output_dir))
+    shutil.copyfile(compiled[0], os.path.join(ROOT, metadata_file))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate or check the contract metadata of the metadata folder")
+    parser.add_argument("--smartpy", default=os.environ.get("SMARTPY", "smartpy"), help="SmartPy CLI")
+    parser.add_argument("--check", action="store_true", help="Only check the metadata files against the sources")
+    args = parser.parse_args()
+
+    if not args.check:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for source, main_file, target, metadata_file in CONTRACTS:
+                regenerate(args.smartpy, main_file, target, metadata_file, os.path.join(work_dir, target))
+                print("Regenerated %s" % metadata_file)
+
+    out_of_date = 0
+    for source, main_file, target, metadata_file in CONTRACTS:
+        errors = check(source, metadata_file)
+        if errors:
+            out_of_date += 1
+            print("%s is out of date (%s): %s" % (metadata_file, source, "; ".join(errors)))
+        else:
+            print("%s is up to date" % metadata_file)
+    if out_of_date:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Build the merkle root of a bulk reveal of the NFT contract.
+
+The input is the folder of the final metadata files of the collection, one <token_id>.json file per token, as uploaded
+in the IPFS directory given as base URI to the commit_reveal entrypoint.
+
+In the root folder of the repository:
+    python3 ./tools/reveal_commitment.py ../metadata --output reveal_proofs.json
+
+The root shall be sent with the base URI and the number of tokens to the commit_reveal entrypoint. The number of tokens
+shall be at least the number of tokens minted, and no token can be minted beyond it. Anyone can then check the metadata
+file of a token with its hash and proof found in the output file, offchain or with the verify_revealed_metadata view.
+
+A leaf is blake2b(pack(pair(token_id, blake2b(file)))) and a node is blake2b of the concatenation of its two children
+sorted in ascending order, as checked by AngryTeenagers.verify_revealed_metadata.
+"""
+import argparse
+import json
+import os
+import sys
+
+from merkle_allowlist import blake2b, build_proof, build_tree, encode_int, hash_nodes
+
+
+########################################################################################################################
+# Michelson encoding
+########################################################################################################################
+def pack_token_hash(token_id, metadata_hash):
+    """Same bytes as sp.pack(sp.pair(token_id, metadata_hash)) in the contract."""
+    return (b"\x05" +                                     # Packed Micheline
+            b"\x07\x07" +                                 # Pair with two arguments
+            b"\x00" + encode_int(token_id) +
+            b"\x0a" + len(metadata_hash).to_bytes(4, "big") + metadata_hash)
+
+
+########################################################################################################################
+# Merkle tree
+########################################################################################################################
+def leaf(token_id, metadata_hash):
+    return blake2b(pack_token_hash(token_id, metadata_hash))
+
+
+def verify_proof(root, token_id, metadata_hash, proof):
+    node = leaf(token_id, metadata_hash)
+    for sibling in proof:
+        node = hash_nodes(node, sibling)
+    return node == root
+
+
+def read_metadata_folder(folder):
+    hashes = {}
+    for name in os.listdir(folder):
+        token_id, extension = os.path.splitext(name)
+        if extension != ".json" or not token_id.isdigit():
+            continue
+        with open(os.path.join(folder, name), "rb") as metadata_file:
+            hashes[int(token_id)] = blake2b(metadata_file.read())
+    return hashes
+
+
+def build_commitment(hashes):
+    if not hashes:
+        raise ValueError("No <token_id>.json metadata file found")
+    # The commitment covers the tokens 0 to size - 1, minted or not
+    if sorted(hashes) != list(range(len(hashes))):
+        raise ValueError("The metadata files shall be numbered from 0 without gap")
+    leaves = {token_id: leaf(token_id, metadata_hash) for token_id, metadata_hash in hashes.items()}
+    levels = build_tree(list(leaves.values()))
+    root = levels[-1][0]
+    tokens = {}
+    for token_id in sorted(hashes):
+        proof = build_proof(levels, leaves[token_id])
+        assert verify_proof(root, token_id, hashes[token_id], proof)
+        tokens[str(token_id)] = {"metadata_hash": "0x" + hashes[token_id].hex(),
+                                 "proof": ["0x" + node.hex() for node in proof]}
+    return {"root": "0x" + root.hex(), "size": len(hashes), "tokens": tokens}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the merkle root of a bulk reveal from the metadata files")
+    parser.add_argument("folder", help="Folder with one <token_id>.json metadata file per token")
+    parser.add_argument("--output", default=None, help="JSON file with the root and the proofs (default: stdout)")
+    args = parser.parse_args()
+
+    result = build_commitment(read_metadata_folder(args.folder))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+        print("Root: %s (%d tokens)" % (result["root"], len(result["tokens"])))
+    else:
+        json.dump(result, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()